@@ -1,6 +1,21 @@
-from flask import Flask, request, jsonify, Response
-from src.processor import process_talent
+from flask import Flask, Request, request, jsonify, Response
+from werkzeug.exceptions import RequestEntityTooLarge
+from src.processor import process_talent, process_talent_batch
+from src.preprocess import parsing, TalentTooLarge, InvalidTalentData, TALENT_MAX_BYTES, TALENT_READ_CHUNK
+from src.db import pool_stats, close_pool
+from src.embedding_cache import embedding_cache
+from src.gpt import tag_cache_stats
+from src.talent_table import init_talent_table
+from src.company_cache import company_cache, init_company_cache
+from src.news_index import get_tagger, token_cache_stats, news_stats, init_news_index
+from src.company_series import init_company_series
+from src.jobs import get_job_queue
+from src.cancellation import CancelToken, PipelineCancelled
+import io
 import json
+import atexit
+import queue
+import threading
 from dotenv import load_dotenv
 load_dotenv(dotenv_path="./.env")
 import os
@@ -10,7 +25,20 @@ from flask_cors import CORS
 
 
 
+TALENT_MAX_REQUEST_BYTES = int(os.getenv("TALENT_MAX_REQUEST_BYTES", 64 * 1024 * 1024))    # Largest request body (a batch holds several talents)
+TALENT_UPLOAD_OVERHEAD = 64 * 1024      # Bytes allowed on top of TALENT_MAX_BYTES for the multipart boundaries and form fields of /talent
+
+
+class InMemoryUploadRequest(Request):
+    """Keep the uploaded files in memory instead of spooling the large ones to temporary files (the body size is capped)"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return io.BytesIO()
+
+
 app = Flask(__name__)
+app.request_class = InMemoryUploadRequest
+app.config["MAX_CONTENT_LENGTH"] = TALENT_MAX_REQUEST_BYTES
 CORS(app)
 
 SWAGGER_URL = "/swagger"
@@ -24,24 +52,187 @@ swaggerui_blueprint = get_swaggerui_blueprint(
 
 app.register_blueprint(swaggerui_blueprint, url_prefix=SWAGGER_URL)
 
+# Give the pooled database connections back on shutdown
+atexit.register(close_pool)
+
+# Migrate the talent table and build its vector index before serving
+try:
+    init_talent_table()
+except Exception as e:
+    logger.error(f"[ERROR] Failed to initialize the talent table at startup (retried on first insert): {e}")
+
+# Cache decoded company documents, invalidated by the company change notifications
+try:
+    init_company_cache()
+except Exception as e:
+    logger.error(f"[ERROR] Failed to start the company cache (company data is read from the database): {e}")
+
+atexit.register(company_cache.stop_listener)
+
+# Create the company time-series tables, so the tenure windows can be aggregated by the database
+try:
+    init_company_series()
+except Exception as e:
+    logger.error(f"[ERROR] Failed to initialize the company series tables (company data is read from the documents): {e}")
+
+# Add the news token column and statistics table used by the news ranking
+try:
+    init_news_index()
+except Exception as e:
+    logger.error(f"[ERROR] Failed to initialize the news index tables: {e}")
+
+# Load the MeCab dictionary once, before the first request needs it
+try:
+    get_tagger()
+except Exception as e:
+    logger.error(f"[ERROR] Failed to load the MeCab tagger at startup (retried on first use): {e}")
+
+# Pick up the asynchronous jobs a previous worker left behind, then keep the running jobs alive
+# and recover the abandoned ones periodically
+try:
+    get_job_queue().recover()
+except Exception as e:
+    logger.error(f"[ERROR] Failed to recover pending talent jobs at startup (retried periodically): {e}")
+
+get_job_queue().start_maintenance()
+
+SSE_HEARTBEAT_INTERVAL = float(os.getenv("SSE_HEARTBEAT_INTERVAL", 15))     # Seconds between keep-alive comments of a progress stream
+
+def _is_truthy(value) -> bool:
+    return str(value).lower() in ("1", "true", "yes")
+
+def _sse(event: str, payload: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+def _stream_talent(talent: dict, threshold: float) -> Response:
+    """
+    Run process_talent in a background thread and stream its stages as server-sent events
+
+    Events: profile, position (one per position), similarity, tags, then done. A failure ends the stream
+    with an error event. If the client disconnects, the pipeline is cancelled (including the GPT request).
+    """
+
+    events = queue.Queue()
+    cancel = CancelToken()
+    finished = object()
+
+    def run():
+        try:
+            process_talent(talent, threshold, on_event=lambda stage, payload: events.put((stage, payload)), cancel=cancel)
+            events.put(("done", {}))
+        except PipelineCancelled as e:
+            logger.info(f"[INFO] Talent stream cancelled: {e}")
+            events.put(("cancelled", {"reason": str(e)}))
+        except InvalidTalentData as e:
+            logger.error(f"[ERROR] Talent rejected: {e}")
+            events.put(("error", {"error": str(e), "status": 400}))
+        except ValueError as ve:
+            logger.error(f"[ERROR] Threshold error: {ve}")
+            events.put(("error", {"error": str(ve), "status": 422}))
+        except Exception as e:
+            logger.exception(f"[ERROR] Unhandled exception in /talent stream: {e}")
+            events.put(("error", {"error": f"Internal server error: {str(e)}", "status": 500}))
+        finally:
+            events.put(finished)
+
+    def generate():
+        worker = threading.Thread(target=run, name="talent-stream", daemon=True)
+        worker.start()
+
+        try:
+            while True:
+                try:
+                    item = events.get(timeout=SSE_HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"        # Keeps proxies from closing an idle stream
+                    continue
+
+                if item is finished:
+                    return
+
+                yield _sse(*item)
+        finally:
+            # Runs when the stream ends or the client goes away; a finished pipeline ignores it
+            if worker.is_alive():
+                logger.info("[INFO] Client left the talent stream. Cancel the pipeline")
+            cancel.cancel()
+
+    response = Response(generate(), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"        # Disable nginx response buffering for this stream
+
+    return response
+
+@app.errorhandler(RequestEntityTooLarge)
+def request_too_large(e):
+    # The limit of the route (see create_talent), or MAX_CONTENT_LENGTH
+    max_bytes = request.max_content_length
+    logger.error(f"[ERROR] Request body larger than {max_bytes} bytes")
+    return jsonify({"error": f"Request body is larger than {max_bytes} bytes"}), 413
+
+def _load_upload(upload):
+    """
+    Decode an uploaded talent JSON from its stream, without saving it to disk
+
+    Return
+        - (talent, error): The talent data and None, or None and the error response
+    """
+
+    try:
+        return parsing.load_talent(upload.stream), None
+    except TalentTooLarge as e:
+        logger.error(f"[ERROR] Talent upload too large: {e}")
+        return None, (jsonify({"error": str(e)}), 413)
+    except ValueError as e:
+        logger.error(f"[ERROR] Invalid talent JSON: {e}")
+        return None, (jsonify({"error": f"Invalid JSON: {e}"}), 400)
+
 @app.route("/talent", methods=["POST"])
 def create_talent():
+    # A single talent is capped by TALENT_MAX_BYTES, so a larger body is rejected before it is buffered
+    max_bytes = TALENT_MAX_BYTES + TALENT_UPLOAD_OVERHEAD
+
+    if request.content_length is not None and request.content_length > max_bytes:
+        logger.error(f"[ERROR] Talent upload of {request.content_length} bytes, larger than {max_bytes} bytes")
+        return jsonify({"error": f"Request body is larger than {max_bytes} bytes"}), 413
+
+    # Also caps a body sent without Content-Length (chunked) while it is read
+    request.max_content_length = max_bytes
+
     data = request.files.get('file')        # Request to get talent's JSON file
     threshold = float(request.form.get('threshold', 0.85))
 
     if not data:
         logger.error(f"[ERROR] No file uploaded")
         return jsonify({"error": "No file uploaded"}), 400
-    
-    data_path = f"/tmp/{data.filename}"
-    data.save(data_path)
+
+    talent, error = _load_upload(data)
+
+    if error is not None:
+        return error
+
+    # Asynchronous mode: store a job and answer right away
+    if _is_truthy(request.args.get('async', request.form.get('async', False))):
+        try:
+            job_id = get_job_queue().submit(talent, threshold)
+        except Exception as e:
+            logger.exception(f"[ERROR] Failed to queue talent job: {e}")
+            return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+        response = jsonify({"job_id": job_id, "status": "queued"})
+        response.headers["Location"] = f"/talent/jobs/{job_id}"
+        return response, 202
+
+    # Progress mode: stream each stage as a server-sent event
+    if _is_truthy(request.args.get('stream', False)) or request.accept_mimetypes.best == "text/event-stream":
+        return _stream_talent(talent, threshold)
 
     try:
-        tags = process_talent(data_path, threshold)
+        tags = process_talent(talent, threshold)
         return Response(json.dumps({"tags": tags}, ensure_ascii=False), content_type="application/json")
-    except FileNotFoundError:
-        logger.error("[ERROR] File not found")
-        return jsonify({"error": "Uploaded file not found"}), 400
+    except InvalidTalentData as e:
+        logger.error(f"[ERROR] Talent rejected: {e}")
+        return jsonify({"error": str(e)}), 400
     except ValueError as ve:
         logger.error(f"[ERROR] Threshold error: {ve}")
         return jsonify({"error": str(ve)}), 422
@@ -49,5 +240,129 @@ def create_talent():
         logger.exception(f"[ERROR] Unhandled exception in /talent: {e}")
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
+NDJSON_MIMETYPES = ("application/x-ndjson", "application/jsonl", "application/json-lines")
+
+def _read_lines(stream, max_bytes: int):
+    """
+    Read the lines of a stream one at a time, each up to max_bytes
+
+    Yield
+        - line (bytes | None): The line without its line break, or None for a line longer than max_bytes (its content is discarded)
+    """
+
+    while line := stream.readline(max_bytes + 2):
+        if len(line.rstrip(b"\r\n")) <= max_bytes:
+            yield line.rstrip(b"\r\n")
+            continue
+
+        # Skip the rest of the long line
+        while not line.endswith(b"\n") and (line := stream.readline(TALENT_READ_CHUNK)):
+            pass
+
+        yield None
+
+def _read_batch_items() -> list[dict]:
+    """
+    Collect the talents of a batch request: several uploaded `file` fields, or a JSONL (NDJSON) body
+
+    Return
+        - items (list[dict]): {"name": file name or line number, "talent": decoded data} or {"name", "error"} per talent
+    """
+
+    items = []
+    files = request.files.getlist('file')
+
+    if files:
+        for f in files:
+            try:
+                items.append({"name": f.filename, "talent": parsing.load_talent(f.stream)})
+            except TalentTooLarge as e:
+                items.append({"name": f.filename, "error": str(e)})
+            except ValueError as e:
+                items.append({"name": f.filename, "error": f"Invalid JSON: {e}"})
+
+    elif request.mimetype in NDJSON_MIMETYPES:
+        for line_no, line in enumerate(_read_lines(request.stream, TALENT_MAX_BYTES), start=1):
+            if line is not None and not line.strip():
+                continue
+            try:
+                if line is None:
+                    raise TalentTooLarge(f"Talent JSON is larger than {TALENT_MAX_BYTES} bytes")
+                items.append({"name": f"line {line_no}", "talent": parsing.load_talent(line)})
+            except TalentTooLarge as e:
+                items.append({"name": f"line {line_no}", "error": str(e)})
+            except ValueError as e:
+                items.append({"name": f"line {line_no}", "error": f"Invalid JSON: {e}"})
+
+    return items
+
+@app.route("/talent/jobs/<job_id>", methods=["GET"])
+def get_talent_job(job_id):
+    """Return the status (and the tags once done) of an asynchronous talent job"""
+
+    try:
+        job = get_job_queue().get(job_id)
+    except Exception as e:
+        logger.exception(f"[ERROR] Failed to load talent job {job_id}: {e}")
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    return Response(json.dumps(job, ensure_ascii=False), content_type="application/json")
+
+@app.route("/talent/batch", methods=["POST"])
+def create_talent_batch():
+    """Tag several talents at once and stream one NDJSON result line per talent as soon as it is done"""
+
+    try:
+        threshold = float(request.form.get('threshold', request.args.get('threshold', 0.85)))
+    except ValueError as ve:
+        logger.error(f"[ERROR] Threshold error: {ve}")
+        return jsonify({"error": str(ve)}), 422
+
+    items = _read_batch_items()
+
+    if not items:
+        logger.error(f"[ERROR] No talents in batch request")
+        return jsonify({"error": "Upload 'file' fields or send a JSONL body"}), 400
+
+    valid = [idx for idx, item in enumerate(items) if "talent" in item]
+    logger.info(f"[INFO] Batch request with {len(items)} talents ({len(items) - len(valid)} invalid)")
+
+    def generate():
+        for idx, item in enumerate(items):
+            if "error" in item:
+                yield json.dumps({"index": idx, "name": item["name"], "error": item["error"]}, ensure_ascii=False) + "\n"
+
+        results = process_talent_batch([items[idx]["talent"] for idx in valid], threshold)
+
+        for pos, tags, error in results:
+            idx = valid[pos]
+            result = {"index": idx, "name": items[idx]["name"]}
+
+            if error is None:
+                result["tags"] = tags
+            else:
+                result["error"] = str(error)
+
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+
+    return Response(generate(), mimetype="application/x-ndjson")
+
+@app.route("/metrics/db", methods=["GET"])
+def db_metrics():
+    """Expose the database connection pool saturation metrics"""
+    return jsonify(pool_stats())
+
+@app.route("/metrics/cache", methods=["GET"])
+def cache_metrics():
+    """Expose the hit/miss counters of the caches"""
+    return jsonify({"embedding": embedding_cache.stats(),
+                    "gen_tags": tag_cache_stats(),
+                    "company": company_cache.stats(),
+                    "news_tokens": token_cache_stats(),
+                    "news_stats": news_stats.stats()})
+
 if __name__ == "__main__":
     app.run(debug=True, port=8000)
\ No newline at end of file
@@ -0,0 +1,42 @@
+import os
+import sys
+import importlib
+import importlib.abc
+import importlib.util
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+SRC = ROOT / "src"
+
+# gpt.py creates its OpenAI client at import; the tests stub every request
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+# logger_utils and the src package are imported from the repository root
+sys.path.insert(0, str(ROOT))
+
+
+class _SrcModuleLoader(importlib.abc.Loader):
+    """Hand out the package module `src.<name>`, so both names refer to the same module object"""
+
+    def create_module(self, spec):
+        return importlib.import_module(f"src.{spec.name}")
+
+    def exec_module(self, module):
+        pass
+
+
+class _SrcModuleFinder(importlib.abc.MetaPathFinder):
+    """
+    Resolve the top-level imports of the tests (e.g., `from summarize import ...`) to the modules of the src package
+
+    The modules use relative imports, so they can only be loaded as part of the package.
+    """
+
+    def find_spec(self, name, path=None, target=None):
+        if path is None and "." not in name and (SRC / f"{name}.py").is_file():
+            return importlib.util.spec_from_loader(name, _SrcModuleLoader())
+
+        return None
+
+
+sys.meta_path.insert(0, _SrcModuleFinder())
@@ -1,8 +1,14 @@
 #!/usr/bin/env python
 import os
+import io
+import csv
 import json
 import glob
+import time
+import hashlib
 import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 
 import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
@@ -15,6 +21,9 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# 회사 데이터 파일 패턴 (예제 파일 하나는 이름이 compnay_ex7_시어스랩.json)
+COMPANY_FILE_PATTERNS = ("company_ex*.json", "compnay_ex*.json")
+
 # 데이터베이스 연결 정보
 DB_CONFIG = {
     "host": "localhost",
@@ -76,53 +85,130 @@ def create_company_table(conn):
                 logger.info(
                     "company 테이블이 이미 존재합니다. 테이블 생성을 건너뜁니다."
                 )
+
+            # 회사 이름으로 조회하므로 (회사 데이터, 뉴스의 company_id 조회) 이름 인덱스 생성
+            cursor.execute("CREATE INDEX IF NOT EXISTS company_name_idx ON company (name);")
+
+            # 변경된 회사만 갱신하기 위한 문서 해시, 이름 기준 upsert 를 위한 유니크 인덱스
+            cursor.execute("ALTER TABLE company ADD COLUMN IF NOT EXISTS content_hash TEXT;")
+            cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS company_name_key ON company (name);")
     except psycopg2.Error as e:
         logger.error(f"테이블 생성 오류: {e}")
         raise
 
 
-def load_company_data(file_path):
-    """회사 데이터 파일 불러오기"""
+def company_name_of(file_path):
+    """파일 이름에서 회사 이름 추출 (예: company_ex1_비바리퍼블리카.json -> 비바리퍼블리카)"""
+    return os.path.basename(file_path).split("_")[-1].split(".")[0]
+
+
+def load_company_file(file_path, known_hash=None):
+    """회사 데이터 파일을 읽어 (회사 이름, 내용 해시, JSON 문서) 반환 (프로세스 풀에서 실행)
+
+    내용 해시가 known_hash 와 같으면 파싱하지 않고 문서 대신 None 을, 잘못된 파일이면 해시 대신 None 을 반환
+    """
+    company_name = company_name_of(file_path)
     try:
-        with open(file_path, "r", encoding="utf-8") as file:
-            data = json.load(file)
-            # 파일 이름에서 회사 이름 추출 (예: company_ex1_비바리퍼블리카.json -> 비바리퍼블리카)
-            company_name = os.path.basename(file_path).split("_")[-1].split(".")[0]
-            return company_name, data
-    except (json.JSONDecodeError, FileNotFoundError) as e:
+        with open(file_path, "rb") as file:
+            raw = file.read()
+    except OSError as e:
         logger.error(f"파일 로드 오류 ({file_path}): {e}")
-        return None, None
+        return company_name, None, None
 
+    content_hash = hashlib.sha256(raw).hexdigest()
+    if content_hash == known_hash:
+        return company_name, content_hash, None
 
-def insert_company_data(conn, name, data):
-    """회사 데이터를 데이터베이스에 삽입"""
     try:
-        with conn.cursor() as cursor:
-            # 이미 존재하는지 확인
-            cursor.execute("SELECT COUNT(*) FROM company WHERE name = %s", (name,))
-            count = cursor.fetchone()[0]
+        text = raw.decode("utf-8-sig")
+        # 검증만 하고 원문을 그대로 보냄 (다시 직렬화하지 않음)
+        json.loads(text)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        logger.error(f"파일 로드 오류 ({file_path}): {e}")
+        return company_name, None, None
+
+    return company_name, content_hash, text
+
+
+def get_company_hashes(conn):
+    """저장된 회사별 문서 해시"""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT name, content_hash FROM company")
+        return dict(cursor.fetchall())
+
+
+class RowStream:
+    """(이름, 문서, 해시) 행을 CSV 로 만들어 COPY 에 흘려보내는 파일 객체 (전체를 메모리에 모으지 않음)"""
+
+    def __init__(self, rows):
+        self.rows = iter(rows)
+        self.buffer = ""
+        self.count = 0
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            row = next(self.rows, None)
+            if row is None:
+                break
+            line = io.StringIO()
+            csv.writer(line).writerow(row)
+            self.buffer += line.getvalue()
+            self.count += 1
+
+        if size < 0:
+            size = len(self.buffer)
+        chunk, self.buffer = self.buffer[:size], self.buffer[size:]
+        return chunk
 
-            if count > 0:
-                logger.info(
-                    f"회사 '{name}'의 데이터가 이미 존재합니다. 삽입을 건너뜁니다."
-                )
-                return False
 
-            # 데이터 삽입
+def upsert_company_data(conn, rows):
+    """변경된 회사 문서를 스테이징 테이블로 COPY 한 뒤 한 번의 upsert 로 반영하고 (삽입 수, 갱신 수) 반환"""
+    try:
+        with conn.cursor() as cursor:
             cursor.execute(
-                "INSERT INTO company (name, data) VALUES (%s, %s)",
-                (name, json.dumps(data)),
+                """
+                CREATE TEMP TABLE IF NOT EXISTS company_staging (name TEXT, data TEXT, content_hash TEXT);
+                TRUNCATE company_staging;
+            """
+            )
+            stream = RowStream(rows)
+            cursor.copy_expert("COPY company_staging (name, data, content_hash) FROM STDIN WITH (FORMAT csv)", stream)
+            if not stream.count:
+                return 0, 0
+
+            # 해시가 같은 회사는 갱신하지 않음 (변경 알림, 시계열 무효화 트리거도 발생하지 않음)
+            cursor.execute(
+                """
+                INSERT INTO company (name, data, content_hash)
+                SELECT DISTINCT ON (name) name, data::jsonb, content_hash FROM company_staging
+                ON CONFLICT (name) DO UPDATE
+                    SET data = EXCLUDED.data, content_hash = EXCLUDED.content_hash
+                    WHERE company.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+                RETURNING (xmax = 0) AS inserted
+            """
             )
-            logger.info(f"회사 '{name}'의 데이터가 성공적으로 삽입되었습니다.")
-            return True
+            results = [inserted for inserted, in cursor.fetchall()]
+
+        inserted_count = sum(results)
+        return inserted_count, len(results) - inserted_count
     except psycopg2.Error as e:
         logger.error(f"데이터 삽입 오류: {e}")
-        conn.rollback()
-        return False
+        raise
+
+
+def find_company_files(patterns=COMPANY_FILE_PATTERNS):
+    """회사 데이터 파일 찾기 (여러 패턴에 걸리는 파일은 한 번만)"""
+    return sorted({path for pattern in patterns for path in glob.glob(pattern)})
 
 
 def main():
     """메인 함수"""
+    parser = argparse.ArgumentParser(description="회사 데이터 JSON 파일을 company 테이블에 적재 (내용이 바뀐 회사만)")
+    parser.add_argument("patterns", nargs="*", default=list(COMPANY_FILE_PATTERNS),
+                        help=f"회사 데이터 파일 패턴 (기본값: {' '.join(COMPANY_FILE_PATTERNS)})")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="파일을 읽는 프로세스 수 (기본값: CPU 수)")
+    args = parser.parse_args()
+
     try:
         # 데이터베이스 연결
         conn = connect_to_db()
@@ -131,18 +217,35 @@ def main():
         create_company_table(conn)
 
         # 회사 데이터 파일 찾기
-        company_files = glob.glob(os.path.join("company_ex*.json"))
+        company_files = find_company_files(args.patterns)
         logger.info(f"{len(company_files)}개의 회사 데이터 파일을 찾았습니다.")
+        if not company_files:
+            return
+
+        started = time.monotonic()
+        known_hashes = get_company_hashes(conn)
+        counts = {"unchanged": 0, "failed": 0}
 
-        # 데이터 처리 및 삽입
-        success_count = 0
-        for file_path in sorted(company_files):
-            company_name, company_data = load_company_data(file_path)
-            if company_name and company_data:
-                if insert_company_data(conn, company_name, company_data):
-                    success_count += 1
+        def changed_rows(results):
+            for company_name, content_hash, text in results:
+                if content_hash is None:
+                    counts["failed"] += 1
+                elif text is None:
+                    counts["unchanged"] += 1
+                else:
+                    yield company_name, text, content_hash
 
-        logger.info(f"총 {success_count}개의 회사 데이터가 성공적으로 삽입되었습니다.")
+        # 파일 읽기, 해시, JSON 검증은 프로세스 풀에서 병렬로 처리하고 결과는 도착하는 대로 COPY
+        with ProcessPoolExecutor(max_workers=max(1, args.workers)) as executor:
+            results = executor.map(load_company_file, company_files,
+                                   [known_hashes.get(company_name_of(path)) for path in company_files],
+                                   chunksize=16)
+            inserted_count, updated_count = upsert_company_data(conn, changed_rows(results))
+
+        logger.info(
+            f"삽입 {inserted_count}개, 갱신 {updated_count}개, 변경 없음 {counts['unchanged']}개, "
+            f"실패 {counts['failed']}개 ({time.monotonic() - started:.1f}초)"
+        )
 
     except Exception as e:
         logger.error(f"예상치 못한 오류가 발생했습니다: {e}")
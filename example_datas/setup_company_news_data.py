@@ -1,11 +1,22 @@
 #!/usr/bin/env python
 import os
+import io
+import sys
 import csv
+import time
 import logging
+import argparse
 from datetime import datetime
+from itertools import islice
 
 import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from dotenv import load_dotenv
+
+# 뉴스 인덱스(src.news_index)를 사용하기 위해 저장소 루트를 경로에 추가하고 루트의 .env 를 읽습니다
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+load_dotenv(dotenv_path=os.path.join(ROOT_DIR, ".env"))
 
 
 logging.basicConfig(
@@ -15,6 +26,9 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# 한 번에 COPY 하는 CSV 행 수
+CHUNK_SIZE = int(os.getenv("NEWS_LOAD_CHUNK_SIZE", 5000))
+
 # 데이터베이스 연결 정보
 DB_CONFIG = {
     "host": "localhost",
@@ -25,6 +39,22 @@ DB_CONFIG = {
 }
 
 
+def build_news_index(conn):
+    """
+    적재한 뉴스의 제목 토큰, 회사별 문서 빈도와 월별 후보를 계산 (요청마다 TF-IDF 를 학습하지 않도록)
+
+    새 뉴스가 있는 회사만 다시 계산하며, 실패하면 저장소 루트에서 python -m src.news_index 로 다시 실행할 수 있습니다.
+    """
+    try:
+        from src.news_index import index_news
+
+        start_time = time.time()
+        index_news(conn)
+        logger.info(f"뉴스 인덱스를 갱신했습니다 ({time.time() - start_time:.1f}초).")
+    except Exception as e:
+        logger.error(f"뉴스 인덱스 갱신 실패: {e}. 저장소 루트에서 python -m src.news_index 를 실행하세요.")
+
+
 def connect_to_db():
     """데이터베이스에 연결"""
     try:
@@ -70,6 +100,7 @@ def create_company_news_table(conn):
                         title VARCHAR(1000) NOT NULL,
                         original_link TEXT,
                         news_date DATE NOT NULL,
+                        tokens TEXT[],
                         FOREIGN KEY (company_id) REFERENCES company(id) ON DELETE CASCADE
                     );
                 """
@@ -84,145 +115,263 @@ def create_company_news_table(conn):
         raise
 
 
-def load_news_data(file_path):
-    """뉴스 데이터 CSV 파일 불러오기"""
-    news_data = []
+def create_company_news_index(conn):
+    """회사별 기간 조회를 위한 (company_id, news_date) 복합 인덱스 생성 (존재하지 않을 경우)"""
     try:
-        with open(file_path, "r", encoding="utf-8") as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                try:
-                    # 날짜 변환
-                    year = int(row["year"])
-                    month = int(row["month"])
-                    day = int(row["day"])
-                    news_date = datetime(year, month, day).strftime("%Y-%m-%d")
-
-                    news_data.append(
-                        {
-                            "company_name": row["name"],
-                            "title": row["title"],
-                            "original_link": row["original_link"],
-                            "news_date": news_date,
-                        }
-                    )
-                except (ValueError, KeyError) as e:
-                    logger.error(f"데이터 행 처리 오류: {e}, 행: {row}")
-                    continue
-
-            logger.info(f"{len(news_data)}개의 뉴스 데이터를 로드했습니다.")
-            return news_data
-    except FileNotFoundError as e:
-        logger.error(f"파일 로드 오류 ({file_path}): {e}")
-        return []
-
-
-def get_company_map(conn):
-    """회사 이름을 ID로 매핑하는 딕셔너리 생성"""
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                CREATE INDEX IF NOT EXISTS company_news_company_date_idx
+                    ON company_news (company_id, news_date);
+                """
+            )
+            logger.info("company_news (company_id, news_date) 인덱스를 확인했습니다.")
+    except psycopg2.Error as e:
+        logger.error(f"인덱스 생성 오류: {e}")
+        raise
+
+
+def create_company_news_unique(conn):
+    """(company_id, title, news_date) 유니크 인덱스 생성 (존재하지 않을 경우, 기존 중복 뉴스는 먼저 정리)"""
     try:
-        company_map = {}
         with conn.cursor() as cursor:
-            cursor.execute("SELECT id, name FROM company")
-            for company_id, company_name in cursor.fetchall():
-                company_map[company_name] = company_id
+            cursor.execute(
+                """
+                SELECT EXISTS (
+                    SELECT FROM pg_indexes
+                    WHERE tablename = 'company_news' AND indexname = 'company_news_company_title_date_key'
+                );
+            """
+            )
+            if cursor.fetchone()[0]:
+                return
+
+            # 같은 회사, 제목, 날짜의 뉴스는 가장 먼저 적재된 것만 남김
+            cursor.execute(
+                """
+                DELETE FROM company_news a
+                USING company_news b
+                WHERE a.company_id = b.company_id
+                  AND a.title = b.title
+                  AND a.news_date = b.news_date
+                  AND a.id > b.id;
+                """
+            )
+            if cursor.rowcount:
+                logger.info(f"중복 뉴스 {cursor.rowcount}개를 정리했습니다.")
 
-        logger.info(f"{len(company_map)}개의 회사 매핑을 로드했습니다.")
-        return company_map
+            cursor.execute(
+                """
+                CREATE UNIQUE INDEX company_news_company_title_date_key
+                    ON company_news (company_id, title, news_date);
+                """
+            )
+            logger.info("company_news (company_id, title, news_date) 유니크 인덱스를 생성했습니다.")
     except psycopg2.Error as e:
-        logger.error(f"회사 매핑 로드 오류: {e}")
-        return {}
+        logger.error(f"유니크 인덱스 생성 오류: {e}")
+        raise
 
 
-def insert_news_data(conn, news_data, company_map):
-    """뉴스 데이터를 데이터베이스에 삽입"""
+def create_load_tables(conn):
+    """적재 진행 상황 테이블과 (세션별) 스테이징 테이블 생성"""
     try:
-        inserted_count = 0
-        skipped_count = 0
-        missing_company_count = 0
-
         with conn.cursor() as cursor:
-            for news in news_data:
-                company_name = news["company_name"]
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS company_news_load (
+                    file_name TEXT PRIMARY KEY,
+                    file_size BIGINT NOT NULL,
+                    file_mtime DOUBLE PRECISION NOT NULL,
+                    rows_done BIGINT NOT NULL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+
+                CREATE TEMP TABLE IF NOT EXISTS company_news_staging (
+                    company_name TEXT,
+                    title TEXT,
+                    original_link TEXT,
+                    news_date DATE
+                );
+            """
+            )
+    except psycopg2.Error as e:
+        logger.error(f"적재 테이블 생성 오류: {e}")
+        raise
 
-                # 회사 ID 찾기
-                if company_name not in company_map:
-                    missing_company_count += 1
-                    logger.warning(
-                        f"회사 '{company_name}'가 데이터베이스에 존재하지 않습니다. 해당 뉴스를 건너뜁니다."
-                    )
-                    continue
 
-                company_id = company_map[company_name]
+def get_load_progress(conn, file_path):
+    """이전에 중단된 적재에서 처리한 CSV 행 수 (파일이 바뀌었으면 0)"""
+    stat = os.stat(file_path)
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT file_size, file_mtime, rows_done FROM company_news_load WHERE file_name = %s",
+            (os.path.abspath(file_path),),
+        )
+        row = cursor.fetchone()
 
-                # 중복 확인
-                cursor.execute(
-                    """
-                    SELECT COUNT(*) FROM company_news 
-                    WHERE company_id = %s AND title = %s AND news_date = %s
-                    """,
-                    (company_id, news["title"], news["news_date"]),
-                )
-                count = cursor.fetchone()[0]
+    if row and row[0] == stat.st_size and row[1] == stat.st_mtime:
+        return row[2]
+    return 0
 
-                if count > 0:
-                    skipped_count += 1
-                    continue
 
-                # 데이터 삽입
-                cursor.execute(
-                    """
-                    INSERT INTO company_news (company_id, title, original_link, news_date) 
-                    VALUES (%s, %s, %s, %s)
-                    """,
-                    (
-                        company_id,
-                        news["title"],
-                        news["original_link"],
-                        news["news_date"],
-                    ),
-                )
-                inserted_count += 1
+def save_load_progress(conn, file_path, rows_done):
+    """처리한 CSV 행 수 저장 (적재는 멱등이므로 청크 적재 후 저장 전에 중단되어도 다시 적재하면 됨)"""
+    stat = os.stat(file_path)
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO company_news_load (file_name, file_size, file_mtime, rows_done, updated_at)
+            VALUES (%s, %s, %s, %s, CURRENT_TIMESTAMP)
+            ON CONFLICT (file_name) DO UPDATE
+                SET file_size = EXCLUDED.file_size, file_mtime = EXCLUDED.file_mtime,
+                    rows_done = EXCLUDED.rows_done, updated_at = EXCLUDED.updated_at
+            """,
+            (os.path.abspath(file_path), stat.st_size, stat.st_mtime, rows_done),
+        )
+
+
+def parse_news_row(row):
+    """CSV 행을 (회사 이름, 제목, 원문 링크, 날짜) 로 변환 (잘못된 행은 None)"""
+    try:
+        news_date = datetime(int(row["year"]), int(row["month"]), int(row["day"])).strftime("%Y-%m-%d")
+        return row["name"], row["title"], row["original_link"], news_date
+    except (ValueError, KeyError, TypeError) as e:
+        logger.error(f"데이터 행 처리 오류: {e}, 행: {row}")
+        return None
+
+
+def insert_news_chunk(conn, rows):
+    """스테이징 테이블에 COPY 후 company_news 에 삽입하고 (삽입된 행 수, 존재하지 않는 회사의 행 수) 반환 (이미 있는 뉴스는 건너뜀)"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+
+    with conn.cursor() as cursor:
+        cursor.execute("TRUNCATE company_news_staging")
+        cursor.copy_expert(
+            "COPY company_news_staging (company_name, title, original_link, news_date) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
 
-                # 로깅 (100개마다)
-                if inserted_count % 100 == 0:
-                    logger.info(f"{inserted_count}개의 뉴스 데이터가 삽입되었습니다.")
+        cursor.execute(
+            """
+            SELECT COUNT(*) FROM company_news_staging s
+            WHERE NOT EXISTS (SELECT 1 FROM company c WHERE c.name = s.company_name)
+            """
+        )
+        missing_company_count = cursor.fetchone()[0]
 
-        logger.info(f"총 {inserted_count}개의 뉴스 데이터가 삽입되었습니다.")
-        logger.info(f"중복으로 {skipped_count}개의 데이터가 건너뛰어졌습니다.")
-        logger.info(
-            f"존재하지 않는 회사로 인해 {missing_company_count}개의 데이터가 건너뛰어졌습니다."
+        # 같은 이름의 회사가 여러 개면 마지막에 추가된 회사로 적재
+        cursor.execute(
+            """
+            INSERT INTO company_news (company_id, title, original_link, news_date)
+            SELECT c.id, s.title, s.original_link, s.news_date
+            FROM company_news_staging s
+            JOIN (SELECT name, MAX(id) AS id FROM company GROUP BY name) c ON c.name = s.company_name
+            ON CONFLICT (company_id, title, news_date) DO NOTHING
+            """
         )
+        inserted_count = cursor.rowcount
+
+    return inserted_count, missing_company_count
+
+
+def load_news_data(conn, file_path, chunk_size=CHUNK_SIZE, restart=False):
+    """뉴스 CSV 파일을 청크 단위로 읽어 적재 (중단된 적재는 처리한 행 다음부터 이어서 적재)"""
+    rows_done = 0 if restart else get_load_progress(conn, file_path)
+    if rows_done:
+        logger.info(f"이전 적재에 이어서 {rows_done + 1}번째 행부터 적재합니다.")
+
+    inserted_count = 0
+    invalid_count = 0
+    missing_company_count = 0
+    processed_count = 0
+    started = time.monotonic()
+
+    with open(file_path, "r", encoding="utf-8", newline="") as file:
+        reader = islice(csv.DictReader(file), rows_done, None)
+
+        while True:
+            chunk = list(islice(reader, chunk_size))
+            if not chunk:
+                break
+
+            rows = [news for news in map(parse_news_row, chunk) if news is not None]
+            invalid_count += len(chunk) - len(rows)
+
+            if rows:
+                inserted, missing = insert_news_chunk(conn, rows)
+                inserted_count += inserted
+                missing_company_count += missing
+
+            processed_count += len(chunk)
+            save_load_progress(conn, file_path, rows_done + processed_count)
 
-        return inserted_count
+            elapsed = time.monotonic() - started
+            logger.info(
+                f"{rows_done + processed_count}개 행 처리 (삽입 {inserted_count}개, "
+                f"{processed_count / elapsed if elapsed else 0:.0f} rows/s)"
+            )
+
+    elapsed = time.monotonic() - started
+    skipped_count = processed_count - invalid_count - missing_company_count - inserted_count
+
+    logger.info(f"총 {inserted_count}개의 뉴스 데이터가 삽입되었습니다. ({processed_count}개 행, {elapsed:.1f}초, "
+                f"{processed_count / elapsed if elapsed else 0:.0f} rows/s)")
+    logger.info(f"중복으로 {skipped_count}개의 데이터가 건너뛰어졌습니다.")
+    logger.info(f"존재하지 않는 회사로 인해 {missing_company_count}개의 데이터가 건너뛰어졌습니다.")
+    if invalid_count:
+        logger.info(f"잘못된 형식으로 {invalid_count}개의 데이터가 건너뛰어졌습니다.")
+
+    return inserted_count
+
+
+def has_companies(conn):
+    """company 테이블에 회사가 있는지 확인"""
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT EXISTS (SELECT FROM company)")
+            return cursor.fetchone()[0]
     except psycopg2.Error as e:
-        logger.error(f"데이터 삽입 오류: {e}")
-        conn.rollback()
-        return 0
+        logger.error(f"회사 정보 조회 오류: {e}")
+        return False
 
 
 def main():
     """메인 함수"""
+    parser = argparse.ArgumentParser(description="company_news.csv 를 company_news 테이블에 적재")
+    parser.add_argument("--file", default="company_news.csv", help="뉴스 CSV 파일 (기본값: company_news.csv)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help=f"한 번에 적재하는 행 수 (기본값: {CHUNK_SIZE})")
+    parser.add_argument("--restart", action="store_true", help="이전 적재 진행 상황을 무시하고 처음부터 적재")
+    parser.add_argument("--skip-index", action="store_true", help="적재 후 뉴스 인덱스(토큰, 문서 빈도, 월별 후보)를 계산하지 않음")
+    args = parser.parse_args()
+
     try:
         # 데이터베이스 연결
         conn = connect_to_db()
 
         # company_news 테이블 생성
         create_company_news_table(conn)
+        create_company_news_index(conn)
+        create_company_news_unique(conn)
+        create_load_tables(conn)
 
-        # 회사 매핑 가져오기
-        company_map = get_company_map(conn)
-        if not company_map:
+        if not has_companies(conn):
             logger.error("회사 정보를 가져오지 못했습니다. 프로세스를 중단합니다.")
             return
 
-        # 뉴스 데이터 로드
-        news_data = load_news_data("company_news.csv")
-        if not news_data:
-            logger.error("뉴스 데이터를 로드하지 못했습니다. 프로세스를 중단합니다.")
+        if not os.path.exists(args.file):
+            logger.error(f"뉴스 데이터 파일이 없습니다 ({args.file}). 프로세스를 중단합니다.")
             return
 
         # 데이터 삽입
-        insert_news_data(conn, news_data, company_map)
+        load_news_data(conn, args.file, args.chunk_size, args.restart)
+
+        # 새 뉴스의 토큰과 문서 빈도를 적재 시점에 계산 (트리거로 무효화된 회사의 월별 후보도 다시 계산)
+        if args.skip_index:
+            logger.info("뉴스 인덱스를 갱신하려면 저장소 루트에서 python -m src.news_index 를 실행하세요.")
+        else:
+            build_news_index(conn)
 
     except Exception as e:
         logger.error(f"예상치 못한 오류가 발생했습니다: {e}")
@@ -0,0 +1,163 @@
+import time
+import threading
+from collections import OrderedDict
+
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Thread-safe in-process cache with LRU eviction and an optional time-to-live
+
+    Parameters
+        - max_entries (int): The maximum number of entries kept (the least recently used one is evicted first)
+        - ttl (float | None): Seconds an entry stays valid (default = None, never expires)
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float | None = None):
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be positive: {max_entries}")
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()       # key -> (value, expires_at)
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key, default=None):
+        """Return the cached value of the key (or default), and mark it as recently used"""
+
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+
+            if entry is not _MISSING:
+                value, expires_at = entry
+
+                if expires_at is not None and expires_at <= time.monotonic():
+                    del self._entries[key]
+                    self._expirations += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+
+            self._misses += 1
+            return default
+
+    def set(self, key, value):
+        """Store the value, evicting the least recently used entries beyond max_entries"""
+
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, key) -> bool:
+        """Drop the key from the cache. Return whether it was cached"""
+
+        with self._lock:
+            return self._entries.pop(key, _MISSING) is not _MISSING
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> dict:
+        """Return the size and hit/miss counters of the cache"""
+
+        with self._lock:
+            lookups = self._hits + self._misses
+
+            return {"size": len(self._entries),
+                    "max_entries": self.max_entries,
+                    "ttl": self.ttl,
+                    "hits": self._hits,
+                    "misses": self._misses,
+                    "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+                    "evictions": self._evictions,
+                    "expirations": self._expirations}
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key, so only one of them runs at a time
+
+    The first caller runs the function. Callers arriving while it is in flight wait for it and
+    receive the same result (or the same exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+        self._executions = 0
+        self._coalesced = 0
+
+    def do(self, key, fn):
+        """
+        Run `fn()` for the key, or wait for the call that is already in flight
+
+        Parameters
+            - key: The de-duplication key
+            - fn (callable): The function to run when no call is in flight
+
+        Return
+            - The result of the (shared) call
+        """
+
+        with self._lock:
+            call = self._calls.get(key)
+
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                self._executions += 1
+                leader = True
+            else:
+                self._coalesced += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"in_flight": len(self._calls),
+                    "executions": self._executions,
+                    "coalesced": self._coalesced}
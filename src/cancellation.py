@@ -0,0 +1,74 @@
+import threading
+from contextlib import contextmanager
+from logger_utils import logger
+
+
+class PipelineCancelled(Exception):
+    """Raised inside the pipeline once its caller has cancelled it"""
+
+
+class CancelToken:
+    """
+    Cancellation signal shared by the stages of one process_talent run
+
+    Stages check it between steps with `raise_if_cancelled`. A stage blocked on I/O (e.g., a streaming
+    OpenAI response) registers a callback with `on_cancel` that aborts the I/O as soon as `cancel` is called.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._callbacks = {}
+        self._next_id = 0
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self):
+        """Cancel the pipeline and run the registered callbacks (only the first call has an effect)"""
+
+        with self._lock:
+            if self._cancelled:
+                return
+            self._cancelled = True
+            callbacks = list(self._callbacks.values())
+            self._callbacks.clear()
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"[WARNING] Cancel callback failed: {e}")
+
+    def raise_if_cancelled(self, stage: str = ""):
+        if self._cancelled:
+            raise PipelineCancelled(f"Cancelled{f' before {stage}' if stage else ''}")
+
+    @contextmanager
+    def on_cancel(self, callback):
+        """Run `callback` if the token is cancelled while inside the `with` block"""
+
+        with self._lock:
+            already_cancelled = self._cancelled
+            if not already_cancelled:
+                callback_id = self._next_id
+                self._next_id += 1
+                self._callbacks[callback_id] = callback
+
+        if already_cancelled:
+            callback()
+
+        try:
+            yield
+        finally:
+            if not already_cancelled:
+                with self._lock:
+                    self._callbacks.pop(callback_id, None)
+
+
+def raise_if_cancelled(cancel: CancelToken | None, stage: str = ""):
+    """Raise PipelineCancelled if the (optional) token was cancelled"""
+
+    if cancel is not None:
+        cancel.raise_if_cancelled(stage)
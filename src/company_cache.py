@@ -0,0 +1,295 @@
+import os
+import select
+import threading
+import psycopg2
+from .db import DB_CONFIG, get_connection
+from .cache import LRUCache, SingleFlight
+from .preprocess import company_data_column, COMPANY_SUMMARY_SECTIONS
+from logger_utils import logger
+
+
+COMPANY_CACHE_ENABLED = os.getenv("COMPANY_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+COMPANY_CACHE_MAX_ENTRIES = int(os.getenv("COMPANY_CACHE_MAX_ENTRIES", 256))           # Decoded company documents kept in memory
+COMPANY_CACHE_RECONNECT_DELAY = float(os.getenv("COMPANY_CACHE_RECONNECT_DELAY", 5))   # Seconds before the listener reconnects
+
+COMPANY_NOTIFY_CHANNEL = "company_changed"
+LISTEN_POLL_INTERVAL = 1.0          # Seconds between checks of the stop flag while waiting for notifications
+
+_MISSING = object()
+
+
+def install_company_notify(conn):
+    """
+    Install the trigger that sends a `company_changed` notification whenever a company row changes
+
+    The payload is the company name (the old and the new one on a rename), or '' on TRUNCATE.
+    """
+
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"""
+                CREATE OR REPLACE FUNCTION notify_company_change() RETURNS trigger AS $$
+                BEGIN
+                    IF TG_OP = 'TRUNCATE' THEN
+                        PERFORM pg_notify('{COMPANY_NOTIFY_CHANNEL}', '');
+                        RETURN NULL;
+                    END IF;
+                    IF TG_OP <> 'INSERT' THEN
+                        PERFORM pg_notify('{COMPANY_NOTIFY_CHANNEL}', OLD.name);
+                    END IF;
+                    IF TG_OP <> 'DELETE' THEN
+                        PERFORM pg_notify('{COMPANY_NOTIFY_CHANNEL}', NEW.name);
+                    END IF;
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql;
+
+                DO $$
+                BEGIN
+                    IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgrelid = 'company'::regclass AND tgname = 'company_notify') THEN
+                        CREATE TRIGGER company_notify AFTER INSERT OR UPDATE OR DELETE ON company
+                            FOR EACH ROW EXECUTE FUNCTION notify_company_change();
+                    END IF;
+                    IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgrelid = 'company'::regclass AND tgname = 'company_notify_truncate') THEN
+                        CREATE TRIGGER company_notify_truncate AFTER TRUNCATE ON company
+                            FOR EACH STATEMENT EXECUTE FUNCTION notify_company_change();
+                    END IF;
+                END;
+                $$;
+                """
+            )
+    except psycopg2.Error as e:
+        logger.error(f"[ERROR] [Company Cache] Failed to install the company change trigger: {e}")
+        raise
+
+
+class CompanyCache:
+    """
+    Size-bounded in-process cache of decoded company documents
+
+    Only the sections the summaries read are fetched by default (see COMPANY_SUMMARY_SECTIONS); the other
+    sections hold most of the bytes of a document.
+
+    Each company (including an unknown one) is fetched and decoded once, and concurrent lookups of the same
+    company wait for the query that is already running. Entries are dropped when the `company_changed`
+    notification for the company arrives on the listener connection.
+
+    The cache is only used while the listener is connected: before it starts, and while it reconnects,
+    every lookup goes to the database (changes in that window would be missed), and the cache is cleared
+    whenever the listener (re)connects.
+    """
+
+    def __init__(self, max_entries: int = COMPANY_CACHE_MAX_ENTRIES, sections: tuple[str, ...] | None = COMPANY_SUMMARY_SECTIONS):
+        self._sections = sections      # Top-level sections of the documents fetched and cached (None = the whole document)
+        self._cache = LRUCache(max_entries=max_entries)
+        self._flight = SingleFlight()
+
+        self._lock = threading.Lock()
+        self._generation = 0            # Bumped by every invalidation, so a fetch racing with one is not stored
+        self._invalidations = 0
+
+        self._listening = threading.Event()
+        self._stop = threading.Event()
+        self._listener = None
+
+    def _params(self, *params) -> tuple:
+        return params if self._sections is None else (list(self._sections), *params)
+
+    def _fetch(self, conn, company: str) -> dict | None:
+        with conn.cursor() as cursor:
+            cursor.execute(f"SELECT {company_data_column(self._sections)} FROM company WHERE name = %s",
+                           self._params(company))
+            row = cursor.fetchone()
+
+        return row[0] if row else None
+
+    def get_company_data(self, conn, company: str) -> dict | None:
+        """
+        Get data on the company the talent worked for (the cached document is shared, do not modify it)
+
+        Parameters
+            - company (str): The name of the company the talent worked for
+
+        Return
+            - company_data (dict): The data on the company the talent worked for. If there is no company data, return None
+        """
+
+        if not self._listening.is_set():
+            return self._query(conn, company)
+
+        cached = self._cache.get(company, _MISSING)
+        if cached is not _MISSING:
+            return cached
+
+        return self._flight.do(company, lambda: self._fetch_and_store(conn, company))
+
+    def get_companies_data(self, conn, companies: list[str]) -> dict:
+        """
+        Get data on several companies, reading the ones that are not cached in one query
+
+        Parameters
+            - companies (list[str]): The names of the companies
+
+        Return
+            - (dict): The data of each company (None if there is no company data, or if the query failed)
+        """
+
+        listening = self._listening.is_set()
+        companies_data = {}
+        missing = []
+
+        for company in dict.fromkeys(companies):
+            cached = self._cache.get(company, _MISSING) if listening else _MISSING
+
+            if cached is _MISSING:
+                missing.append(company)
+            else:
+                companies_data[company] = cached
+
+        if not missing:
+            return companies_data
+
+        with self._lock:
+            generation = self._generation
+
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f"SELECT name, {company_data_column(self._sections)} FROM company WHERE name = ANY(%s)",
+                               self._params(missing))
+                fetched = dict(cursor.fetchall())
+        except Exception as e:
+            logger.error("[ERROR] While collecting company data for %d companies: %s", len(missing), str(e))
+            return {**companies_data, **dict.fromkeys(missing)}
+
+        with self._lock:
+            store = generation == self._generation and self._listening.is_set()
+
+            for company in missing:
+                companies_data[company] = fetched.get(company)
+
+                if store:
+                    self._cache.set(company, companies_data[company])
+
+        return companies_data
+
+    def _query(self, conn, company: str) -> dict | None:
+        try:
+            return self._fetch(conn, company)
+        except Exception as e:
+            logger.error("[ERROR] While collecting company data for '%s': %s", company, str(e))
+            return None
+
+    def _fetch_and_store(self, conn, company: str) -> dict | None:
+        with self._lock:
+            generation = self._generation
+
+        try:
+            company_data = self._fetch(conn, company)
+        except Exception as e:
+            # An error is not cached; the next lookup asks again
+            logger.error("[ERROR] While collecting company data for '%s': %s", company, str(e))
+            return None
+
+        with self._lock:
+            if generation == self._generation and self._listening.is_set():
+                self._cache.set(company, company_data)
+
+        return company_data
+
+    def invalidate(self, company: str | None = None):
+        """Drop a company from the cache, or every company if no name is given"""
+
+        with self._lock:
+            self._generation += 1
+            self._invalidations += 1
+
+            if company:
+                self._cache.invalidate(company)
+            else:
+                self._cache.clear()
+
+    def start_listener(self):
+        """Start the background thread that listens for company changes (once per process)"""
+
+        with self._lock:
+            if self._listener is not None:
+                return
+
+            self._stop.clear()
+            self._listener = threading.Thread(target=self._listen, name="company-cache-listener", daemon=True)
+            self._listener.start()
+
+    def stop_listener(self):
+        self._stop.set()
+
+        if self._listener is not None:
+            self._listener.join(timeout=LISTEN_POLL_INTERVAL * 2)
+            self._listener = None
+
+    def _listen(self):
+        while not self._stop.is_set():
+            conn = None
+
+            try:
+                # A dedicated connection: LISTEN keeps it busy, so it must not come from the pool
+                conn = psycopg2.connect(**DB_CONFIG)
+                conn.autocommit = True
+
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {COMPANY_NOTIFY_CHANNEL}")
+
+                # Changes made while nobody was listening were missed
+                self.invalidate()
+                self._listening.set()
+                logger.info(f"[INFO] [Company Cache] Listening for '{COMPANY_NOTIFY_CHANNEL}' notifications")
+
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], LISTEN_POLL_INTERVAL) == ([], [], []):
+                        continue
+
+                    conn.poll()
+
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        self.invalidate(notify.payload)
+                        logger.info(f"[INFO] [Company Cache] Invalidated '{notify.payload or '*'}'")
+
+            except Exception as e:
+                logger.warning(f"[WARNING] [Company Cache] Listener disconnected, bypassing the cache: {e}")
+
+            finally:
+                self._listening.clear()
+                self.invalidate()
+
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+            self._stop.wait(COMPANY_CACHE_RECONNECT_DELAY)
+
+    def stats(self) -> dict:
+        with self._lock:
+            invalidations = self._invalidations
+
+        return {**self._cache.stats(),
+                **self._flight.stats(),
+                "invalidations": invalidations,
+                "listening": self._listening.is_set()}
+
+
+company_cache = CompanyCache()
+
+def init_company_cache():
+    """Install the change trigger and start listening, so company documents can be cached (used at startup)"""
+
+    if not COMPANY_CACHE_ENABLED:
+        logger.info("[INFO] [Company Cache] Disabled")
+        return
+
+    with get_connection() as conn:
+        install_company_notify(conn)
+
+    company_cache.start_listener()
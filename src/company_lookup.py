@@ -0,0 +1,189 @@
+import threading
+from .preprocess import parsing, CompanySeries
+from .company_cache import company_cache
+from .news_index import news_stats
+from .cache import SingleFlight
+from logger_utils import logger
+
+
+class CompanyLookup:
+    """
+    Share company documents, company series windows and news windows between the talents of one batch
+
+    It has the same `get_company_data` / `get_company_series` / `get_company_news` / `get_news_rollup` interface
+    as `parsing`, so the summarizers can use either. Each company and each (company, start, end) window is fetched
+    once per batch, and concurrent lookups of the same key wait for the query that is already running.
+    `prefetch` loads every position of a talent up front, in a fixed number of queries.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._companies = {}
+        self._news = {}
+        self._flight = SingleFlight()
+
+        self._hits = 0
+        self._misses = 0
+
+    def _lookup(self, store: dict, key, fetch):
+        with self._lock:
+            if key in store:
+                self._hits += 1
+                return store[key]
+            self._misses += 1
+
+        def fetch_and_store():
+            value = fetch()
+            with self._lock:
+                store[key] = value
+            return value
+
+        return self._flight.do(key, fetch_and_store)
+
+    @staticmethod
+    def _window_key(kind: str, company: str, start_date: tuple[int, int], end_date) -> tuple:
+        end_key = tuple(end_date) if isinstance(end_date, (tuple, list)) else end_date
+        return (kind, company, tuple(start_date), end_key)
+
+    def get_company_data(self, conn, company: str) -> dict | None:
+        """
+        Get data on the company the talent worked for (fetched once per batch)
+
+        Parameters
+            - company (str): The name of the company the talent worked for
+
+        Return
+            - company_data (dict): The data on the company the talent worked for. If there is no company data, return None
+        """
+
+        return self._lookup(self._companies, ("company", company),
+                            lambda: company_cache.get_company_data(conn, company))
+
+    def get_company_series(self, conn, company: str, start_date: tuple[int, int], end_date: tuple[int, int]) -> CompanySeries | None:
+        """
+        Get the window aggregates of the company during talent's tenure (fetched once per batch and window)
+
+        Parameters
+            - company (str): The name of the company
+            - start_date (tuple[int, int]): Date (year and month) the talent started working for the company
+            - end_date (tuple[int, int]): Date (year and month) the talent left the company, or 'Present'
+
+        Return
+            - (CompanySeries | None): The aggregates, or None if the series of the company were not ingested
+        """
+
+        key = self._window_key("series", company, start_date, end_date)
+
+        return self._lookup(self._news, key,
+                            lambda: parsing.get_company_series(conn, company, start_date, end_date))
+
+    def get_company_news(self, conn, company: str, start_date: tuple[int, int], end_date: tuple[int, int]) -> list[dict]:
+        """
+        Get the company news during talent's tenure (fetched once per batch and window)
+
+        Parameters
+            - company (str): The name of the company
+            - start_date (tuple[int, int]): Date (year and month) the talent started working for the company
+            - end_date (tuple[int, int]): Date (year and month) the talent left the company
+
+        Return
+            - news_titles (list[dict]): The list of the company news title during talent's tenure
+        """
+
+        key = self._window_key("news", company, start_date, end_date)
+
+        return self._lookup(self._news, key,
+                            lambda: parsing.get_company_news(conn, company, start_date, end_date))
+
+    def get_news_rollup(self, conn, company: str, start_date: tuple[int, int], end_date: tuple[int, int]) -> list[dict]:
+        """
+        Get the news candidates of the monthly rollups covering talent's tenure (fetched once per batch and window)
+
+        Parameters
+            - company (str): The name of the company
+            - start_date (tuple[int, int]): Date (year and month) the talent started working for the company
+            - end_date (tuple[int, int]): Date (year and month) the talent left the company
+
+        Return
+            - news_titles (list[dict]): The candidate news (title, date, TF-IDF and keyword scores) in date order
+        """
+
+        key = self._window_key("rollup", company, start_date, end_date)
+
+        return self._lookup(self._news, key,
+                            lambda: parsing.get_news_rollup(conn, company, start_date, end_date))
+
+    def prefetch(self, conn, positions: list[dict]):
+        """
+        Load the series, company documents, news statistics and news of every position in a fixed number of queries
+
+        The results are stored under the keys of the getters above, so the position summaries read them without
+        querying (the N+1 lookups of a long career become 5 queries at most). Windows already fetched in the batch
+        are skipped. If a query fails, the summaries fetch what is missing position by position.
+
+        Parameter
+            - positions (list[dict]): The positions of the talent (company, start and end)
+        """
+
+        windows = {}
+
+        for position in positions:
+            company, start_date, end_date = position.get('company'), position.get('start'), position.get('end')
+
+            if company and start_date:
+                windows.setdefault(self._window_key("series", company, start_date, end_date), (company, start_date, end_date))
+
+        with self._lock:
+            windows = {key: window for key, window in windows.items() if key not in self._news}
+
+        if not windows:
+            return
+
+        try:
+            series = dict(zip(windows, parsing.get_company_series_many(conn, list(windows.values()))))
+
+            # Only the companies whose series were not ingested need their document
+            companies = [company for key, (company, _, _) in windows.items() if series[key] is None]
+            companies_data = company_cache.get_companies_data(conn, companies) if companies else {}
+
+            with self._lock:
+                for key, value in series.items():
+                    self._news.setdefault(key, value)
+                for company, company_data in companies_data.items():
+                    self._companies.setdefault(("company", company), company_data)
+
+            # The news of a window are read only when the position has company data (as in the summaries)
+            found = [window for key, window in windows.items()
+                     if series[key] is not None or companies_data.get(window[0]) is not None]
+            stats = news_stats.get_many(conn, [company for company, _, _ in found])
+
+            rolled_up = {company for company, company_stats in stats.items() if company_stats is not None and company_stats.rolled_up}
+            rollup_windows = [window for window in found if window[0] in rolled_up]
+            news_windows = [window for window in found if window[0] not in rolled_up]
+
+            fetched = {}
+
+            for kind, batch, fetch in (("rollup", rollup_windows, parsing.get_news_rollup_many),
+                                       ("news", news_windows, parsing.get_company_news_many)):
+                if batch:
+                    fetched.update({self._window_key(kind, *window): news for window, news in zip(batch, fetch(conn, batch))})
+
+            with self._lock:
+                for key, value in fetched.items():
+                    self._news.setdefault(key, value)
+
+        except Exception as e:
+            logger.warning(f"[WARNING] [Company Lookup] Failed to prefetch {len(windows)} positions, "
+                           f"fetching them one by one: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"companies": len(self._companies),
+                    "news_windows": len(self._news),
+                    "hits": self._hits,
+                    "misses": self._misses}
+
+    def log_stats(self):
+        stats = self.stats()
+        logger.info(f"[INFO] [Company Lookup] {stats['companies']} companies, {stats['news_windows']} news windows "
+                    f"(hits: {stats['hits']}, misses: {stats['misses']})")
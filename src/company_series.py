@@ -0,0 +1,179 @@
+import sys
+import psycopg2
+from .db import get_connection
+from logger_utils import logger
+
+
+def create_company_series_tables(conn):
+    """
+    Create the company time-series tables (if they do not exist)
+
+    Each series record of a company document becomes one typed row, keyed by (company_id, month) for the window
+    queries and numbered by its position in the document (`seq`), since the growth follows the document order.
+    company_series_state lists the companies whose rows match their document: a trigger removes a company
+    from it when its document changes, until the next ingest.
+    """
+
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS company_growth (
+                    company_id INTEGER NOT NULL REFERENCES company(id) ON DELETE CASCADE,
+                    section TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    month DATE NOT NULL,
+                    value DOUBLE PRECISION,
+                    PRIMARY KEY (company_id, section, seq)
+                );
+                CREATE INDEX IF NOT EXISTS company_growth_month_idx ON company_growth (company_id, section, month);
+
+                CREATE TABLE IF NOT EXISTS company_investment (
+                    company_id INTEGER NOT NULL REFERENCES company(id) ON DELETE CASCADE,
+                    seq INTEGER NOT NULL,
+                    month DATE NOT NULL,
+                    level TEXT,
+                    has_round BOOLEAN NOT NULL,
+                    amount NUMERIC,
+                    PRIMARY KEY (company_id, seq)
+                );
+                CREATE INDEX IF NOT EXISTS company_investment_month_idx ON company_investment (company_id, month);
+
+                CREATE TABLE IF NOT EXISTS company_finance (
+                    company_id INTEGER NOT NULL REFERENCES company(id) ON DELETE CASCADE,
+                    seq INTEGER NOT NULL,
+                    year INTEGER NOT NULL,
+                    net_profit DOUBLE PRECISION,
+                    PRIMARY KEY (company_id, seq)
+                );
+                CREATE INDEX IF NOT EXISTS company_finance_year_idx ON company_finance (company_id, year);
+
+                CREATE TABLE IF NOT EXISTS company_series_state (
+                    company_id INTEGER PRIMARY KEY REFERENCES company(id) ON DELETE CASCADE,
+                    ingested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+
+                CREATE OR REPLACE FUNCTION mark_company_series_stale() RETURNS trigger AS $$
+                BEGIN
+                    DELETE FROM company_series_state WHERE company_id = OLD.id;
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql;
+
+                DO $$
+                BEGIN
+                    IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgrelid = 'company'::regclass AND tgname = 'company_series_stale') THEN
+                        CREATE TRIGGER company_series_stale AFTER UPDATE OF data ON company
+                            FOR EACH ROW EXECUTE FUNCTION mark_company_series_stale();
+                    END IF;
+                END;
+                $$;
+                """
+            )
+    except psycopg2.Error as e:
+        logger.error(f"[ERROR] [Company Series] Failed to create the company series tables: {e}")
+        raise
+
+def ingest_company_series(conn, rebuild: bool = False) -> int:
+    """
+    Explode the mau, organization, investment and finance sections of the company documents into the series tables
+
+    The documents are read and exploded by the database (nothing is sent to Python). A record whose month
+    or year cannot be read is skipped, and a value that is not a number is stored as NULL (missing).
+
+    Parameter
+        - rebuild (bool): Ingest every company again (default = False, only the new and changed companies)
+
+    Return
+        - (int): The number of companies ingested
+    """
+
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.id FROM company c
+            WHERE %s OR NOT EXISTS (SELECT 1 FROM company_series_state s WHERE s.company_id = c.id)
+            ORDER BY c.id
+            """,
+            (rebuild,),
+        )
+        ids = [company_id for company_id, in cursor.fetchall()]
+
+        if not ids:
+            logger.info("[INFO] [Company Series] Every company is up to date")
+            return 0
+
+        # Sent as one query string, the statements run in one transaction: readers see the old or the new rows
+        cursor.execute(
+            """
+            DELETE FROM company_series_state WHERE company_id = ANY(%(ids)s);
+            DELETE FROM company_growth WHERE company_id = ANY(%(ids)s);
+            DELETE FROM company_investment WHERE company_id = ANY(%(ids)s);
+            DELETE FROM company_finance WHERE company_id = ANY(%(ids)s);
+
+            INSERT INTO company_growth (company_id, section, seq, month, value)
+            SELECT c.id, src.section, e.seq,
+                   make_date(substr(e.rec->>'referenceMonth', 1, 4)::int, substr(e.rec->>'referenceMonth', 6, 2)::int, 1),
+                   CASE WHEN jsonb_typeof(e.rec->'value') = 'number' THEN (e.rec->>'value')::float8 END
+            FROM company c
+            CROSS JOIN LATERAL (VALUES ('mau', c.data->'mau'->'list'->0->'data'),
+                                       ('organization', c.data->'organization'->'data')) AS src(section, records)
+            CROSS JOIN LATERAL jsonb_array_elements(CASE WHEN jsonb_typeof(src.records) = 'array' THEN src.records ELSE '[]' END)
+                WITH ORDINALITY AS e(rec, seq)
+            WHERE c.id = ANY(%(ids)s)
+              AND e.rec->>'referenceMonth' ~ '^\\d{4}-(0[1-9]|1[0-2])';
+
+            INSERT INTO company_investment (company_id, seq, month, level, has_round, amount)
+            SELECT c.id, e.seq,
+                   make_date(substr(e.rec->>'investAt', 1, 4)::int, substr(e.rec->>'investAt', 6, 2)::int, 1),
+                   e.rec->>'level',
+                   CASE jsonb_typeof(e.rec->'level')
+                       WHEN 'string' THEN e.rec->>'level' <> ''
+                       WHEN 'number' THEN (e.rec->>'level')::numeric <> 0
+                       WHEN 'boolean' THEN (e.rec->'level')::boolean
+                       WHEN 'array' THEN jsonb_array_length(e.rec->'level') > 0
+                       WHEN 'object' THEN e.rec->'level' <> '{}'::jsonb
+                       ELSE FALSE
+                   END,
+                   CASE WHEN jsonb_typeof(e.rec->'investmentAmount') = 'number' THEN (e.rec->>'investmentAmount')::numeric END
+            FROM company c
+            CROSS JOIN LATERAL jsonb_array_elements(CASE WHEN jsonb_typeof(c.data->'investment'->'data') = 'array'
+                                                         THEN c.data->'investment'->'data' ELSE '[]' END)
+                WITH ORDINALITY AS e(rec, seq)
+            WHERE c.id = ANY(%(ids)s)
+              AND e.rec->>'investAt' ~ '^\\d{4}-(0[1-9]|1[0-2])';
+
+            INSERT INTO company_finance (company_id, seq, year, net_profit)
+            SELECT c.id, e.seq, (e.rec->>'year')::int,
+                   CASE WHEN jsonb_typeof(e.rec->'netProfit') = 'number'
+                          OR e.rec->>'netProfit' ~ '^\\s*[-+]?(\\d+\\.?\\d*|\\.\\d+)([eE][-+]?\\d+)?\\s*$'
+                        THEN (e.rec->>'netProfit')::float8 END
+            FROM company c
+            CROSS JOIN LATERAL jsonb_array_elements(CASE WHEN jsonb_typeof(c.data->'finance'->'data') = 'array'
+                                                         THEN c.data->'finance'->'data' ELSE '[]' END)
+                WITH ORDINALITY AS e(rec, seq)
+            WHERE c.id = ANY(%(ids)s)
+              AND e.rec->>'year' ~ '^\\d{1,4}$';
+
+            INSERT INTO company_series_state (company_id) SELECT unnest(%(ids)s::int[]);
+            """,
+            {"ids": ids},
+        )
+
+    logger.info(f"[INFO] [Company Series] Ingested the time series of {len(ids)} companies")
+
+    return len(ids)
+
+def init_company_series():
+    """Make sure the company series tables exist (used at startup)"""
+
+    with get_connection() as conn:
+        create_company_series_tables(conn)
+
+
+if __name__ == "__main__":
+    # Run after loading the companies (e.g., example_datas/setup_company_data.py): python -m src.company_series
+    # and with --all to ingest every company again
+    with get_connection() as conn:
+        create_company_series_tables(conn)
+        ingest_company_series(conn, rebuild="--all" in sys.argv[1:])
@@ -0,0 +1,292 @@
+import os
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from psycopg2.pool import PoolError
+from dotenv import load_dotenv
+from logger_utils import logger
+
+load_dotenv(dotenv_path="./.env")
+
+
+DB_CONFIG = {
+    "host": os.getenv("POSTGRES_HOST", "localhost"),
+    "port": int(os.getenv("POSTGRES_PORT", 5432)),
+    "user": os.getenv("POSTGRES_USER", "searchright"),
+    "password": os.getenv("POSTGRES_PASSWORD", "searchright"),
+    "database": os.getenv("POSTGRES_DB", "searchright"),
+}
+
+POOL_CONFIG = {
+    "minconn": int(os.getenv("DB_POOL_MIN", 1)),
+    "maxconn": int(os.getenv("DB_POOL_MAX", 10)),
+    "timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),                                 # Seconds to wait for a free connection
+    "health_check_interval": float(os.getenv("DB_POOL_HEALTH_CHECK_INTERVAL", 30)),     # Idle seconds before a checkout is pinged
+}
+
+
+class PoolTimeoutError(PoolError):
+    """Raised when no connection becomes available within the checkout timeout"""
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of psycopg2 connections shared by the whole tagging pipeline
+
+    Connections are opened lazily up to `maxconn`, kept in autocommit mode and handed out LIFO.
+    A connection that sat idle longer than `health_check_interval` is pinged with `SELECT 1` before it is
+    handed out, and a broken one is transparently replaced. When the pool is saturated, callers wait up to
+    `timeout` seconds and then get a PoolTimeoutError.
+    """
+
+    def __init__(self, minconn: int = 1, maxconn: int = 10, timeout: float = 10.0,
+                 health_check_interval: float = 30.0, **db_config):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError(f"Invalid pool size: minconn={minconn}, maxconn={maxconn}")
+
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._db_config = db_config
+
+        self._cond = threading.Condition()
+        self._idle = deque()            # (connection, last time it was returned)
+        self._size = 0                  # Opened connections (idle + in use)
+        self._in_use = 0
+        self._waiting = 0
+        self._closed = False
+
+        # Saturation metrics
+        self._checkouts = 0
+        self._timeouts = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._discarded = 0
+        self._peak_in_use = 0
+
+        for _ in range(minconn):
+            self._idle.append((self._connect(), time.monotonic()))
+            self._size += 1
+
+        logger.info(f"[INFO] [DB Pool] Initialized connection pool (min={minconn}, max={maxconn}, timeout={timeout}s)")
+
+    def _connect(self):
+        conn = psycopg2.connect(**self._db_config)
+        conn.autocommit = True
+        return conn
+
+    def _is_healthy(self, conn, last_used: float) -> bool:
+        if conn.closed:
+            return False
+
+        if time.monotonic() - last_used < self.health_check_interval:
+            return True
+
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            return True
+        except psycopg2.Error as e:
+            logger.warning(f"[WARNING] [DB Pool] Health check failed, replacing the connection: {e}")
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        self._discarded += 1
+
+    def getconn(self, timeout: float | None = None):
+        """
+        Check out a connection from the pool
+
+        Parameter
+            - timeout (float | None): Seconds to wait for a free connection (default = the pool timeout)
+
+        Return
+            - conn: A healthy psycopg2 connection (must be given back with putconn)
+        """
+
+        wait_limit = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + wait_limit
+        conn, last_used = None, 0.0
+
+        with self._cond:
+            waited = False
+
+            while True:
+                if self._closed:
+                    raise PoolError("connection pool is closed")
+
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+
+                if self._size < self.maxconn:
+                    self._size += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    logger.error(f"[ERROR] [DB Pool] Checkout timed out after {wait_limit}s (in use: {self._in_use}/{self.maxconn})")
+                    raise PoolTimeoutError(f"No database connection available within {wait_limit}s")
+
+                waited = True
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+            self._in_use += 1
+            self._checkouts += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+
+            if waited:
+                self._waits += 1
+                self._wait_time += time.monotonic() - started
+
+        # Connect or ping outside of the lock so other threads are not blocked by network I/O
+        try:
+            if conn is not None and not self._is_healthy(conn, last_used):
+                with self._cond:
+                    self._discard(conn)
+                conn = None
+
+            if conn is None:
+                conn = self._connect()
+
+            return conn
+
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    def putconn(self, conn, close: bool = False):
+        """
+        Give a connection back to the pool
+
+        Parameters
+            - conn: The connection checked out with getconn
+            - close (bool): Close the connection instead of keeping it (default = False)
+        """
+
+        if not close and not conn.closed and conn.info.transaction_status != TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                close = True
+
+        with self._cond:
+            self._in_use -= 1
+
+            if close or conn.closed or self._closed:
+                self._size -= 1
+                self._discard(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout: float | None = None):
+        """Check out a connection for the duration of a `with` block"""
+
+        conn = self.getconn(timeout)
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self.putconn(conn, close=broken)
+
+    def stats(self) -> dict:
+        """
+        Return the pool saturation metrics
+
+        Return
+            - (dict): Pool size, usage and wait/timeout counters
+        """
+
+        with self._cond:
+            return {"min": self.minconn,
+                    "max": self.maxconn,
+                    "size": self._size,
+                    "in_use": self._in_use,
+                    "idle": len(self._idle),
+                    "waiting": self._waiting,
+                    "utilization": round(self._in_use / self.maxconn, 3),
+                    "peak_in_use": self._peak_in_use,
+                    "checkouts": self._checkouts,
+                    "waits": self._waits,
+                    "avg_wait_ms": round(self._wait_time / self._waits * 1000, 2) if self._waits else 0.0,
+                    "timeouts": self._timeouts,
+                    "discarded": self._discarded}
+
+    def closeall(self):
+        """Close every idle connection; in-use connections are closed when they are given back"""
+
+        with self._cond:
+            self._closed = True
+
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._size -= 1
+                self._discard(conn)
+
+            self._cond.notify_all()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    """Return the process-wide connection pool, creating it on first use"""
+
+    global _pool
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(**POOL_CONFIG, **DB_CONFIG)
+
+    return _pool
+
+@contextmanager
+def get_connection(timeout: float | None = None):
+    """
+    Check out a connection from the shared pool for one request
+
+    Parameter
+        - timeout (float | None): Seconds to wait for a free connection (default = DB_POOL_TIMEOUT)
+    """
+
+    with get_pool().connection(timeout) as conn:
+        yield conn
+
+def pool_stats() -> dict:
+    """Return the saturation metrics of the shared pool (empty if it was never used)"""
+
+    return _pool.stats() if _pool is not None else {}
+
+def close_pool():
+    """Close the shared pool (used on shutdown)"""
+
+    global _pool
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
@@ -0,0 +1,215 @@
+import os
+import hashlib
+import threading
+from contextlib import contextmanager
+import psycopg2
+from psycopg2.extras import execute_values
+from .db import get_connection, PoolTimeoutError
+from logger_utils import logger
+
+
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", 100000))
+EMBEDDING_CACHE_EVICT_EVERY = int(os.getenv("EMBEDDING_CACHE_EVICT_EVERY", 256))      # New entries written between eviction passes
+
+
+def cache_key(model: str, text: str) -> str:
+    """Content address of an embedding: sha256 of the model name and the exact text"""
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed embedding cache stored in the `embedding_cache` table
+
+    A hit refreshes `last_used_at`, and once the table grows past `max_entries` the least recently used
+    rows are evicted. Cache errors are logged and treated as misses, so they never break the embedding step;
+    they are counted apart from the genuine misses (and a pool timeout apart from the other errors).
+    The caller's connection is used when given, so a request does not check out a second one.
+    """
+
+    def __init__(self, max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES, evict_every: int = EMBEDDING_CACHE_EVICT_EVERY,
+                 enabled: bool = EMBEDDING_CACHE_ENABLED):
+        self.max_entries = max_entries
+        self.evict_every = evict_every
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._table_ready = False
+        self._pending_evict = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._evictions = 0
+        self._errors = 0
+        self._pool_timeouts = 0
+
+    def _ensure_table(self, cursor):
+        if self._table_ready:
+            return
+
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embedding_cache (
+                key TEXT PRIMARY KEY,
+                model VARCHAR(100) NOT NULL,
+                embedding DOUBLE PRECISION[] NOT NULL,
+                last_used_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE INDEX IF NOT EXISTS embedding_cache_last_used_idx ON embedding_cache (last_used_at);
+            """
+        )
+        self._table_ready = True
+
+    @staticmethod
+    @contextmanager
+    def _cursor(conn=None):
+        if conn is not None:
+            with conn.cursor() as cursor:
+                yield cursor
+        else:
+            with get_connection() as own_conn, own_conn.cursor() as cursor:
+                yield cursor
+
+    def _failed(self, action: str, e: Exception):
+        if isinstance(e, PoolTimeoutError):
+            logger.warning(f"[WARNING] [Embedding Cache] No free database connection, {action}: {e}")
+        else:
+            logger.warning(f"[WARNING] [Embedding Cache] Database error, {action}: {e}")
+
+        with self._lock:
+            if isinstance(e, PoolTimeoutError):
+                self._pool_timeouts += 1
+            else:
+                self._errors += 1
+
+    def get_many(self, model: str, texts: list[str], conn=None) -> list[list[float] | None]:
+        """
+        Look up the cached vectors of the texts
+
+        Parameters
+            - model (str): The embedding model
+            - texts (list[str]): The texts to look up
+            - conn (connection | None): The connection of the caller (default = None, check out a pooled one)
+
+        Return
+            - vectors (list[list[float] | None]): The cached vectors in the order of the texts (None on a miss)
+        """
+
+        if not self.enabled or not texts:
+            return [None] * len(texts)
+
+        keys = [cache_key(model, text) for text in texts]
+
+        try:
+            with self._cursor(conn) as cursor:
+                self._ensure_table(cursor)
+
+                # One round-trip: fetch the hits and refresh their recency
+                cursor.execute(
+                    """
+                    UPDATE embedding_cache SET last_used_at = CURRENT_TIMESTAMP
+                    WHERE key = ANY(%s::text[])
+                    RETURNING key, embedding
+                    """,
+                    (list(set(keys)),),
+                )
+                found = dict(cursor.fetchall())
+
+        except psycopg2.Error as e:
+            # Not counted as misses: the texts may well be cached
+            self._failed("embedding without cache", e)
+            return [None] * len(texts)
+
+        vectors = [found.get(key) for key in keys]
+        hits = sum(vector is not None for vector in vectors)
+
+        with self._lock:
+            self._hits += hits
+            self._misses += len(texts) - hits
+
+        logger.info(f"[INFO] [Embedding Cache] {hits}/{len(texts)} hits")
+
+        return vectors
+
+    def put_many(self, model: str, texts: list[str], vectors: list[list[float] | None], conn=None):
+        """
+        Store the embedded vectors (None entries are skipped)
+
+        Parameters
+            - model (str): The embedding model
+            - texts (list[str]): The embedded texts
+            - vectors (list[list[float] | None]): The vectors in the order of the texts
+            - conn (connection | None): The connection of the caller (default = None, check out a pooled one)
+        """
+
+        if not self.enabled:
+            return
+
+        rows = {cache_key(model, text): (model, vector) for text, vector in zip(texts, vectors) if vector is not None}
+        if not rows:
+            return
+
+        try:
+            with self._cursor(conn) as cursor:
+                self._ensure_table(cursor)
+
+                execute_values(cursor,
+                               """
+                               INSERT INTO embedding_cache (key, model, embedding) VALUES %s
+                               ON CONFLICT (key) DO UPDATE SET last_used_at = CURRENT_TIMESTAMP
+                               """,
+                               [(key, model, vector) for key, (model, vector) in rows.items()])
+
+                with self._lock:
+                    self._writes += len(rows)
+                    self._pending_evict += len(rows)
+                    evict = self._pending_evict >= self.evict_every
+                    if evict:
+                        self._pending_evict = 0
+
+                if evict:
+                    self._evict(cursor)
+
+        except psycopg2.Error as e:
+            self._failed(f"{len(rows)} vectors not stored", e)
+
+    def _evict(self, cursor):
+        """Delete the least recently used rows beyond `max_entries`"""
+
+        cursor.execute(
+            """
+            DELETE FROM embedding_cache
+            WHERE key IN (
+                SELECT key FROM embedding_cache
+                ORDER BY last_used_at DESC
+                OFFSET %s
+            )
+            """,
+            (self.max_entries,),
+        )
+
+        if cursor.rowcount > 0:
+            logger.info(f"[INFO] [Embedding Cache] Evicted {cursor.rowcount} least recently used vectors")
+            with self._lock:
+                self._evictions += cursor.rowcount
+
+    def stats(self) -> dict:
+        """Return the hit/miss counters of this process"""
+
+        with self._lock:
+            lookups = self._hits + self._misses
+
+            return {"enabled": self.enabled,
+                    "max_entries": self.max_entries,
+                    "hits": self._hits,
+                    "misses": self._misses,
+                    "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+                    "writes": self._writes,
+                    "evictions": self._evictions,
+                    "errors": self._errors,
+                    "pool_timeouts": self._pool_timeouts}
+
+
+embedding_cache = EmbeddingCache()
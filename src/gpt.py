@@ -1,7 +1,12 @@
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import OpenAI, BadRequestError, PermissionDeniedError
 import os
+import hashlib
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from .embedding_cache import embedding_cache
+from .cache import LRUCache, SingleFlight
+from .cancellation import CancelToken, PipelineCancelled, raise_if_cancelled
 from logger_utils import logger
 
 load_dotenv(dotenv_path="./.env")
@@ -10,6 +15,15 @@ client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 CHUNK_SIZE = 1000
 TEXT_TOKEN_LIMIT = 1000
 
+SYSTEM_PROMPT = "You are a specialist in precisely inferring talent tags."
+TAG_CACHE_MAX_ENTRIES = int(os.getenv("TAG_CACHE_MAX_ENTRIES", 1024))
+TAG_CACHE_TTL = float(os.getenv("TAG_CACHE_TTL", 86400))                           # Seconds a generated tag response is reused
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 256))                 # Inputs sent in one /v1/embeddings request
+EMBEDDING_MAX_CONCURRENCY = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", 4))         # Concurrent requests when there are several batches
+EMBEDDING_MIN_COVERAGE = float(os.getenv("EMBEDDING_MIN_COVERAGE", 0.5))           # Share of the text that must be embedded
+
 def build_prompt(profile_summary: str) -> str:
     """
     Build the prompt to get tags from GPT model
@@ -51,30 +65,110 @@ Please follow these instructions:
 
     return prompt
 
-def gen_tags(prompt: str, model: str = "gpt-5-mini") -> str:
+tag_cache = LRUCache(max_entries=TAG_CACHE_MAX_ENTRIES, ttl=TAG_CACHE_TTL)
+_tag_flight = SingleFlight()
+
+def gen_tags(prompt: str, model: str = "gpt-5-mini", cancel: CancelToken | None = None) -> str:
     """
     Call the GPT model to generate tags
 
+    Responses are cached by (model, system prompt, prompt) for TAG_CACHE_TTL seconds, and concurrent
+    identical requests share a single upstream call.
+    With a cancel token, the response is streamed so that cancelling closes the upstream request.
+
     Parameters
         - prompt (str): The prompt to put into the GPT model
         - model (str): The name of the GPT model that will be used (default = "gpt-5-mini")
+        - cancel (CancelToken | None): Aborts the request when cancelled (default = None)
     
     Returns
         - str: The model response
     """
+
+    key = hashlib.sha256(f"{model}\0{SYSTEM_PROMPT}\0{prompt}".encode("utf-8")).hexdigest()
+
+    while True:
+        raise_if_cancelled(cancel, "tag generation")
+
+        cached = tag_cache.get(key)
+        if cached is not None:
+            logger.info("[INFO] Reuse the cached GPT tag response")
+            return cached
+
+        try:
+            return _tag_flight.do(key, lambda: _gen_tags_uncached(key, prompt, model, cancel))
+        except PipelineCancelled:
+            # The shared call was cancelled by another caller; ask again unless this caller was cancelled too
+            if cancel is None or cancel.cancelled:
+                raise
+            logger.info("[INFO] The shared GPT request was cancelled by another caller. Retry")
+
+def _gen_tags_uncached(key: str, prompt: str, model: str, cancel: CancelToken | None = None) -> str:
+    """Request the tags from the GPT model and cache a successful response"""
+
+    # A call for the same key may have finished between the cache lookup and this one
+    cached = tag_cache.get(key)
+    if cached is not None:
+        return cached
+
+    messages = [{"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}]
+
     try:
-        response = client.chat.completions.create(model=model,
-                                                  messages=[
-                                                      {"role": "system", "content": "You are a specialist in precisely inferring talent tags."},
-                                                      {"role": "user", "content": prompt}
-                                                  ],)
-        
-        return response.choices[0].message.content.strip()
-    
+        if cancel is not None:
+            content = _stream_completion(messages, model, cancel)
+        else:
+            response = client.chat.completions.create(model=model,
+                                                      messages=messages,)
+            content = response.choices[0].message.content
+
+        content = (content or "").strip()
+
+        if content:
+            tag_cache.set(key, content)
+
+        return content
+
+    except PipelineCancelled:
+        raise
+
     except Exception as e:
+        if cancel is not None and cancel.cancelled:
+            raise PipelineCancelled("Cancelled during tag generation") from e
+
         logger.error(f"[ERROR] Fail to load GPT: {e}")
         return ""
 
+def _stream_completion(messages: list[dict], model: str, cancel: CancelToken) -> str:
+    """Stream the chat completion, closing the HTTP response as soon as the token is cancelled"""
+
+    try:
+        stream = client.chat.completions.create(model=model,
+                                                messages=messages,
+                                                stream=True,)
+    except (BadRequestError, PermissionDeniedError) as e:
+        # Some models or organizations cannot stream. Then the request can only be abandoned between stages
+        logger.warning(f"[WARNING] Streaming is not available ({e}). Use a blocking request")
+        raise_if_cancelled(cancel, "tag generation")
+        response = client.chat.completions.create(model=model,
+                                                  messages=messages,)
+        return response.choices[0].message.content
+
+    parts = []
+
+    with cancel.on_cancel(stream.close):
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+
+    raise_if_cancelled(cancel, "tag parsing")
+
+    return "".join(parts)
+
+def tag_cache_stats() -> dict:
+    """Return the counters of the tag response cache and its request coalescing"""
+    return {**tag_cache.stats(), **_tag_flight.stats()}
+
 def parse_gpt_tags(output: str) -> list[dict]:
     """
     Convert the GPT output to the JSON format
@@ -108,44 +202,129 @@ def parse_gpt_tags(output: str) -> list[dict]:
 
     return tags
 
-def _embedding(profile: str, model: str = "text-embedding-3-small") -> list[float]:
+def _embedding_batch(texts: list[str], model: str = EMBEDDING_MODEL) -> list[list[float] | None]:
     """
-    Perform embedding using the GPT model
+    Embed several texts with a single batched request
 
     Parameters
-        - profile (str): The profile summary of the talent
+        - texts (list[str]): The texts to embed
         - model (str): The GPT embedding model (default = text-embedding-3-small)
 
     Return
-        - vector (list[float]): The embedded profile summary of the talent
+        - vectors (list[list[float] | None]): The vectors in the order of the texts. If the request fails, every entry is None
     """
-    
-    # Get response from the model
+
     try:
-        logger.info(f"[INFO] Start the profile embedding")
+        logger.info(f"[INFO] Start the batched embedding: {len(texts)} inputs")
         response = client.embeddings.create(model=model,
-                                            input=profile)
-        
-        vector = response.data[0].embedding
+                                            input=texts)
+
+        vectors = [None] * len(texts)
+        for item in response.data:
+            vectors[item.index] = item.embedding
+
+        return vectors
 
-        return vector
-    
     except Exception as e:
-        logger.error(f"[ERROR] Embedding error: {e}")
-        return None
+        logger.error(f"[ERROR] Batched embedding error ({len(texts)} inputs): {e}")
+        return [None] * len(texts)
+
+def embed_texts(texts: list[str], model: str = EMBEDDING_MODEL,
+                batch_size: int = EMBEDDING_BATCH_SIZE, max_concurrency: int = EMBEDDING_MAX_CONCURRENCY,
+                conn=None) -> list[list[float] | None]:
+    """
+    Embed the texts with as few requests as possible
+
+    Texts already in the embedding cache are not sent again, and duplicated texts are sent once.
+    The rest go into one request, unless there are more than `batch_size` of them.
+    Then the batches are sent as concurrent requests (at most `max_concurrency` in flight).
+
+    Parameters
+        - texts (list[str]): The texts to embed
+        - model (str): The GPT embedding model (default = text-embedding-3-small)
+        - batch_size (int): The maximum number of inputs in one request (default = EMBEDDING_BATCH_SIZE)
+        - max_concurrency (int): The maximum number of concurrent requests (default = EMBEDDING_MAX_CONCURRENCY)
+        - conn (connection | None): The connection used by the embedding cache (default = None, check out a pooled one)
+
+    Return
+        - vectors (list[list[float] | None]): The vectors in the order of the texts (None for the texts of a failed batch)
+    """
+
+    if not texts:
+        return []
+
+    vectors = embedding_cache.get_many(model, texts, conn=conn)
+    missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+
+    if not missing:
+        return vectors
+
+    batches = [missing[i:i+batch_size] for i in range(0, len(missing), batch_size)]
+
+    if len(batches) == 1:
+        fetched = _embedding_batch(batches[0], model)
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(batches)), thread_name_prefix="embedding") as executor:
+            results = executor.map(lambda batch: _embedding_batch(batch, model), batches)
+            fetched = [vector for batch_vectors in results for vector in batch_vectors]
+
+    embedding_cache.put_many(model, missing, fetched, conn=conn)
+    fetched_by_text = dict(zip(missing, fetched))
+
+    return [vector if vector is not None else fetched_by_text[text] for text, vector in zip(texts, vectors)]
 
 def split_text(text, max_tokens):
     # 단순히 문자 수 기준으로 자르기
     return [text[i:i+max_tokens] for i in range(0, len(text), max_tokens)]
 
-def profile_embedding(text) -> list[float]:
+def average_embeddings(vectors: list[list[float] | None], weights: list[float]) -> list[float] | None:
+    """
+    Weighted average of the chunk vectors, skipping the chunks that failed to embed
+
+    Parameters
+        - vectors (list[list[float] | None]): The chunk vectors (None for a failed chunk)
+        - weights (list[float]): The weight of each chunk (e.g., its length)
+
+    Return
+        - (list[float] | None): The averaged vector, or None if no chunk was embedded
+    """
+
+    embedded = [(vector, weight) for vector, weight in zip(vectors, weights) if vector is not None and weight > 0]
+
+    if not embedded:
+        return None
+
+    matrix = np.asarray([vector for vector, _ in embedded], dtype=np.float64)
+    chunk_weights = np.asarray([weight for _, weight in embedded], dtype=np.float64)
+
+    return np.average(matrix, axis=0, weights=chunk_weights).tolist()
+
+def profile_embedding(text, cancel: CancelToken | None = None, conn=None) -> list[float] | None:
     """
     If the length of the profile summary is longer than the token limit,
-    then chunk the profile summary and get the average of the chunks
+    then chunk the profile summary and get the average of the chunks (weighted by the chunk length)
+
+    All chunks are embedded with one batched request. Chunks that fail are left out of the average,
+    but if less than EMBEDDING_MIN_COVERAGE of the text was embedded, None is returned.
+    A cancelled token (optional) raises PipelineCancelled before and after the request.
+    The embedding cache uses the connection of the request when one is given.
     """
 
+    raise_if_cancelled(cancel, "embedding")
+
     chunks = split_text(text, TEXT_TOKEN_LIMIT)
-    vectors = [_embedding(chunk) for chunk in chunks]
-    avg_vector = np.mean(vectors, axis=0)
+    vectors = embed_texts(chunks, conn=conn)
+
+    raise_if_cancelled(cancel, "similarity search")
+
+    lengths = [len(chunk) for chunk in chunks]
+    embedded_length = sum(length for vector, length in zip(vectors, lengths) if vector is not None)
+
+    if not chunks or embedded_length < EMBEDDING_MIN_COVERAGE * sum(lengths):
+        logger.error(f"[ERROR] Embedded only {embedded_length}/{sum(lengths)} characters of the profile summary")
+        return None
+
+    if embedded_length < sum(lengths):
+        logger.warning(f"[WARNING] Some chunks failed to embed. Averaging {embedded_length}/{sum(lengths)} characters")
 
-    return avg_vector.tolist()
\ No newline at end of file
+    return average_embeddings(vectors, lengths)
@@ -0,0 +1,327 @@
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import psycopg2
+from psycopg2.extras import Json
+from .db import get_connection
+from .processor import process_talent
+from logger_utils import logger
+
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))                      # Talents processed concurrently by the job workers
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))            # A job interrupted this many times is marked failed
+JOB_RECOVER_AFTER = int(os.getenv("JOB_RECOVER_AFTER", 120))        # Seconds without a heartbeat after which a 'running' job is considered abandoned
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", 30))     # Seconds between the heartbeats of the running jobs (keep well below JOB_RECOVER_AFTER)
+JOB_RECOVER_INTERVAL = float(os.getenv("JOB_RECOVER_INTERVAL", 60))         # Seconds between the recoveries of abandoned jobs
+
+
+def create_job_table(conn):
+    """talent_job 테이블 생성 (존재하지 않을 경우)"""
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS talent_job (
+                    id UUID PRIMARY KEY,
+                    status VARCHAR(20) NOT NULL,
+                    threshold DOUBLE PRECISION NOT NULL,
+                    talent JSONB NOT NULL,
+                    tags JSONB,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+                CREATE INDEX IF NOT EXISTS talent_job_pending_idx
+                    ON talent_job (created_at) WHERE status IN ('queued', 'running');
+                """
+            )
+    except psycopg2.Error as e:
+        logger.error(f"[ERROR] talent_job 테이블 생성 오류: {e}")
+        raise
+
+
+class JobQueue:
+    """
+    Run process_talent in a local worker pool, with the job state stored in the `talent_job` table
+
+    A job goes queued -> running -> done | failed. Because the talent data is stored with the job,
+    jobs left queued or running by a crashed worker are picked up again by `recover`.
+    A job is claimed with a conditional UPDATE, so it runs only once even if several processes recover it.
+
+    The running jobs of the process are kept alive by a heartbeat (their `updated_at` is refreshed), so a job
+    whose heartbeat stopped for JOB_RECOVER_AFTER seconds was abandoned. `start_maintenance` runs the heartbeat
+    and the recovery periodically, so an abandoned job is picked up without waiting for a restart.
+    """
+
+    def __init__(self, max_workers: int = JOB_WORKERS):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="talent-job")
+        self._table_ready = False
+        self._lock = threading.Lock()
+
+        self._local = set()             # Jobs handed to the worker pool of this process and not finished yet
+        self._running = set()           # Jobs claimed by this process (kept alive by the heartbeat)
+        self._stop = threading.Event()
+        self._maintenance = None
+
+    def _ensure_table(self, conn):
+        if not self._table_ready:
+            with self._lock:
+                if not self._table_ready:
+                    create_job_table(conn)
+                    self._table_ready = True
+
+    def submit(self, talent: dict, threshold: float = 0.85) -> str:
+        """
+        Store a new job and hand it to the worker pool
+
+        Parameters
+            - talent (dict): The decoded talent data
+            - threshold (float): The similarity threshold (default = 0.85)
+
+        Return
+            - job_id (str): The id to poll the job with
+        """
+
+        job_id = str(uuid.uuid4())
+
+        with get_connection() as conn:
+            self._ensure_table(conn)
+
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "INSERT INTO talent_job (id, status, threshold, talent) VALUES (%s, 'queued', %s, %s)",
+                    (job_id, threshold, Json(talent)),
+                )
+
+        self._dispatch(job_id)
+        logger.info(f"[INFO] [Job] Queued job {job_id}")
+
+        return job_id
+
+    def _dispatch(self, job_id: str) -> bool:
+        """Hand a job to the worker pool, unless it is already there"""
+
+        with self._lock:
+            if job_id in self._local:
+                return False
+            self._local.add(job_id)
+
+        self._executor.submit(self._run, job_id)
+        return True
+
+    def _claim(self, job_id: str):
+        with get_connection() as conn, conn.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE talent_job
+                SET status = 'running', attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s AND status = 'queued'
+                RETURNING talent, threshold
+                """,
+                (job_id,),
+            )
+            return cursor.fetchone()
+
+    def _finish(self, job_id: str, tags=None, error: str | None = None):
+        with get_connection() as conn, conn.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE talent_job
+                SET status = %s, tags = %s, error = %s, updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s
+                """,
+                ('failed' if error is not None else 'done', Json(tags) if tags is not None else None, error, job_id),
+            )
+
+    def _run(self, job_id: str):
+        try:
+            self._run_claimed(job_id)
+        finally:
+            with self._lock:
+                self._local.discard(job_id)
+                self._running.discard(job_id)
+
+    def _run_claimed(self, job_id: str):
+        try:
+            claimed = self._claim(job_id)
+        except Exception as e:
+            logger.exception(f"[ERROR] [Job] Failed to claim job {job_id}: {e}")
+            return
+
+        if claimed is None:
+            logger.info(f"[INFO] [Job] Job {job_id} was already claimed")
+            return
+
+        with self._lock:
+            self._running.add(job_id)
+
+        talent, threshold = claimed
+        logger.info(f"[INFO] [Job] Running job {job_id}")
+
+        try:
+            tags = process_talent(talent, threshold)
+            self._finish(job_id, tags=tags)
+            logger.info(f"[INFO] [Job] Completed job {job_id}")
+        except Exception as e:
+            logger.exception(f"[ERROR] [Job] Job {job_id} failed: {e}")
+            try:
+                self._finish(job_id, error=str(e))
+            except Exception:
+                logger.exception(f"[ERROR] [Job] Failed to store the error of job {job_id}")
+
+    def heartbeat(self) -> int:
+        """
+        Refresh the running jobs of this process, so they are not recovered while they run
+
+        Return
+            - (int): The number of jobs refreshed
+        """
+
+        with self._lock:
+            job_ids = list(self._running)
+
+        if not job_ids:
+            return 0
+
+        with get_connection() as conn, conn.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE talent_job SET updated_at = CURRENT_TIMESTAMP
+                WHERE id = ANY(%s::uuid[]) AND status = 'running'
+                """,
+                (job_ids,),
+            )
+            return cursor.rowcount
+
+    def get(self, job_id: str) -> dict | None:
+        """
+        Get the status of a job
+
+        Parameter
+            - job_id (str): The job id
+
+        Return
+            - (dict | None): The job status, tags and error, or None if there is no such job
+        """
+
+        try:
+            uuid.UUID(job_id)
+        except ValueError:
+            return None
+
+        with get_connection() as conn:
+            self._ensure_table(conn)
+
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT status, tags, error, attempts, created_at, updated_at FROM talent_job WHERE id = %s",
+                    (job_id,),
+                )
+                row = cursor.fetchone()
+
+        if row is None:
+            return None
+
+        status, tags, error, attempts, created_at, updated_at = row
+
+        return {"job_id": job_id,
+                "status": status,
+                "tags": tags,
+                "error": error,
+                "attempts": attempts,
+                "created_at": created_at.isoformat() if created_at else None,
+                "updated_at": updated_at.isoformat() if updated_at else None}
+
+    def recover(self) -> int:
+        """
+        Re-queue the jobs a worker left behind (queued, or running without a heartbeat for JOB_RECOVER_AFTER seconds)
+
+        Return
+            - (int): The number of jobs handed to the worker pool (the jobs already in it are not counted)
+        """
+
+        with get_connection() as conn:
+            self._ensure_table(conn)
+
+            with conn.cursor() as cursor:
+                # Jobs interrupted too many times are not retried forever
+                cursor.execute(
+                    """
+                    UPDATE talent_job
+                    SET status = 'failed', error = 'Interrupted too many times', updated_at = CURRENT_TIMESTAMP
+                    WHERE status = 'running' AND attempts >= %s
+                      AND updated_at < CURRENT_TIMESTAMP - make_interval(secs => %s)
+                    """,
+                    (JOB_MAX_ATTEMPTS, JOB_RECOVER_AFTER),
+                )
+                cursor.execute(
+                    """
+                    UPDATE talent_job
+                    SET status = 'queued', updated_at = CURRENT_TIMESTAMP
+                    WHERE status = 'running' AND updated_at < CURRENT_TIMESTAMP - make_interval(secs => %s)
+                    """,
+                    (JOB_RECOVER_AFTER,),
+                )
+                cursor.execute("SELECT id FROM talent_job WHERE status = 'queued' ORDER BY created_at")
+                job_ids = [str(row[0]) for row in cursor.fetchall()]
+
+        recovered = sum(self._dispatch(job_id) for job_id in job_ids)
+
+        if recovered:
+            logger.info(f"[INFO] [Job] Recovered {recovered} pending jobs")
+
+        return recovered
+
+    def start_maintenance(self, heartbeat_interval: float = JOB_HEARTBEAT_INTERVAL,
+                          recover_interval: float = JOB_RECOVER_INTERVAL):
+        """Start the background thread that sends the heartbeats and recovers the abandoned jobs (once per queue)"""
+
+        with self._lock:
+            if self._maintenance is not None:
+                return
+
+            self._stop.clear()
+            self._maintenance = threading.Thread(target=self._maintain, args=(heartbeat_interval, recover_interval),
+                                                 name="talent-job-maintenance", daemon=True)
+            self._maintenance.start()
+
+    def _maintain(self, heartbeat_interval: float, recover_interval: float):
+        last_recover = time.monotonic()
+
+        while not self._stop.wait(min(heartbeat_interval, recover_interval)):
+            try:
+                self.heartbeat()
+            except Exception as e:
+                logger.warning(f"[WARNING] [Job] Heartbeat failed: {e}")
+
+            if time.monotonic() - last_recover >= recover_interval:
+                last_recover = time.monotonic()
+
+                try:
+                    self.recover()
+                except Exception as e:
+                    logger.warning(f"[WARNING] [Job] Recovery failed: {e}")
+
+    def shutdown(self):
+        self._stop.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide job queue, creating it on first use"""
+
+    global _job_queue
+
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                _job_queue = JobQueue()
+
+    return _job_queue
@@ -0,0 +1,102 @@
+from collections import deque
+from functools import lru_cache
+from logger_utils import logger
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a fixed keyword set
+
+    The automaton is built once; `matches` then finds every keyword contained in a text in a single pass
+    over the text, whatever the number of keywords. A keyword matches wherever `keyword in text` would
+    (case-sensitive substring match).
+
+    Parameter
+        - keywords (list[str]): The keywords to find (empty and duplicated keywords are ignored)
+    """
+
+    def __init__(self, keywords: list[str]):
+        self.keywords = tuple(dict.fromkeys(keyword for keyword in keywords if keyword))
+
+        # State 0 is the root. goto[state] maps a character to the next state (a missing one goes back to the root)
+        self._goto = [{}]
+        self._out = [()]
+
+        for keyword in self.keywords:
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._out.append(())
+                state = next_state
+            self._out[state] = self._out[state] + (keyword,)
+
+        # Breadth-first: the failure link of a state is the longest proper suffix that is also a prefix.
+        # The transitions of the failure state are merged in, so matching never follows a failure link
+        children = [dict(goto) for goto in self._goto]
+        fail = [0] * len(self._goto)
+        queue = deque([0])
+
+        while queue:
+            state = queue.popleft()
+
+            for char, next_state in children[state].items():
+                queue.append(next_state)
+
+                fail[next_state] = self._goto[fail[state]].get(char, 0) if state else 0
+                self._out[next_state] = self._out[next_state] + self._out[fail[next_state]]
+                self._goto[next_state] = {**self._goto[fail[next_state]], **children[next_state]}
+
+    def matches(self, text: str) -> set[str]:
+        """
+        Find the keywords contained in the text
+
+        Parameter
+            - text (str): The text to search
+
+        Return
+            - (set[str]): The keywords found in the text
+        """
+
+        found = set()
+        state = 0
+        goto, out = self._goto, self._out
+
+        for char in text:
+            state = goto[state].get(char, 0)
+
+            if out[state]:
+                found.update(out[state])
+
+        return found
+
+
+@lru_cache(maxsize=32)
+def get_matcher(keywords: tuple[str, ...]) -> KeywordMatcher:
+    """Return the matcher of a keyword set, built once per process and keyword set"""
+
+    logger.info(f"[INFO] Building the keyword matcher: {len(keywords)} keywords")
+    return KeywordMatcher(list(keywords))
+
+def load_keywords(path: str) -> list[str]:
+    """
+    Load a keyword list from a text file (one keyword per line, or comma separated; '#' starts a comment)
+
+    Parameter
+        - path (str): The path of the keyword file
+
+    Return
+        - keywords (list[str]): The keywords in the order of the file
+    """
+
+    keywords = []
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0]
+            keywords.extend(keyword.strip() for keyword in line.split(",") if keyword.strip())
+
+    return keywords
@@ -0,0 +1,499 @@
+import os
+import sys
+import math
+import threading
+from collections import Counter
+from functools import lru_cache
+import psycopg2
+from psycopg2.extras import execute_values, Json
+import MeCab
+from .db import get_connection
+from .cache import LRUCache
+from .keyword_matcher import get_matcher, load_keywords
+from logger_utils import logger
+
+
+NEWS_TOKEN_CACHE_SIZE = int(os.getenv("NEWS_TOKEN_CACHE_SIZE", 65536))   # News titles whose tokens are kept
+NEWS_STATS_TTL = float(os.getenv("NEWS_STATS_TTL", 600))                # Seconds the news statistics of a company are reused
+NEWS_INDEX_BATCH_SIZE = 1000                                            # Titles tokenized per UPDATE when indexing
+NEWS_ROLLUP_CANDIDATES = 10                                             # Titles kept per company and month (the news summary ranks the top 10 of a window)
+NEWS_KEYWORDS_FILE = os.getenv("NEWS_KEYWORDS_FILE")                    # Keyword file for the news scoring (default: NEWS_KEYWORDS)
+
+# Keywords that make a news title worth showing (scored by news_summary.get_3_news)
+NEWS_KEYWORDS = ['매출', '흑자', '적자', '실적', '이익', '수익', '영업이익', '재무', '성장', '분기', '연간', '달성',
+                 '해외진출', '확장', '진출', '글로벌', '출시', '오픈', '출범', '런칭', '사업', '전략', '개편',
+                 'AI', '기술', '신기술', '서비스', '개발', '혁신', '솔루션', 'API', '모델', '플랫폼',
+                 '채용', '인재', '조직', '인사', '대표', 'CEO', '팀', '임원', '인력', '리더십',
+                 '투자', '시리즈', 'M&A', '인수', '지분', '유치', '펀딩', '상장', 'IPO',
+                 '사용자', '고객', 'MAU', '트래픽', '리텐션', '시장', '점유율', '경쟁', '반응',
+                 '규제', '이슈', '소송', '법', '정부', '정책', '감사', '과징금', '제재']
+
+
+_tagger = None
+_tagger_lock = threading.Lock()         # Guards the creation of the tagger
+_parse_lock = threading.Lock()          # A MeCab tagger must not parse from several threads at once
+
+def get_tagger():
+    """Return the process-wide MeCab tagger, loading the dictionary on first use"""
+
+    global _tagger
+
+    if _tagger is None:
+        with _tagger_lock:
+            if _tagger is None:
+                _tagger = MeCab.Tagger(f"-r {os.getenv('MECABRC')} -d {os.getenv('DIC_PATH')}")
+                logger.info("[INFO] Completed loading the MeCab tagger")
+
+    return _tagger
+
+@lru_cache(maxsize=NEWS_TOKEN_CACHE_SIZE)
+def tokenize(text: str) -> tuple[str, ...]:
+    """
+    Tokenize a news title with MeCab (memoized per title text)
+
+    Parameter
+        - text (str): The news title
+
+    Return
+        - (tuple[str, ...]): The surface forms of the tokens
+    """
+
+    tagger = get_tagger()
+
+    with _parse_lock:
+        parsed = tagger.parse(text)
+
+    if parsed is None:
+        logger.warning("[WARNING] The result of MeCab parsing is None")
+        return ()
+
+    return tuple(line.split('\t')[0] for line in parsed.splitlines() if '\t' in line)
+
+def title_tokens(title: str) -> list[str]:
+    """The tokens of a title as they are indexed (lowercased first, like the TF-IDF vectorizer does)"""
+    return list(tokenize(title.lower()))
+
+@lru_cache(maxsize=1)
+def news_keywords() -> tuple[str, ...]:
+    """Return the news scoring keywords: NEWS_KEYWORDS_FILE if it is set and readable, otherwise NEWS_KEYWORDS (read once)"""
+
+    if NEWS_KEYWORDS_FILE:
+        try:
+            keywords = load_keywords(NEWS_KEYWORDS_FILE)
+
+            if keywords:
+                logger.info(f"[INFO] Loaded {len(keywords)} news keywords from {NEWS_KEYWORDS_FILE}")
+                return tuple(keywords)
+
+            logger.warning(f"[WARNING] No keyword in {NEWS_KEYWORDS_FILE}, using the default news keywords")
+        except OSError as e:
+            logger.error(f"[ERROR] Fail to load the news keywords from {NEWS_KEYWORDS_FILE}, using the default ones: {e}")
+
+    return tuple(NEWS_KEYWORDS)
+
+def token_cache_stats() -> dict:
+    """Return the counters of the news title token cache"""
+
+    info = tokenize.cache_info()
+    lookups = info.hits + info.misses
+
+    return {"size": info.currsize,
+            "max_entries": info.maxsize,
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_rate": round(info.hits / lookups, 3) if lookups else 0.0}
+
+
+def create_news_index_tables(conn):
+    """
+    Add the `tokens` column to company_news and create the company_news_stats and company_news_rollup tables (if they do not exist)
+
+    Triggers on company_news clear `rolled_up` of the companies whose news are inserted, updated or deleted.
+    """
+
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                ALTER TABLE company_news ADD COLUMN IF NOT EXISTS tokens TEXT[];
+
+                CREATE TABLE IF NOT EXISTS company_news_stats (
+                    company_id INTEGER PRIMARY KEY REFERENCES company(id) ON DELETE CASCADE,
+                    n_docs INTEGER NOT NULL,
+                    df JSONB NOT NULL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+
+                -- Whether the monthly rollups of the company match its statistics
+                ALTER TABLE company_news_stats ADD COLUMN IF NOT EXISTS rolled_up BOOLEAN NOT NULL DEFAULT FALSE;
+
+                CREATE TABLE IF NOT EXISTS company_news_rollup (
+                    company_id INTEGER NOT NULL REFERENCES company(id) ON DELETE CASCADE,
+                    month DATE NOT NULL,
+                    n_news INTEGER NOT NULL,
+                    candidates JSONB NOT NULL,
+                    PRIMARY KEY (company_id, month)
+                );
+
+                -- Any change to the news of a company (a loader, a manual insert...) makes its rollups stale,
+                -- in the same transaction, so the summaries use the full news until the next index_news
+                CREATE OR REPLACE FUNCTION mark_company_news_stale() RETURNS trigger AS $$
+                BEGIN
+                    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                        UPDATE company_news_stats SET rolled_up = FALSE
+                        WHERE rolled_up AND company_id IN (SELECT company_id FROM old_news);
+                    END IF;
+                    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                        UPDATE company_news_stats SET rolled_up = FALSE
+                        WHERE rolled_up AND company_id IN (SELECT company_id FROM new_news);
+                    END IF;
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql;
+
+                DO $$
+                BEGIN
+                    IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgrelid = 'company_news'::regclass AND tgname = 'company_news_stale_insert') THEN
+                        CREATE TRIGGER company_news_stale_insert AFTER INSERT ON company_news
+                            REFERENCING NEW TABLE AS new_news
+                            FOR EACH STATEMENT EXECUTE FUNCTION mark_company_news_stale();
+                    END IF;
+                    IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgrelid = 'company_news'::regclass AND tgname = 'company_news_stale_update') THEN
+                        CREATE TRIGGER company_news_stale_update AFTER UPDATE ON company_news
+                            REFERENCING OLD TABLE AS old_news NEW TABLE AS new_news
+                            FOR EACH STATEMENT EXECUTE FUNCTION mark_company_news_stale();
+                    END IF;
+                    IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgrelid = 'company_news'::regclass AND tgname = 'company_news_stale_delete') THEN
+                        CREATE TRIGGER company_news_stale_delete AFTER DELETE ON company_news
+                            REFERENCING OLD TABLE AS old_news
+                            FOR EACH STATEMENT EXECUTE FUNCTION mark_company_news_stale();
+                    END IF;
+                END;
+                $$;
+                """
+            )
+    except psycopg2.Error as e:
+        logger.error(f"[ERROR] [News Index] Failed to create the news index tables: {e}")
+        raise
+
+def tokenize_pending_news(conn, batch_size: int = NEWS_INDEX_BATCH_SIZE) -> set[int]:
+    """
+    Store the tokens of the news titles that were not tokenized yet
+
+    Parameters
+        - batch_size (int): The number of titles updated at once (default = NEWS_INDEX_BATCH_SIZE)
+
+    Return
+        - company_ids (set[int]): The companies whose news changed
+    """
+
+    company_ids = set()
+    total = 0
+
+    while True:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT id, company_id, title FROM company_news WHERE tokens IS NULL ORDER BY id LIMIT %s",
+                           (batch_size,))
+            rows = cursor.fetchall()
+
+            if not rows:
+                break
+
+            execute_values(cursor,
+                           """
+                           UPDATE company_news AS n SET tokens = v.tokens
+                           FROM (VALUES %s) AS v(id, tokens)
+                           WHERE n.id = v.id
+                           """,
+                           [(news_id, title_tokens(title)) for news_id, _, title in rows],
+                           template="(%s, %s::text[])")
+
+        company_ids.update(company_id for _, company_id, _ in rows)
+        total += len(rows)
+        logger.info(f"[INFO] [News Index] Tokenized {total} news titles")
+
+    return company_ids
+
+def refresh_news_stats(conn, company_ids: set[int] | None = None):
+    """
+    Recompute the document frequency of every token per company
+
+    Parameter
+        - company_ids (set[int] | None): The companies to refresh (default = None, every company)
+    """
+
+    ids = sorted(company_ids) if company_ids is not None else None
+
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            WITH docs AS (
+                SELECT id, company_id, tokens
+                FROM company_news
+                WHERE tokens IS NOT NULL AND (%(ids)s::int[] IS NULL OR company_id = ANY(%(ids)s::int[]))
+            ), terms AS (
+                SELECT company_id, term, COUNT(DISTINCT id) AS df
+                FROM docs, unnest(tokens) AS term
+                GROUP BY company_id, term
+            ), stats AS (
+                SELECT d.company_id,
+                       COUNT(*) AS n_docs,
+                       COALESCE((SELECT jsonb_object_agg(t.term, t.df) FROM terms t WHERE t.company_id = d.company_id), '{}'::jsonb) AS df
+                FROM docs d
+                GROUP BY d.company_id
+            )
+            INSERT INTO company_news_stats (company_id, n_docs, df, updated_at, rolled_up)
+            SELECT company_id, n_docs, df, CURRENT_TIMESTAMP, FALSE FROM stats
+            ON CONFLICT (company_id) DO UPDATE
+                SET n_docs = EXCLUDED.n_docs, df = EXCLUDED.df, updated_at = EXCLUDED.updated_at, rolled_up = FALSE
+            """,
+            {"ids": ids},
+        )
+        logger.info(f"[INFO] [News Index] Refreshed the news statistics of {cursor.rowcount} companies")
+
+def month_candidates(news: list[dict], stats: "NewsStats", top_n: int = NEWS_ROLLUP_CANDIDATES) -> list[dict]:
+    """
+    Select the rollup candidates of one month: the top n news by TF-IDF score, with their keyword score
+
+    Parameters
+        - news (list[dict]): The news of the month in (date, id) order (title, date and tokens)
+        - stats (NewsStats): The document frequencies of the company news
+        - top_n (int): The number of news kept (default = NEWS_ROLLUP_CANDIDATES)
+
+    Return
+        - candidates (list[dict]): The kept news in (date, id) order, so merged months keep the order of the news table
+    """
+
+    matcher = get_matcher(news_keywords())
+    scores = [stats.score(item.get('tokens') or title_tokens(item['title'])) for item in news]
+
+    # Stable: ties keep the (date, id) order like the ranking of a whole window does
+    kept = sorted(sorted(range(len(news)), key=lambda i: scores[i], reverse=True)[:top_n])
+
+    return [{'title': news[i]['title'],
+             'date': news[i]['date'].isoformat(),
+             'tfidf_score': scores[i],
+             'keyword_score': len(matcher.matches(news[i]['title'])) if news[i]['title'] else 0} for i in kept]
+
+def refresh_news_rollups(conn, company_ids: set[int] | None = None):
+    """
+    Rebuild the monthly news rollups of the companies from their news and statistics
+
+    The candidates depend on the document frequencies of the whole company, so every month of a company whose
+    news changed is rebuilt, and the company is marked as rolled up once its months are written.
+
+    Parameter
+        - company_ids (set[int] | None): The companies to rebuild (default = None, every company)
+    """
+
+    ids = sorted(company_ids) if company_ids is not None else None
+
+    with conn.cursor() as cursor:
+        cursor.execute("""
+                       SELECT company_id, n_docs, df FROM company_news_stats
+                       WHERE %(ids)s::int[] IS NULL OR company_id = ANY(%(ids)s::int[])
+                       ORDER BY company_id
+                       """,
+                       {"ids": ids})
+        companies = cursor.fetchall()
+
+    for company_id, n_docs, df in companies:
+        stats = NewsStats(n_docs, df)
+
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT title, news_date, tokens FROM company_news WHERE company_id = %s ORDER BY news_date, id",
+                           (company_id,))
+            rows = cursor.fetchall()
+
+        months = {}
+        for title, news_date, tokens in rows:
+            months.setdefault(news_date.replace(day=1), []).append({'title': title, 'date': news_date, 'tokens': tokens})
+
+        with conn.cursor() as cursor:
+            if months:
+                execute_values(cursor,
+                               """
+                               INSERT INTO company_news_rollup (company_id, month, n_news, candidates) VALUES %s
+                               ON CONFLICT (company_id, month) DO UPDATE
+                                   SET n_news = EXCLUDED.n_news, candidates = EXCLUDED.candidates
+                               """,
+                               [(company_id, month, len(news), Json(month_candidates(news, stats)))
+                                for month, news in months.items()])
+
+            cursor.execute("DELETE FROM company_news_rollup WHERE company_id = %s AND NOT (month = ANY(%s::date[]))",
+                           (company_id, list(months)))
+            cursor.execute("UPDATE company_news_stats SET rolled_up = TRUE WHERE company_id = %s", (company_id,))
+
+    logger.info(f"[INFO] [News Index] Rebuilt the monthly news rollups of {len(companies)} companies")
+
+def index_news(conn, rebuild: bool = False):
+    """
+    Tokenize the new news titles and refresh the statistics and monthly rollups of their companies (run after a news ingest)
+
+    Parameter
+        - rebuild (bool): Refresh every company, e.g., after changing the news keywords (default = False)
+    """
+
+    create_news_index_tables(conn)
+    company_ids = tokenize_pending_news(conn)
+
+    if rebuild:
+        refresh_news_stats(conn)
+        refresh_news_rollups(conn)
+        return
+
+    if company_ids:
+        refresh_news_stats(conn, company_ids)
+
+    # Companies indexed before the rollups existed, or whose last rebuild was interrupted
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT company_id FROM company_news_stats WHERE NOT rolled_up")
+        company_ids |= {company_id for company_id, in cursor.fetchall()}
+
+    if company_ids:
+        refresh_news_rollups(conn, company_ids)
+
+
+class NewsStats:
+    """
+    Document frequencies of the news tokens of one company, computed at ingest
+
+    Parameters
+        - n_docs (int): The number of news of the company
+        - df (dict[str, int]): The number of news containing each token
+        - rolled_up (bool): Whether the monthly rollups were built from these statistics (default = False)
+    """
+
+    def __init__(self, n_docs: int, df: dict[str, int], rolled_up: bool = False):
+        self.n_docs = n_docs
+        self.df = df
+        self.rolled_up = rolled_up
+
+    def idf(self, token: str) -> float:
+        """Smoothed inverse document frequency (the same formula as the TF-IDF vectorizer)"""
+        return math.log((1 + self.n_docs) / (1 + self.df.get(token, 0))) + 1
+
+    def score(self, tokens: list[str]) -> float:
+        """
+        Score a title against the corpus: the sum of its l2-normalized TF-IDF weights
+
+        This is the sparse dot product of the title's TF-IDF vector with the all-ones vector, which ranks
+        the titles like the mean TF-IDF of a fitted vectorizer, without fitting anything.
+        """
+
+        if not tokens:
+            return 0.0
+
+        weights = [count * self.idf(token) for token, count in Counter(tokens).items()]
+        norm = math.sqrt(sum(weight * weight for weight in weights))
+
+        return sum(weights) / norm if norm else 0.0
+
+
+class NewsStatsStore:
+    """Read the news statistics of the companies, cached in process for NEWS_STATS_TTL seconds"""
+
+    def __init__(self, ttl: float = NEWS_STATS_TTL):
+        self._cache = LRUCache(max_entries=1024, ttl=ttl)
+
+    def get(self, conn, company: str) -> NewsStats | None:
+        """
+        Get the news statistics of a company
+
+        Parameter
+            - company (str): The name of the company
+
+        Return
+            - (NewsStats | None): The statistics, or None if the company news was not indexed
+        """
+
+        cached = self._cache.get(company, False)
+        if cached is not False:
+            return cached
+
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT s.n_docs, s.df, s.rolled_up
+                    FROM company_news_stats s
+                    JOIN company c ON c.id = s.company_id
+                    WHERE c.name = %s
+                    """,
+                    (company,),
+                )
+                row = cursor.fetchone()
+        except psycopg2.Error as e:
+            logger.warning(f"[WARNING] [News Index] Failed to load the news statistics of {company}: {e}")
+            return None
+
+        stats = NewsStats(row[0], row[1], row[2]) if row else None
+        self._cache.set(company, stats)
+
+        return stats
+
+    def get_many(self, conn, companies: list[str]) -> dict:
+        """
+        Get the news statistics of several companies, reading the ones that are not cached in one query
+
+        Parameter
+            - companies (list[str]): The names of the companies
+
+        Return
+            - (dict): The statistics of each company (None if the company news was not indexed)
+        """
+
+        found = {}
+        missing = []
+
+        for company in dict.fromkeys(companies):
+            cached = self._cache.get(company, False)
+
+            if cached is False:
+                missing.append(company)
+            else:
+                found[company] = cached
+
+        if not missing:
+            return found
+
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT c.name, s.n_docs, s.df, s.rolled_up
+                    FROM company_news_stats s
+                    JOIN company c ON c.id = s.company_id
+                    WHERE c.name = ANY(%s)
+                    """,
+                    (missing,),
+                )
+                rows = {name: NewsStats(n_docs, df, rolled_up) for name, n_docs, df, rolled_up in cursor.fetchall()}
+        except psycopg2.Error as e:
+            logger.warning(f"[WARNING] [News Index] Failed to load the news statistics of {len(missing)} companies: {e}")
+            return {**found, **dict.fromkeys(missing)}
+
+        for company in missing:
+            found[company] = rows.get(company)
+            self._cache.set(company, found[company])
+
+        return found
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+news_stats = NewsStatsStore()
+
+def init_news_index():
+    """Make sure the news token column and statistics table exist (used at startup)"""
+
+    with get_connection() as conn:
+        create_news_index_tables(conn)
+
+
+if __name__ == "__main__":
+    # Run after loading news outside example_datas/setup_company_news_data.py (which indexes what it loads): python -m src.news_index
+    # and with --all after changing the news keywords
+    with get_connection() as conn:
+        index_news(conn, rebuild="--all" in sys.argv[1:])
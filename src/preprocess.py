@@ -1,15 +1,346 @@
+import os
 import json
-from datetime import datetime
+import threading
+from collections import OrderedDict
+from functools import cached_property
+from typing import NamedTuple
+from datetime import datetime, date
+import numpy as np
 from logger_utils import logger
 import traceback
 
+COMPANY_INDEX_MAX_ENTRIES = 256     # Company documents whose time-series indexes are kept
+TALENT_MAX_BYTES = int(os.getenv("TALENT_MAX_BYTES", 1024 * 1024))     # Largest talent JSON accepted from bytes or a stream
+TALENT_READ_CHUNK = 64 * 1024       # Bytes read from a talent stream at a time
+COMPANY_SUMMARY_SECTIONS = ("mau", "organization", "investment", "finance")     # Document sections read by get_company_info
+
+def company_data_column(sections: tuple[str, ...] | None) -> str:
+    """
+    The SQL expression selecting the company document, or only some of its top-level sections
+
+    With sections, the expression takes them as its first query parameter (a list of section names), and the
+    other sections are dropped by the database instead of being sent and decoded. A missing section stays missing.
+
+    Parameter
+        - sections (tuple[str, ...] | None): The top-level sections to keep (None = the whole document)
+
+    Return
+        - (str): The expression to select, from a query on the company table
+    """
+
+    if sections is None:
+        return "data"
+
+    return "(SELECT COALESCE(jsonb_object_agg(e.key, e.value), '{}'::jsonb) FROM jsonb_each(data) AS e WHERE e.key = ANY(%s))"
+
+def month_key(year_month: str) -> int:
+    """Encode a 'YYYY-MM' (or 'YYYY-MM-DD') string as an integer month (year * 12 + month - 1)"""
+    return int(year_month[:4]) * 12 + int(year_month[5:7]) - 1
+
+class TimeSeries:
+    """
+    Records of one company data section indexed by month
+
+    The month keys are kept in a sorted NumPy array, so a window is located with two binary searches.
+    The records are never copied or reordered: a window is a slice of the source list, in the source order
+    (the sections are stored either ascending, like MAU, or descending, like the organization data).
+    """
+
+    def __init__(self, records: list[dict], keys: list[int]):
+        self.records = records
+        keys = np.asarray(keys, dtype=np.int64)
+
+        if len(keys) < 2 or np.all(keys[1:] >= keys[:-1]):
+            self.direction = 1
+            self.keys = keys
+        elif np.all(keys[1:] <= keys[:-1]):
+            self.direction = -1
+            self.keys = keys[::-1]
+        else:
+            # Unordered source: keep a sort permutation, and give the window back in the source order
+            self.direction = 0
+            self._order = np.argsort(keys, kind="stable")
+            self.keys = keys[self._order]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def span(self, start: int, end: int) -> tuple[int, int]:
+        """Return the [lo, hi) positions of the keys start <= key <= end in the sorted keys"""
+
+        lo = int(np.searchsorted(self.keys, start, side="left"))
+        hi = int(np.searchsorted(self.keys, end, side="right"))
+
+        return lo, max(lo, hi)
+
+    def source_slice(self, start: int, end: int) -> tuple[int, int] | None:
+        """Return the [a, b) slice of the source records in the window, or None if the source is unordered"""
+
+        lo, hi = self.span(start, end)
+
+        if self.direction == 1:
+            return lo, hi
+        if self.direction == -1:
+            n = len(self.records)
+            return n - hi, n - lo
+
+        return None
+
+    def window(self, start: int, end: int) -> list[dict]:
+        """
+        Get the records with start <= key <= end in O(log n) (plus the size of the window)
+
+        Parameters
+            - start (int): The first key of the window (inclusive)
+            - end (int): The last key of the window (inclusive)
+
+        Return
+            - (list[dict]): The records of the window in the source order (the same dicts as the source)
+        """
+
+        bounds = self.source_slice(start, end)
+
+        if bounds is not None:
+            return self.records[bounds[0]:bounds[1]]
+
+        lo, hi = self.span(start, end)
+        return [self.records[i] for i in np.sort(self._order[lo:hi])]
+
+class GrowthStats(NamedTuple):
+    records: int            # Records in the window
+    first: float | None     # First and last value (None if no record has a value)
+    last: float | None
+    growth_sum: float       # Sum and number of the monthly growth rates (%), a month after a zero value has none
+    growth_count: int
+    drops: int              # Number of negative monthly growth rates
+
+class GrowthPrefix:
+    """
+    Monthly growth of a mau or organization series, in the source order, with prefix counts
+
+    The counts of a window are differences of two prefix entries (O(1) after the binary search). The growth
+    sum is added up over the window itself, like growth_summary does: a difference of cumulative sums loses
+    the precision of the window when an earlier month has a huge growth. Missing values are skipped.
+    """
+
+    def __init__(self, records: list[dict], series: TimeSeries | None = None, key: str = 'value'):
+        self.series = series
+        self.key = key
+
+        present = np.array([data.get(key) is not None for data in records], dtype=bool)
+        self.values = np.asarray([value for data in records if (value := data.get(key)) is not None], dtype=np.float64)
+        self.kept_before = np.concatenate(([0], np.cumsum(present)))
+
+        # growth[j] is the growth from values[j - 1] to values[j] (none for j = 0 and after a zero value)
+        growth = np.zeros(len(self.values))
+        counted = np.zeros(len(self.values), dtype=bool)
+
+        if len(self.values) > 1:
+            prev, current = self.values[:-1], self.values[1:]
+            counted[1:] = prev != 0
+            with np.errstate(divide='ignore', invalid='ignore'):
+                growth[1:] = np.where(counted[1:], (current - prev) / np.where(counted[1:], prev, 1.0) * 100, 0.0)
+
+        self.growth = growth[counted]                   # The counted monthly growth rates
+        self.growth_count = np.concatenate(([0], np.cumsum(counted)))
+        self.drops = np.concatenate(([0], np.cumsum(counted & (growth < 0))))
+
+    def stats(self, a: int, b: int) -> GrowthStats:
+        """Statistics of the source records [a, b)"""
+
+        first, last = int(self.kept_before[a]), int(self.kept_before[b])      # Values [first, last) are in the window
+
+        if first == last:
+            return GrowthStats(b - a, None, None, 0.0, 0, 0)
+
+        # The growth into the first value of the window belongs to the previous month
+        lo, hi = int(self.growth_count[first + 1]), int(self.growth_count[last])
+
+        # The built-in sum, in order, gives the same average as growth_summary on the window records
+        return GrowthStats(b - a,
+                           float(self.values[first]),
+                           float(self.values[last - 1]),
+                           sum(self.growth[lo:hi].tolist()),
+                           hi - lo,
+                           int(self.drops[last] - self.drops[first + 1]))
+
+    def window(self, start: int, end: int) -> GrowthStats:
+        """
+        Get the growth statistics of the months start <= month <= end
+
+        Parameters
+            - start (int): The first month key of the window (inclusive)
+            - end (int): The last month key of the window (inclusive)
+
+        Return
+            - (GrowthStats): The inputs of the growth summary of the window
+        """
+
+        bounds = self.series.source_slice(start, end)
+
+        if bounds is None:
+            records = self.series.window(start, end)
+            return GrowthPrefix(records, key=self.key).stats(0, len(records))
+
+        return self.stats(*bounds)
+
+class InvestTotals(NamedTuple):
+    records: int            # Investment records in the window
+    rounds: int             # Records with a round level
+    amount: int | float     # Total investment amount
+
+class InvestPrefix:
+    """Prefix sums of the investment amounts and rounds, so the totals of any window cost O(1)"""
+
+    def __init__(self, series: TimeSeries):
+        self.series = series
+
+        amounts = [data['investmentAmount'] if data.get('investmentAmount') else 0 for data in series.records]
+        dtype = np.int64 if all(isinstance(amount, int) for amount in amounts) else np.float64
+
+        self.amount = np.concatenate(([0], np.cumsum(np.asarray(amounts, dtype=dtype))))
+        self.rounds = np.concatenate(([0], np.cumsum([1 if data.get('level') else 0 for data in series.records])))
+
+    def window(self, start: int, end: int) -> InvestTotals:
+        """
+        Get the investment totals of the months start <= month <= end
+
+        Parameters
+            - start (int): The first month key of the window (inclusive)
+            - end (int): The last month key of the window (inclusive)
+
+        Return
+            - (InvestTotals): The inputs of the investment summary of the window
+        """
+
+        bounds = self.series.source_slice(start, end)
+
+        if bounds is None:
+            records = self.series.window(start, end)
+            return InvestTotals(len(records),
+                                sum(1 for data in records if data.get('level')),
+                                sum(data['investmentAmount'] for data in records if data.get('investmentAmount')))
+
+        a, b = bounds
+        return InvestTotals(b - a, int(self.rounds[b] - self.rounds[a]), (self.amount[b] - self.amount[a]).item())
+
+class CompanySeries(NamedTuple):
+    """Window aggregates of a company computed by the database from the series tables (parsing.get_company_series)"""
+    mau: GrowthStats
+    organization: GrowthStats
+    investment: InvestTotals
+    finance: list[dict]     # Finance records of the window years ('year', 'netProfit') in the document order
+
+class TalentTooLarge(ValueError):
+    """The talent JSON is larger than the size limit"""
+
+class InvalidTalentData(ValueError):
+    """The talent data could not be loaded (an unreadable path, invalid JSON or an oversized talent given to process_talent)"""
+
+class CompanyIndex:
+    """
+    Time-series indexes (and the growth / investment prefix sums) of one company document, each built on first use
+
+    A section that is missing from the document raises KeyError/IndexError, like reading the document directly.
+    """
+
+    def __init__(self, company_data: dict):
+        self.company_data = company_data
+
+    @cached_property
+    def mau(self) -> TimeSeries:
+        records = self.company_data["mau"]["list"][0]["data"]
+        return TimeSeries(records, [month_key(data["referenceMonth"]) for data in records])
+
+    @cached_property
+    def organization(self) -> TimeSeries:
+        records = self.company_data["organization"]["data"]
+        return TimeSeries(records, [month_key(data["referenceMonth"]) for data in records])
+
+    @cached_property
+    def investment(self) -> TimeSeries:
+        records = self.company_data["investment"]["data"]
+        return TimeSeries(records, [month_key(data["investAt"]) for data in records])
+
+    @cached_property
+    def finance(self) -> TimeSeries:
+        records = self.company_data["finance"]["data"]
+        return TimeSeries(records, [data["year"] for data in records])
+
+    @cached_property
+    def mau_growth(self) -> GrowthPrefix:
+        return GrowthPrefix(self.mau.records, self.mau)
+
+    @cached_property
+    def organization_growth(self) -> GrowthPrefix:
+        return GrowthPrefix(self.organization.records, self.organization)
+
+    @cached_property
+    def investment_totals(self) -> InvestPrefix:
+        return InvestPrefix(self.investment)
+
+_company_indexes = OrderedDict()        # id(company_data) -> (company_data, CompanyIndex)
+_company_indexes_lock = threading.Lock()
+
 class parsing:
-    def preprocessing_personal_info(talent_data_path: str) -> dict:
+    def load_talent(source, max_bytes: int = TALENT_MAX_BYTES) -> dict:
         """
-        Load and preprocessing the personal information from JSON file of a person
+        Decode a talent JSON from bytes or a file-like stream (read in chunks, up to max_bytes), or a file path
+
+        Parameters
+            - source (bytes | IO | str | os.PathLike | dict): The talent JSON, a stream of it (binary or text),
+                                                              the path of the JSON file, or the already decoded data
+            - max_bytes (int): The size limit of bytes and streams (default = TALENT_MAX_BYTES)
+
+        Return
+            - talent_dict (dict): The talent data
+
+        Raise
+            - TalentTooLarge: The JSON is larger than max_bytes
+            - ValueError: The JSON is invalid (json.JSONDecodeError and UnicodeDecodeError are ValueErrors)
+        """
+
+        if isinstance(source, dict):
+            return source
+
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, "rb") as f:
+                return parsing.load_talent(f, max_bytes)
+
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            raw = bytes(source)
+        else:
+            # Stop reading as soon as the limit is passed, instead of reading the whole stream first
+            chunks = []
+            size = 0
+
+            while chunk := source.read(TALENT_READ_CHUNK):
+                chunk = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+                chunks.append(chunk)
+                size += len(chunk)
+
+                if size > max_bytes:
+                    break
+
+            raw = b"".join(chunks)
+
+        if len(raw) > max_bytes:
+            raise TalentTooLarge(f"Talent JSON is larger than {max_bytes} bytes")
+
+        talent_dict = json.loads(raw)
+
+        if not isinstance(talent_dict, dict):
+            raise ValueError("Talent JSON must be an object")
+
+        return talent_dict
+
+    def preprocessing_personal_info(talent) -> dict:
+        """
+        Load and preprocessing the personal information of a person
 
         Parameter
-            - path (str): The path of the JSON file
+            - talent (str | os.PathLike | dict | bytes | IO): The path of the JSON file, its decoded content,
+                                                              its bytes or a stream of it (see load_talent)
         
         Return
             - talent_profile (dict): Preprocessed data of the talent
@@ -17,10 +348,30 @@ class parsing:
         
         # Load talent's professional data
         try:
-            logger.info(f"Start preprocessing file: {talent_data_path}")
-            with open(talent_data_path, "r") as f:
-                talent_dict = json.load(f)
-            
+            if isinstance(talent, (str, os.PathLike)):
+                logger.info(f"Start preprocessing file: {talent}")
+
+            talent_dict = parsing.load_talent(talent)
+        
+        except Exception as e:
+            logger.exception(f"[ERROR] Failed to load personal info: {e}")
+            logger.debug(traceback.format_exc())
+            return None
+
+        return parsing.parse_personal_info(talent_dict)
+
+    def parse_personal_info(talent_dict: dict) -> dict:
+        """
+        Preprocessing the personal information of a person that is already decoded from JSON
+
+        Parameter
+            - talent_dict (dict): The talent data (the content of the talent JSON file)
+        
+        Return
+            - talent_profile (dict): Preprocessed data of the talent
+        """
+
+        try:
             # Combine the last and first name of talent
             name = talent_dict['lastName'] + talent_dict['firstName']
             logger.debug(f"Parsed name: {name}")
@@ -102,12 +453,14 @@ class parsing:
             logger.debug(traceback.format_exc())
             return None
     
-    def get_company_data(conn, company:str) -> dict | None:
+    def get_company_data(conn, company:str, sections: tuple[str, ...] | None = COMPANY_SUMMARY_SECTIONS) -> dict | None:
         """
         Get data on the company the talent worked for
 
         Parameters
             - company (str): The name of the company the talent worked for
+            - sections (tuple[str, ...] | None): The top-level sections of the document to fetch
+                                                 (default = COMPANY_SUMMARY_SECTIONS, None = the whole document)
         
         Return
             - company_data (dict): The data on the company the talent worked for. If there is no company data, return None
@@ -115,7 +468,8 @@ class parsing:
 
         try:
             cursor = conn.cursor()
-            cursor.execute("SELECT data FROM company WHERE name = %s", (company,))
+            params = (company,) if sections is None else (list(sections), company)
+            cursor.execute(f"SELECT {company_data_column(sections)} FROM company WHERE name = %s", params)
 
             row = cursor.fetchone()
             if row:
@@ -129,6 +483,37 @@ class parsing:
             logger.error("[ERROR] While collecting company data for '%s': %s", company, str(e))
             logger.debug(traceback.format_exc)
     
+    def company_index(company_data: dict) -> CompanyIndex:
+        """
+        Get the time-series indexes of a company document, built once per document
+
+        The cached company documents are shared objects, so the index is looked up by the document identity
+        (the document is kept referenced alongside, so its id is not reused while the index is cached).
+
+        Parameter
+            - company_data (dict): The company data
+
+        Return
+            - (CompanyIndex): The indexes of the document
+        """
+
+        key = id(company_data)
+
+        with _company_indexes_lock:
+            entry = _company_indexes.get(key)
+
+            if entry is not None and entry[0] is company_data:
+                _company_indexes.move_to_end(key)
+                return entry[1]
+
+            index = CompanyIndex(company_data)
+            _company_indexes[key] = (company_data, index)
+
+            while len(_company_indexes) > COMPANY_INDEX_MAX_ENTRIES:
+                _company_indexes.popitem(last=False)
+
+            return index
+
     def get_mau(company_data: dict, start_date: str, end_date: str) -> list:
         """
         Get mau information from company_data
@@ -143,8 +528,7 @@ class parsing:
         """
 
         try:
-            mau_info = company_data["mau"]["list"][0]["data"]
-            mau = [data for data in mau_info if start_date <= data["referenceMonth"] <= end_date]
+            mau = parsing.company_index(company_data).mau.window(month_key(start_date), month_key(end_date))
 
             return mau
         except (KeyError, IndexError) as e:
@@ -165,8 +549,7 @@ class parsing:
         """
 
         try:
-            org_info = company_data["organization"]["data"]
-            org = [data for data in org_info if start_date <= data["referenceMonth"] <= end_date]
+            org = parsing.company_index(company_data).organization.window(month_key(start_date), month_key(end_date))
 
             return org
         except (KeyError, IndexError) as e:
@@ -187,8 +570,7 @@ class parsing:
         """
 
         try:
-            invest_info = company_data["investment"]["data"]
-            invest = [data for data in invest_info if start_date <= data["investAt"][:7] <= end_date]
+            invest = parsing.company_index(company_data).investment.window(month_key(start_date), month_key(end_date))
 
             return invest
         except (KeyError, IndexError) as e:
@@ -209,14 +591,31 @@ class parsing:
         """
 
         try:
-            fin_info = company_data["finance"]["data"]
-            fin = [data for data in fin_info if int(start_date[:4]) <= data["year"] <= int(end_date[:4])]
+            fin = parsing.company_index(company_data).finance.window(int(start_date[:4]), int(end_date[:4]))
 
             return fin
         except (KeyError, IndexError) as e:
             logger.warning(f"[WARNING] Fail to parsing the finance data - Period: {start_date} - {end_date}: {type(e).__name__}")
             return []
     
+    def tenure_months(start_date: tuple[int, int], end_date: tuple[int, int]) -> tuple[int, int]:
+        """
+        Get the month keys of a tenure ('Present' is the current month)
+
+        Parameters
+            - start_date (tuple[int, int]): Date (year and month) the talent started working for the company
+            - end_date (tuple[int, int]): Date (year and month) the talent left the company, or 'Present'
+
+        Return
+            - (tuple[int, int]): The first and the last month key of the tenure
+        """
+
+        if end_date == "Present":
+            today = datetime.today()
+            end_date = (today.year, today.month)
+
+        return int(start_date[0]) * 12 + int(start_date[1]) - 1, int(end_date[0]) * 12 + int(end_date[1]) - 1
+
     def get_company_info(company_data: dict, start_date: tuple[int, int], end_date: tuple[int, int]) -> dict:
         """
         Get company information during talent has worked for the company
@@ -266,6 +665,127 @@ class parsing:
             logger.error(f"[ERROR] [Company Info] Error occur while parsing company informations: {e}", exc_info=True)
             return None
     
+    def get_company_series(conn, company: str, start_date: tuple[int, int], end_date: tuple[int, int]) -> CompanySeries | None:
+        """
+        Get the company information of a tenure as window aggregates computed in the database (one query)
+
+        Parameters
+            - company (str): The name of the company
+            - start_date (tuple[int, int]): Date (year and month) the talent started working for the company
+            - end_date (tuple[int, int]): Date (year and month) the talent left the company, or 'Present'
+
+        Return
+            - (CompanySeries | None): The aggregates, or None if the series of the company were not ingested
+                                      (see company_series.ingest_company_series)
+        """
+
+        return parsing.get_company_series_many(conn, [(company, start_date, end_date)])[0]
+
+    def get_company_series_many(conn, windows: list[tuple]) -> list[CompanySeries | None]:
+        """
+        Get the window aggregates of several (company, start_date, end_date) tenures in one query
+
+        Parameter
+            - windows (list[tuple]): The company names and tenures (see get_company_series)
+
+        Return
+            - (list[CompanySeries | None]): The aggregates of each window, None if the company series were not
+                                            ingested (or every window, if the query failed)
+        """
+
+        if not windows:
+            return []
+
+        try:
+            params = {"names": [], "starts": [], "ends": [], "start_years": [], "end_years": []}
+
+            for company, start_date, end_date in windows:
+                start, end = parsing.tenure_months(start_date, end_date)
+                params["names"].append(company)
+                params["starts"].append(date(start // 12, start % 12 + 1, 1))
+                params["ends"].append(date(end // 12, end % 12 + 1, 1))
+                params["start_years"].append(start // 12)
+                params["end_years"].append(end // 12)
+
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                            WITH w AS (
+                                SELECT *
+                                FROM unnest(%(names)s::text[], %(starts)s::date[], %(ends)s::date[],
+                                            %(start_years)s::int[], %(end_years)s::int[])
+                                     WITH ORDINALITY AS w(name, range_start, range_end, start_year, end_year, idx)
+                            ), c AS (
+                                SELECT DISTINCT ON (w.idx) w.idx, s.company_id
+                                FROM w
+                                JOIN company co ON co.name = w.name
+                                JOIN company_series_state s ON s.company_id = co.id
+                                ORDER BY w.idx, co.id
+                            ), wg AS (
+                                SELECT c.idx, g.section, g.seq, g.value
+                                FROM c JOIN w USING (idx)
+                                JOIN company_growth g ON g.company_id = c.company_id AND g.month BETWEEN w.range_start AND w.range_end
+                            ), v AS (
+                                SELECT idx, section, seq, value, (value - prev) / NULLIF(prev, 0) * 100 AS growth
+                                FROM (SELECT idx, section, seq, value, lag(value) OVER (PARTITION BY idx, section ORDER BY seq) AS prev
+                                      FROM wg WHERE value IS NOT NULL) t
+                            ), growth AS (
+                                SELECT r.idx, r.section,
+                                       jsonb_build_array(r.records,
+                                                         (array_agg(v.value ORDER BY v.seq))[1],
+                                                         (array_agg(v.value ORDER BY v.seq DESC))[1],
+                                                         COALESCE(sum(v.growth), 0),
+                                                         count(v.growth),
+                                                         count(*) FILTER (WHERE v.growth < 0)) AS stats
+                                FROM (SELECT idx, section, count(*) AS records FROM wg GROUP BY idx, section) r
+                                LEFT JOIN v USING (idx, section)
+                                GROUP BY r.idx, r.section, r.records
+                            ), invest AS (
+                                SELECT c.idx, jsonb_build_array(count(i.seq), count(*) FILTER (WHERE i.has_round), COALESCE(sum(i.amount), 0)) AS totals
+                                FROM c JOIN w USING (idx)
+                                LEFT JOIN company_investment i ON i.company_id = c.company_id AND i.month BETWEEN w.range_start AND w.range_end
+                                GROUP BY c.idx
+                            ), finance AS (
+                                SELECT c.idx,
+                                       COALESCE(jsonb_agg(jsonb_build_object('year', f.year, 'netProfit', f.net_profit) ORDER BY f.seq)
+                                                FILTER (WHERE f.seq IS NOT NULL), '[]') AS records
+                                FROM c JOIN w USING (idx)
+                                LEFT JOIN company_finance f ON f.company_id = c.company_id AND f.year BETWEEN w.start_year AND w.end_year
+                                GROUP BY c.idx
+                            )
+                            SELECT c.idx,
+                                   COALESCE((SELECT jsonb_object_agg(g.section, g.stats) FROM growth g WHERE g.idx = c.idx), '{}'),
+                                   invest.totals,
+                                   finance.records
+                            FROM c JOIN invest USING (idx) JOIN finance USING (idx)
+                            """,
+                            params)
+
+                rows = cursor.fetchall()
+
+        except Exception as e:
+            logger.warning(f"[WARNING] Failed to fetch the company series of {len(windows)} windows, reading the documents instead: {e}")
+            return [None] * len(windows)
+
+        series = [None] * len(windows)
+
+        for idx, growth, invest, finance in rows:
+            def growth_stats(section: str) -> GrowthStats:
+                if section not in growth:
+                    return GrowthStats(0, None, None, 0.0, 0, 0)
+
+                records, first, last, growth_sum, growth_count, drops = growth[section]
+                return GrowthStats(records,
+                                   float(first) if first is not None else None,
+                                   float(last) if last is not None else None,
+                                   float(growth_sum), growth_count, drops)
+
+            series[idx - 1] = CompanySeries(mau=growth_stats('mau'),
+                                            organization=growth_stats('organization'),
+                                            investment=InvestTotals(*invest),
+                                            finance=finance)
+
+        return series
+
     def extract_company_period(positions: list[dict]) -> list[dict]:
         """
         Extract company and working period information from positions of the talent profile
@@ -313,6 +833,30 @@ class parsing:
         logger.info(f"[INFO] Extracted {len(talent_company)} valid company records from {len(positions)} positions.")
         return talent_company
 
+    def news_date_range(start_date: tuple[int, int], end_date: tuple[int, int]) -> tuple[date, date]:
+        """
+        Get the half-open date range [first day of the start month, first day of the month after the end month)
+        of a tenure, so the (company_id, news_date) index can serve the news queries with a range scan
+
+        Parameters
+            - start_date (tuple[int, int]): Date (year and month) the talent started working for the company
+            - end_date (tuple[int, int]): Date (year and month) the talent left the company (not a tuple: until today)
+
+        Return
+            - (tuple[date, date]): The first day of the range and the first day after it
+        """
+
+        if not isinstance(end_date, tuple):
+            today = datetime.today()
+            end_date = (today.year, today.month)
+            logger.warning(f"[WARNING] Adjusted end_date is not a tuple. Using today's date instead: {end_date}")
+
+        range_start = date(int(start_date[0]), int(start_date[1]), 1)
+        end_year, end_month = int(end_date[0]), int(end_date[1])
+        range_end = date(end_year + end_month // 12, end_month % 12 + 1, 1)
+
+        return range_start, range_end
+
     def get_company_news(conn, company: str, start_date: tuple[int, int], end_date: tuple[int, int]) -> list[dict]:
         """
         Get and preprocess company news information from the company_news table during talent's tenure
@@ -328,52 +872,127 @@ class parsing:
 
         logger.info(f"[INFO] company: {company}, start date: {start_date}, end date: {end_date}")
 
-        if not isinstance(end_date, tuple):
-            today = datetime.today()
-            end_date = (today.year, today.month)
-            logger.warning(f"[WARNING] Adjusted end_date is not a tuple. Using today's date instead: {end_date}")
-        
+        return parsing.get_company_news_many(conn, [(company, start_date, end_date)])[0]
 
-        company_id = {'비바리퍼블리카': 1,
-                      '네이버': 2,
-                      '리디': 3,
-                      '엘박스': 4,
-                      '야놀자': 6}
+    def news_windows(windows: list[tuple]) -> dict:
+        """The query parameters of several (company, start_date, end_date) news windows (see news_date_range)"""
 
-        logger.info(f"[INFO - Query] Fetching company news for {company} (ID: {company_id.get(company)}) "
-            f"from {start_date} to {end_date}")
-        
-        # Get company news data from company_news table during talent's tenure
+        params = {"names": [], "starts": [], "ends": []}
+
+        for company, start_date, end_date in windows:
+            range_start, range_end = parsing.news_date_range(start_date, end_date)
+            params["names"].append(company)
+            params["starts"].append(range_start)
+            params["ends"].append(range_end)
+
+        return params
+
+    def get_company_news_many(conn, windows: list[tuple]) -> list[list[dict]]:
+        """
+        Get the company news of several (company, start_date, end_date) tenures in one query
+
+        Parameter
+            - windows (list[tuple]): The company names and tenures (see get_company_news)
+
+        Return
+            - (list[list[dict]]): The news of each window (title, date and the tokens stored at ingest,
+                                  None if not indexed yet) in date order
+        """
+
+        if not windows:
+            return []
+
+        params = parsing.news_windows(windows)
+        logger.info(f"[INFO - Query] Fetching company news of {len(windows)} windows")
+
+        # Each window is a range scan of the (company_id, news_date) index
         try:
-            cursor = conn.cursor()
-            cursor.execute("""
-                        SELECT * 
-                        FROM company_news 
-                        WHERE company_id = %s
-                        AND (EXTRACT(YEAR FROM news_date) > %s
-                            OR (EXTRACT(YEAR FROM news_date) = %s AND EXTRACT(MONTH FROM news_date) >= %s))
-                        AND (EXTRACT(YEAR FROM news_date) < %s
-                            OR (EXTRACT(YEAR FROM news_date) = %s AND EXTRACT(MONTH FROM news_date) <= %s))
-                        """,
-                        (company_id.get(company),
-                        start_date[0], start_date[0], start_date[1],
-                        end_date[0], end_date[0], end_date[1]))
-        
-            news_raw = cursor.fetchall()
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                            SELECT w.idx, n.title, n.news_date, n.tokens
+                            FROM unnest(%(names)s::text[], %(starts)s::date[], %(ends)s::date[])
+                                 WITH ORDINALITY AS w(name, range_start, range_end, idx)
+                            JOIN company c ON c.name = w.name
+                            JOIN company_news n ON n.company_id = c.id
+                                               AND n.news_date >= w.range_start
+                                               AND n.news_date < w.range_end
+                            ORDER BY w.idx, n.news_date, n.id
+                            """,
+                            params)
+
+                news_raw = cursor.fetchall()
+
             logger.info(f"[INFO] Retrieved {len(news_raw)} news articles.")
-        
+
         except Exception as e:
-            logger.exception(f"[ERROR] Failed to fetch news for {company}: {e}")
+            logger.exception(f"[ERROR] Failed to fetch news for {', '.join(dict.fromkeys(params['names']))}: {e}")
             raise
 
-        news_titles = []
+        news_titles = [[] for _ in windows]
+
+        for idx, title, news_date, tokens in news_raw:
+            news_titles[idx - 1].append({'title': title, 'date': news_date, 'tokens': tokens})
 
-        # Store news title and its date
-        for i in range(0, len(news_raw)):
-            title = news_raw[i][2]
-            date = news_raw[i][4]
-            news_titles.append({'title': title, 'date': date})
-        
         logger.debug(f"[DEBUG] Completed extracting news titles")
 
         return news_titles
+
+    def get_news_rollup(conn, company: str, start_date: tuple[int, int], end_date: tuple[int, int]) -> list[dict]:
+        """
+        Get the news candidates of the monthly rollups covering talent's tenure (see news_index.refresh_news_rollups)
+
+        Parameters
+            - company (str): The name of the company
+            - start_date (tuple[int, int]): Date (year and month) the talent started working for the company
+            - end_date (tuple[int, int]): Date (year and month) the talent left the company
+
+        Return
+            - news_titles (list[dict]): The candidate news (title, date, TF-IDF and keyword scores) in date order
+        """
+
+        return parsing.get_news_rollup_many(conn, [(company, start_date, end_date)])[0]
+
+    def get_news_rollup_many(conn, windows: list[tuple]) -> list[list[dict]]:
+        """
+        Get the news candidates of the monthly rollups of several (company, start_date, end_date) tenures in one query
+
+        Parameter
+            - windows (list[tuple]): The company names and tenures (see get_news_rollup)
+
+        Return
+            - (list[list[dict]]): The candidate news of each window in date order
+        """
+
+        if not windows:
+            return []
+
+        params = parsing.news_windows(windows)
+
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                            SELECT w.idx, r.candidates
+                            FROM unnest(%(names)s::text[], %(starts)s::date[], %(ends)s::date[])
+                                 WITH ORDINALITY AS w(name, range_start, range_end, idx)
+                            JOIN company c ON c.name = w.name
+                            JOIN company_news_rollup r ON r.company_id = c.id
+                                                      AND r.month >= w.range_start
+                                                      AND r.month < w.range_end
+                            ORDER BY w.idx, r.month
+                            """,
+                            params)
+
+                rollups = cursor.fetchall()
+
+        except Exception as e:
+            logger.exception(f"[ERROR] Failed to fetch the news rollups for {', '.join(dict.fromkeys(params['names']))}: {e}")
+            raise
+
+        news_titles = [[] for _ in windows]
+
+        for idx, candidates in rollups:
+            news_titles[idx - 1].extend({**candidate, 'date': date.fromisoformat(candidate['date'])} for candidate in candidates)
+
+        logger.info(f"[INFO] Retrieved {sum(map(len, news_titles))} news candidates from {len(rollups)} monthly rollups.")
+
+        return news_titles
@@ -1,83 +1,133 @@
-from .preprocess import parsing
+from .preprocess import parsing, InvalidTalentData
 from .summarize import talent_summary, summary
 from .gpt import build_prompt, gen_tags, parse_gpt_tags, profile_embedding
-from .talent_table import table_main, find_similar_talent
+from .talent_table import table_main, find_similar_talents
+from .tag_vote import vote_tags, TAG_VOTE_K
+from .company_lookup import CompanyLookup
+from .db import get_connection
+from .cancellation import CancelToken, raise_if_cancelled
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
-import psycopg2
 from logger_utils import logger
 
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", 4))     # Talents processed concurrently in a batch (keep below DB_POOL_MAX)
 
-DB_CONFIG = {
-    "host": "localhost",
-    "port": 5432,
-    "user": os.getenv("POSTGRES_USER", "searchright"),
-    "password": os.getenv("POSTGRES_PASSWORD", "searchright"),
-    "database": os.getenv("POSTGRES_DB", "searchright"),
-}
 
-conn = psycopg2.connect(
-            host=DB_CONFIG["host"],
-            port=DB_CONFIG["port"],
-            user=DB_CONFIG["user"],
-            password=DB_CONFIG["password"],
-            database=DB_CONFIG["database"],
-        )
-
-def process_talent(talent_path: str, threshold: float = 0.85):
+def process_talent(talent, threshold: float = 0.85, lookup: CompanyLookup | None = None,
+                   on_event=None, cancel: CancelToken | None = None):
     """
     Main logic of the total process
+    talent (str | dict | bytes | IO): The path of the talent JSON file, its already decoded content,
+                                      its bytes or a stream of it (see parsing.load_talent)
     threshold (float): The similarity threshold (default = 0.85) (If it is lower than this, return None)
+    lookup (CompanyLookup | None): Shares company data and news between the talents of a batch
+                                   (default = None, a lookup for this talent only)
+    on_event (callable | None): Called with (stage, payload) as each stage completes:
+                                'profile', 'position' (once per position), 'similarity' and 'tags' (default = None)
+    cancel (CancelToken | None): Stops the remaining stages (and the in-flight GPT request) when cancelled,
+                                 raising PipelineCancelled. A cancelled talent is not inserted (default = None)
+
+    A single pooled connection is checked out for the whole request and given back when it finishes.
+    The company data and news of every position are prefetched together, so the number of queries
+    does not grow with the length of the career.
     """
 
-    cursor = conn.cursor()
+    def emit(stage: str, payload: dict):
+        if on_event is not None:
+            on_event(stage, payload)
+
+    def on_position(idx: int, position: dict, summary_text: str):
+        emit("position", {"index": idx, "company": position.get('company'), "summary": summary_text})
 
-    # Load and summarize talent
-    data = parsing.preprocessing_personal_info(talent_path)
-    talent_name = data.get('name','')
-    profile = talent_summary.profile_summary(data)
+    with get_connection() as conn:
+        # Load and summarize talent
+        data = parsing.preprocessing_personal_info(talent)
 
-    # Summarize full content + get embedding
-    summ = summary(conn, data, profile)
-    embedding = profile_embedding(summ)
+        if data is None:
+            raise InvalidTalentData("Invalid talent data")
 
-    # Check if similar talent exists
-    similarity_result = find_similar_talent(conn, embedding, threshold)
+        talent_name = data.get('name','')
+        profile = talent_summary.profile_summary(data)
+        emit("profile", {"name": talent_name, "summary": profile})
 
-    if similarity_result is None:
-        # No similar talent, then use GPT tag
-        logger.info("[INFO] There is no similar talent. Use GPT model to get tags")
+        # Fetch the company data and news of every position up front (a fixed number of queries)
+        lookup = lookup if lookup is not None else CompanyLookup()
+        lookup.prefetch(conn, data['positions'])
 
-        prompt = build_prompt(summ)
-        response = gen_tags(prompt)     # Get tag from the GPT model
+        # Summarize full content + get embedding
+        summ = summary(conn, data, profile, lookup=lookup, on_position=on_position, cancel=cancel)
+        embedding = profile_embedding(summ, cancel=cancel, conn=conn)
 
-        converted_tag = parse_gpt_tags(response)
+        if embedding is None:
+            raise RuntimeError("Failed to embed the talent summary")
 
-        # Insert talent informations and tags to the talent table
-        table_main(talent_name, summ, converted_tag, embedding)
-        logger.info("[INFO] Completed insert 'talent' table")
+        # Check if similar talents exist (nearest neighbours and their tags in one query)
+        neighbours = find_similar_talents(conn, embedding, k=TAG_VOTE_K)
+        voted_tags = vote_tags(neighbours, threshold)
+        emit("similarity", {"neighbours": [{"id": talent_id, "similarity": round(float(similarity), 4)}
+                                           for talent_id, similarity, _ in neighbours],
+                            "matched": voted_tags is not None})
 
-        cursor.close()
-        conn.close()
+        if voted_tags is None:
+            # No similar talent, then use GPT tag
+            logger.info("[INFO] There is no similar talent. Use GPT model to get tags")
 
-        return converted_tag
-    else:
-        # Similar talent exists, then use similar talent's tags
-        logger.info("[INFO] Similar talent exists. Use its tags.")
+            prompt = build_prompt(summ)
+            response = gen_tags(prompt, cancel=cancel)     # Get tag from the GPT model
 
-        similar_talent_id = similarity_result[0]
+            converted_tag = parse_gpt_tags(response)
+            raise_if_cancelled(cancel, "insert")
 
-        cursor.execute("SELECT id, tags FROM talent WHERE id = %s;", (similar_talent_id,))
-        row = cursor.fetchone()
+            # Insert talent informations and tags to the talent table
+            table_main(conn, talent_name, summ, converted_tag, embedding)
+            logger.info("[INFO] Completed insert 'talent' table")
+            emit("tags", {"tags": converted_tag, "source": "gpt"})
 
-        if row:
-            tags_list = row[1]
-            tag = [tag_dict['tag'] for tag_dict in tags_list]
+            return converted_tag
+        else:
+            # Similar talents exist, then use their tags
+            logger.info("[INFO] Similar talents exist. Use their tags.")
+            raise_if_cancelled(cancel, "insert")
 
             # Insert talent informations and tags to the talent table
-            table_main(talent_name, summ, tag, embedding)
+            table_main(conn, talent_name, summ, voted_tags, embedding)
             logger.info("[INFO] Completed insert 'talent' table")
+            emit("tags", {"tags": voted_tags, "source": "similar"})
+
+            return voted_tags
+
+def process_talent_batch(talents: list[dict], threshold: float = 0.85, max_workers: int = BATCH_WORKERS):
+    """
+    Process several talents with bounded concurrency, sharing the company and news lookups between them
+
+    Parameters
+        - talents (list[dict]): The decoded talent data
+        - threshold (float): The similarity threshold (default = 0.85)
+        - max_workers (int): The number of talents processed concurrently (default = BATCH_WORKERS)
+
+    Yield
+        - (index, tags, error): The index of the talent in `talents`, its tags (or None) and the error (or None),
+                                as soon as each talent is done
+    """
+
+    if not talents:
+        return
+
+    lookup = CompanyLookup()
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(talents))), thread_name_prefix="batch")
+
+    try:
+        futures = {executor.submit(process_talent, talent, threshold, lookup): idx for idx, talent in enumerate(talents)}
 
-            cursor.close()
-            conn.close()
+        for future in as_completed(futures):
+            idx = futures[future]
 
-            return tag
+            try:
+                yield idx, future.result(), None
+            except Exception as e:
+                logger.exception(f"[ERROR] index={idx} - Failed to process talent in batch: {e}")
+                yield idx, None, e
+    finally:
+        # Stop the remaining talents if the consumer goes away (e.g., the client disconnected)
+        executor.shutdown(wait=False, cancel_futures=True)
+        lookup.log_stats()
@@ -2,14 +2,22 @@ from logger_utils import logger
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from datetime import date
-import math
-from .preprocess import parsing
+from .preprocess import parsing, CompanyIndex, CompanySeries, GrowthStats, InvestTotals
+from .company_cache import company_cache
+from .news_index import tokenize, title_tokens, news_stats, news_keywords, NewsStats
+from .keyword_matcher import get_matcher
+from .cancellation import CancelToken, PipelineCancelled, raise_if_cancelled
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import textwrap
+import time
 import os
 from dotenv import load_dotenv
 
 load_dotenv(dotenv_path="./.env")
-import MeCab
+
+SUMMARY_WORKERS = int(os.getenv("SUMMARY_WORKERS", 4))                  # Positions summarized concurrently (1 = sequential)
+SUMMARY_TASK_TIMEOUT = float(os.getenv("SUMMARY_TASK_TIMEOUT", 30))     # Seconds to wait for each position summary
+CANCEL_POLL_INTERVAL = 0.2                                              # Seconds between cancellation checks while waiting
 
 # os.environ["MECABRC"] = os.getenv("MECABRC")
 # mecab = MeCab.Tagger(f"-r {os.getenv('MECABRC')} -d {os.getenv('DIC_PATH')}")
@@ -55,12 +63,57 @@ class talent_summary:
             return "Error occurs while summarize the profile."
 
 class company_summary:    
+    def growth_values(datas, key: str = 'value') -> np.ndarray:
+        """
+        Get the values of a mau or organization series as an array (missing values are skipped)
+
+        Parameters
+            - datas (list[dict] | np.ndarray): The mau or organization information, or its values (NaN for a missing value)
+            - key (str): The value field of the records (default = 'value')
+
+        Return
+            - (np.ndarray): The values in the order of the records
+        """
+
+        if isinstance(datas, np.ndarray):
+            values = datas.astype(np.float64, copy=False)
+            return values[~np.isnan(values)]
+
+        return np.asarray([value for data in datas if (value := data.get(key)) is not None], dtype=np.float64)
+
+    def growth_statement(total_growth: float, avg_monthly_growth: float, drop: bool, label: str = 'mau') -> str:
+        """
+        Write the growth statistics of a series as a sentence
+
+        Parameters
+            - total_growth (float): The growth rate between the first and the last value (%)
+            - avg_monthly_growth (float): The average of the monthly growth rates (%)
+            - drop (bool): Whether any monthly growth rate is negative
+            - label (str): The data label (default = 'mau') (for the organization '조직 규모')
+
+        Return
+            - statement (str): The growth summary
+        """
+
+        if abs(total_growth) != 0:
+            statement = f"재직 기간 중 {label} 약 {abs(total_growth):.2f}% {'증가' if total_growth > 0 else '감소'}"
+        else:
+            statement = f"재직 기간 중 {label} 변화 없음."
+        
+        statement += f"(평균 월간 {avg_monthly_growth:.2f}% {'증가' if avg_monthly_growth >= 0 else '감소'})"
+
+        # Whether the decrease is temporary
+        if drop:
+            statement += ", 중간에 일시적 하락도 관측됨."
+
+        return statement
+
     def growth_summary(datas: list, label: str = 'mau') -> str:
         """
         Summarize the mau or organization information of the company
 
         Parameter
-            - datas (list): The mau or organization information of the company
+            - datas (list | np.ndarray): The mau or organization information of the company, or its values
             - label (str): The data label to handle (default = 'mau') (for the organization '조직 규모')
         
         Return
@@ -68,15 +121,11 @@ class company_summary:
         """
 
         try:
-            statement = ""
-            key = 'value'
-
-            values = [data.get(key) for data in datas if data.get(key) is not None]
-
-            if not datas:
+            if len(datas) == 0:
                 statement = f"{label} 정보 없음."
                 return statement
-            
+
+            values = company_summary.growth_values(datas)
             first_value = values[0]
             last_value = values[-1]
 
@@ -85,43 +134,111 @@ class company_summary:
                 logger.warning(f"[WARNING] {label}: First value is 0 or None (value={first_value})")
                 total_growth = 0
             else:
-                total_growth = ((last_value - first_value) / first_value) * 100     
+                total_growth = float((last_value - first_value) / first_value * 100)
 
-            # Calculate the monthly growth rate
-            monthly_growth = []
-            
-            for i in range(1, len(values)):
-                prev = values[i - 1]
-                current = values[i]
-
-                try:
-                    if prev != 0:
-                        growth = ((current - prev) / prev) * 100
-                        monthly_growth.append(growth)
-                except Exception as e:
-                    logger.error(f"[ERROR] {label}: Monthly growth calculation error (prev={prev}, current={current}) - {e}")
-            
-            avg_monthly_growth = sum(monthly_growth) / len(monthly_growth) if monthly_growth else 0
+            # Calculate the monthly growth rate (a month after a zero value has no growth rate)
+            prev, current = values[:-1], values[1:]
+            nonzero = prev != 0
+            monthly_growth = (current[nonzero] - prev[nonzero]) / prev[nonzero] * 100
 
-            # Whether the decrease is temporary
-            drop = any(growth < 0 for growth in monthly_growth)
+            # The built-in sum keeps the (compensated) float summation of the statement unchanged
+            avg_monthly_growth = sum(monthly_growth.tolist()) / len(monthly_growth) if len(monthly_growth) else 0
 
-            if abs(total_growth) != 0:
-                statement = f"재직 기간 중 {label} 약 {abs(total_growth):.2f}% {'증가' if total_growth > 0 else '감소'}"
-            else:
-                statement = f"재직 기간 중 {label} 변화 없음."
-            
-            statement += f"(평균 월간 {avg_monthly_growth:.2f}% {'증가' if avg_monthly_growth >= 0 else '감소'})"
-
-            if drop:
-                statement += ", 중간에 일시적 하락도 관측됨."
-
-            return statement
+            return company_summary.growth_statement(total_growth, avg_monthly_growth, bool((monthly_growth < 0).any()), label)
 
         except Exception as e:
             logger.exception(f"[ERROR] {label} Fatal error during growth rate analysis: {e}")
             return f"{label} 정보 분석 실패"
+
+    def growth_summary_batch(windows: list, label: str = 'mau') -> list[str]:
+        """
+        Summarize many mau or organization windows at once (e.g., the positions of a backfill)
+
+        The statistics of all windows are computed together on one padded array, so the cost does not grow
+        with the Python overhead per month. The statements are identical to growth_summary.
+
+        Parameters
+            - windows (list[list[dict] | np.ndarray]): The mau or organization information of each window, or its values
+            - label (str): The data label to handle (default = 'mau') (for the organization '조직 규모')
+
+        Return
+            - statements (list[str]): The summary of each window, in order
+        """
+
+        statements = [None] * len(windows)
+        rows, lengths, flat = [], [], []
+
+        for idx, datas in enumerate(windows):
+            if len(datas) == 0:
+                statements[idx] = f"{label} 정보 없음."
+                continue
+
+            try:
+                if isinstance(datas, np.ndarray):
+                    values = company_summary.growth_values(datas)
+                else:
+                    values = [float(value) for data in datas if (value := data.get('value')) is not None]
+            except Exception as e:
+                logger.exception(f"[ERROR] {label} Fatal error during growth rate analysis: {e}")
+                statements[idx] = f"{label} 정보 분석 실패"
+                continue
+
+            if len(values) == 0:
+                logger.error(f"[ERROR] {label} Fatal error during growth rate analysis: no values in window {idx}")
+                statements[idx] = f"{label} 정보 분석 실패"
+                continue
+
+            rows.append(idx)
+            lengths.append(len(values))
+            flat.append(values)
+
+        if not rows:
+            return statements
+
+        # Pad the windows into one matrix (one row per window)
+        lengths = np.array(lengths)
+        matrix = np.zeros((len(rows), lengths.max()), dtype=np.float64)
+        matrix[np.arange(matrix.shape[1]) < lengths[:, None]] = np.concatenate(flat)
+
+        first = matrix[:, 0]
+        last = matrix[np.arange(len(rows)), lengths - 1]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            total_growth = np.where(first != 0, (last - first) / first * 100, 0.0)
+
+            prev, current = matrix[:, :-1], matrix[:, 1:]
+            valid = (np.arange(1, matrix.shape[1]) < lengths[:, None]) & (prev != 0)
+            monthly_growth = np.where(valid, (current - prev) / np.where(valid, prev, 1.0) * 100, 0.0)
+
+        # Row sums with the same compensated (Neumaier) summation as the built-in sum, column by column
+        total = np.zeros(len(rows))
+        compensation = np.zeros(len(rows))
+
+        for col in range(monthly_growth.shape[1]):
+            x = monthly_growth[:, col]
+            t = total + x
+            compensation += np.where(valid[:, col],
+                                     np.where(np.abs(total) >= np.abs(x), (total - t) + x, (x - t) + total), 0.0)
+            total = np.where(valid[:, col], t, total)
+
+        total = np.where((compensation != 0) & np.isfinite(compensation), total + compensation, total)
+
+        counts = valid.sum(axis=1)
+        avg_monthly_growth = np.where(counts > 0, total / np.maximum(counts, 1), 0.0)
+        drop = (valid & (monthly_growth < 0)).any(axis=1)
+
+        for row in np.flatnonzero(first == 0):
+            logger.warning(f"[WARNING] {label}: First value is 0 or None (value={first[row]})")
+
+        for idx, total_rate, avg_rate, dropped in zip(rows, total_growth.tolist(), avg_monthly_growth.tolist(), drop.tolist()):
+            statements[idx] = company_summary.growth_statement(total_rate, avg_rate, dropped, label)
+
+        return statements
     
+    def invest_statement(rounds: int, total_invest: int | float) -> str:
+        """Write the number of investment rounds and the total amount as a sentence"""
+        return f"재직 중 {rounds}건의 투자 유치 (총 {total_invest/1e8: .1f}억원 규모)."
+
     def invest_summary(invest: list) -> str:
         """
         Summarize the investment information of the company
@@ -149,7 +266,7 @@ class company_summary:
             rounds = [inv.get('level') for inv in invest if inv.get('level')]
             logger.debug(f"[DEBUG] Investment rounds parsed: {rounds}")
 
-            invest_statement = f"재직 중 {len(rounds)}건의 투자 유치 (총 {total_invest/1e8: .1f}억원 규모)."
+            invest_statement = company_summary.invest_statement(len(rounds), total_invest)
             logger.info(f"[INFO] Parsed investment statement: {invest_statement}")
 
             return invest_statement
@@ -213,6 +330,159 @@ class company_summary:
         
         return company_info_summary
 
+    def growth_summary_window(index: CompanyIndex, section: str, start: int, end: int, label: str = 'mau') -> str:
+        """
+        Summarize the mau or organization growth of a window from the growth index of the company
+
+        Parameters
+            - index (CompanyIndex): The indexes of the company document (parsing.company_index)
+            - section (str): 'mau' or 'organization'
+            - start (int): The first month key of the window (inclusive)
+            - end (int): The last month key of the window (inclusive)
+            - label (str): The data label to handle (default = 'mau') (for the organization '조직 규모')
+
+        Return
+            - statement (str): The same summary as growth_summary on the window records
+        """
+
+        try:
+            stats = getattr(index, f"{section}_growth").window(start, end)
+        except (KeyError, IndexError) as e:
+            logger.warning(f"[WARNING] Fail to parsing the {section} data - Period: {start} - {end}: {type(e).__name__}")
+            return f"{label} 정보 없음."
+
+        return company_summary.growth_summary_stats(stats, label)
+
+    def growth_summary_stats(stats: GrowthStats, label: str = 'mau') -> str:
+        """
+        Summarize the mau or organization growth of a window from its statistics
+
+        Parameters
+            - stats (GrowthStats): The growth statistics of the window
+            - label (str): The data label to handle (default = 'mau') (for the organization '조직 규모')
+
+        Return
+            - statement (str): The growth summary
+        """
+
+        if stats.records == 0:
+            return f"{label} 정보 없음."
+
+        if stats.first is None:
+            logger.error(f"[ERROR] {label} Fatal error during growth rate analysis: no values in the window")
+            return f"{label} 정보 분석 실패"
+
+        if not stats.first:
+            logger.warning(f"[WARNING] {label}: First value is 0 or None (value={stats.first})")
+            total_growth = 0
+        else:
+            total_growth = (stats.last - stats.first) / stats.first * 100
+
+        avg_monthly_growth = stats.growth_sum / stats.growth_count if stats.growth_count else 0
+
+        return company_summary.growth_statement(total_growth, avg_monthly_growth, stats.drops > 0, label)
+
+    def invest_summary_window(index: CompanyIndex, start: int, end: int) -> str:
+        """
+        Summarize the investments of a window from the prefix sums of the company (O(log n))
+
+        Parameters
+            - index (CompanyIndex): The indexes of the company document (parsing.company_index)
+            - start (int): The first month key of the window (inclusive)
+            - end (int): The last month key of the window (inclusive)
+
+        Return
+            - statement (str): The same summary as invest_summary on the window records
+        """
+
+        try:
+            totals = index.investment_totals.window(start, end)
+        except (KeyError, IndexError) as e:
+            logger.warning(f"[WARNING] Fail to parsing the investment data - Period: {start} - {end}: {type(e).__name__}")
+            return "재직 중 투자 정보 없음."
+
+        return company_summary.invest_summary_totals(totals)
+
+    def invest_summary_totals(totals: InvestTotals) -> str:
+        """Summarize the investments of a window from its totals"""
+
+        if totals.records == 0:
+            return "재직 중 투자 정보 없음."
+
+        return company_summary.invest_statement(totals.rounds, totals.amount)
+
+    def company_info_summary_window(company_data: dict, start_date: tuple[int, int], end_date: tuple[int, int]) -> str:
+        """
+        Summarize the company information of a tenure from the prefix sums of the company document
+
+        Parameters
+            - company_data (dict): The company data
+            - start_date (tuple[int, int]): Date (year and month) the talent started working for the company
+            - end_date (tuple[int, int]): Date (year and month) the talent left the company, or 'Present'
+
+        Return
+            - company_info_summary (str): The same summary as company_info_summary(parsing.get_company_info(...))
+        """
+
+        index = parsing.company_index(company_data)
+        start, end = parsing.tenure_months(start_date, end_date)
+
+        try:
+            finance = index.finance.window(start // 12, end // 12)
+        except (KeyError, IndexError) as e:
+            logger.warning(f"[WARNING] Fail to parsing the finance data - Period: {start} - {end}: {type(e).__name__}")
+            finance = []
+
+        company_info_summary = (f"- {company_summary.growth_summary_window(index, 'mau', start, end, 'mau')}\n"
+                                f"- {company_summary.invest_summary_window(index, start, end)}\n"
+                                f"- {company_summary.growth_summary_window(index, 'organization', start, end, '조직 규모')}\n"
+                                f"- {company_summary.fin_summary(finance)}\n")
+
+        return company_info_summary
+
+    def company_info_summary_document(company_data: dict, start_date: tuple[int, int], end_date: tuple[int, int]) -> str:
+        """
+        Summarize the company information of a tenure from the company document (when its series are not ingested)
+
+        The prefix sums of the document are used, and the window records if they cannot be built
+        (e.g., a record with a malformed month).
+
+        Parameters
+            - company_data (dict): The company data
+            - start_date (tuple[int, int]): Date (year and month) the talent started working for the company
+            - end_date (tuple[int, int]): Date (year and month) the talent left the company, or 'Present'
+
+        Return
+            - company_info_summary (str): The company information summary ("" if there is no company information)
+        """
+
+        try:
+            return company_summary.company_info_summary_window(company_data, start_date, end_date)
+        except Exception as e:
+            logger.warning(f"[WARNING] Fail to summarize the company information from the prefix sums, using the window records: {e}")
+
+        company_info = parsing.get_company_info(company_data, start_date, end_date)
+        return company_summary.company_info_summary(company_info) if company_info else ""
+
+    def company_info_summary_series(series: CompanySeries) -> str:
+        """
+        Summarize the company information of a tenure from the window aggregates of the database
+
+        Parameter
+            - series (CompanySeries): The window aggregates (parsing.get_company_series)
+
+        Return
+            - company_info_summary (str): The same summary as company_info_summary(parsing.get_company_info(...)).
+                                          The average growth may differ from it in the last floating point digits
+        """
+
+        company_info_summary = (f"- {company_summary.growth_summary_stats(series.mau, 'mau')}\n"
+                                f"- {company_summary.invest_summary_totals(series.investment)}\n"
+                                f"- {company_summary.growth_summary_stats(series.organization, '조직 규모')}\n"
+                                f"- {company_summary.fin_summary(series.finance)}\n")
+
+        return company_info_summary
+
 class news_summary:
     def get_top_news_title(news: list[str], top_n: int = 10) -> list[str]:
         """
@@ -228,17 +498,8 @@ class news_summary:
         try:
             logger.info(f"[INFO] Start summarize the news data. Number of input news: {len(news)}")
 
-            mecab = MeCab.Tagger(f"-r {os.getenv('MECABRC')} -d {os.getenv('DIC_PATH')}")
-            logger.info("[INFO] Completed reset MeCab tagger")
-
-            def tokenizer(text):
-                parsed = mecab.parse(text)
-                if parsed is None:
-                    logger.warning("[WARNING] The result of MeCab parsing is None")
-                    return []
-                return [line.split('\t')[0] for line in parsed.splitlines() if '\t' in line]
-            
-            vectorizer = TfidfVectorizer(tokenizer=tokenizer, token_pattern=None)
+            # The tagger is shared by the process and the tokens of a title are computed once
+            vectorizer = TfidfVectorizer(tokenizer=lambda text: list(tokenize(text)), token_pattern=None)
             tfidf_matrix = vectorizer.fit_transform(news)
             logger.info(f"[INFO] Completed TF-IDF vectorization. shape: {tfidf_matrix.shape}")
 
@@ -256,29 +517,48 @@ class news_summary:
         except Exception as e:
             logger.exception(f"[ERROR] Error occurs while parsing the top {top_n} news")
     
-    def get_3_news(top_news: list[dict], top_n: int = 3) -> list[dict]:
+    def rank_news_titles(news_list: list[dict], stats: NewsStats, top_n: int = 10) -> list[str]:
+        """
+        Get top 10 news titles using the TF-IDF statistics computed at news ingest (no fitting per request)
+
+        Parameters
+            - news_list (list[dict]): The company news (title, date and the tokens stored at ingest),
+                                      or the rollup candidates (title, date and their TF-IDF score)
+            - stats (NewsStats): The document frequencies of the company news
+            - top_n (int): The number of how many news titles that will get (default = 10)
+
+        Return
+            - top_n_news (list[str]): The list of the top n company news titles
+        """
+
+        # The rollup candidates were scored at ingest, and news ingested before indexing have no stored tokens yet
+        scores = [item['tfidf_score'] if 'tfidf_score' in item
+                  else stats.score(item.get('tokens') or title_tokens(item['title'])) for item in news_list]
+        ranked = sorted(zip((item['title'] for item in news_list), scores), key=lambda x: x[1], reverse=True)
+        logger.info(f"[INFO] Completed news scoring with the stored statistics ({stats.n_docs} documents)")
+
+        return [title for title, _ in ranked[:top_n]]
+
+    def get_3_news(top_news: list[dict], top_n: int = 3, keywords: list[str] | None = None) -> list[dict]:
         """
         Get the top 3 news using the latest date and the keyword-based weight scores
 
         Parameters
             - top_news (list[dict]): The list of the top 10 news that filtered with TF-IDF
+                                     (a stored 'keyword_score', e.g., of the rollup candidates, is used as is)
             - top_n (int): The number of how many news titles that will get (default = 3)
+            - keywords (list[str] | None): The keywords to score with (default = None, the configured news keywords)
         
         Return
             - top_scored_news (list[dict]): The list of the top n company news titles and their date
         """
 
-        keywords = ['매출', '흑자', '적자', '실적', '이익', '수익', '영업이익', '재무', '성장', '분기', '연간', '달성',
-                    '해외진출', '확장', '진출', '글로벌', '출시', '오픈', '출범', '런칭', '사업', '전략', '개편',
-                    'AI', '기술', '신기술', '서비스', '개발', '혁신', '솔루션', 'API', '모델', '플랫폼',
-                    '채용', '인재', '조직', '인사', '대표', 'CEO', '팀', '임원', '인력', '리더십',
-                    '투자', '시리즈', 'M&A', '인수', '지분', '유치', '펀딩', '상장', 'IPO',
-                    '사용자', '고객', 'MAU', '트래픽', '리텐션', '시장', '점유율', '경쟁', '반응',
-                    '규제', '이슈', '소송', '법', '정부', '정책', '감사', '과징금', '제재']
+        # The automaton is built once per keyword set and reused by every call
+        matcher = get_matcher(tuple(keywords) if keywords else news_keywords())
         
         today = date.today()
         
-        score = []
+        titles, dates, keyword_scores, days_counts = [], [], [], []
 
         for idx, item in enumerate(top_news):
             try:
@@ -289,38 +569,49 @@ class news_summary:
                     logger.warning(f"[WARNING] {idx} Invalid data: title='{title}', date='{news_date}'")
                     continue
 
-                # Keyword appearance score
-                # Remove duplicate keywords
-                matched_keywords = {key for key in keywords if key in title}
-                keyword_scores = len(matched_keywords)
-
-                # Date based weights (e.g., The oldest news is lower weights)
                 days_count = (today - news_date).days
-                date_weights = 1 / (math.log(days_count + 2))       # log scale weights -> A method to decay the score as the date gets older
-                                                                    #                   -> Boost the score for fresher news
-                
-                total_scores = keyword_scores * date_weights
-
-                score.append({'title': title,
-                            'date': news_date,
-                            'score': total_scores})
+
+                if days_count < 0:
+                    logger.warning(f"[WARNING] {idx} Invalid data: the news date '{news_date}' is in the future")
+                    continue
+
+                # Keyword appearance score (distinct keywords found in the title)
+                keyword_score = item.get('keyword_score')
+                keyword_scores.append(keyword_score if keyword_score is not None else len(matcher.matches(title)))
+                days_counts.append(days_count)
+                titles.append(title)
+                dates.append(news_date)
             
             except Exception as e:
                 logger.exception(f"[ERROR] Error occurs while scoring {idx} news: {e}")
                 continue
-        
-        # Get top n based on the score
-        top_scored_news = sorted(score, key=lambda x: x['score'], reverse=True)[:top_n]
-        logger.info(f"[INFO] Completed scoring the news: total {len(score)}")
+
+        if not titles:
+            logger.info("[INFO] Completed scoring the news: total 0")
+            return []
+
+        # Date based weights (e.g., The oldest news is lower weights)
+        date_weights = 1 / np.log(np.array(days_counts, dtype=np.float64) + 2)    # log scale weights -> A method to decay the score as the date gets older
+                                                                                    #                   -> Boost the score for fresher news
+        total_scores = np.array(keyword_scores, dtype=np.float64) * date_weights
+
+        # Get top n based on the score (stable, so ties keep the input order)
+        top_idx = np.argsort(-total_scores, kind='stable')[:top_n]
+        top_scored_news = [{'title': titles[i],
+                            'date': dates[i],
+                            'score': float(total_scores[i])} for i in top_idx]
+        logger.info(f"[INFO] Completed scoring the news: total {len(titles)}")
 
         return top_scored_news
     
-    def summarize_news(news_list: list[dict]) -> str:
+    def summarize_news(news_list: list[dict], stats: NewsStats | None = None) -> str:
         """
         Summarize the company news
 
         Parameter
             - top_3_news (dict): The dictionary of the filtered 3 company news
+            - stats (NewsStats | None): The stored TF-IDF statistics of the company news
+                                        (default = None, fit TF-IDF on the given news)
 
         Return
             - company_news_summary (str): The comapny news summary
@@ -329,7 +620,10 @@ class news_summary:
         try:
             titles = [title['title'] for title in news_list]
             logger.info(f"[INFO] Completed parsing the news title, total: {len(titles)}")
-            top_n_titles = news_summary.get_top_news_title(titles)
+            if stats is not None:
+                top_n_titles = news_summary.rank_news_titles(news_list, stats)
+            else:
+                top_n_titles = news_summary.get_top_news_title(titles)
             filtered_news = [item for item in news_list if item['title'] in top_n_titles]
             top_news = news_summary.get_3_news(filtered_news)
             logger.info("[INFO] Completed top 3 news selection")
@@ -350,28 +644,46 @@ class news_summary:
             logger.exception(f"[ERROR] Error occurs while the company news summarization: {e}")
             return "뉴스 요약 중 에러 발생"
 
-def summary(conn, profile: dict, profile_summary: str) -> str:
+def summary(conn, profile: dict, profile_summary: str,
+            max_workers: int = SUMMARY_WORKERS, task_timeout: float = SUMMARY_TASK_TIMEOUT, lookup=None,
+            on_position=None, cancel: CancelToken | None = None) -> str:
     """
     Summarize and combine all talent's profile, company information, and company news
 
     Parameters
         - profile (dict): Preprocessed profile of the talent
         - profile_summary (str): Summarized profile (exclude the company information and news)
+        - max_workers (int): The number of positions summarized concurrently (default = SUMMARY_WORKERS) (1 = sequential)
+        - task_timeout (float): Seconds to wait for each position summary in the worker-pool mode (default = SUMMARY_TASK_TIMEOUT)
+        - lookup (CompanyLookup | None): Shares company data and news between the talents of a batch (default = None, query directly)
+        - on_position (callable | None): Called with (index, position, summary_text) as each position is summarized, in order (default = None)
+        - cancel (CancelToken | None): Stops summarizing the remaining positions when cancelled (default = None)
 
     Return
         - full_summary (str): Summarized the full profile (include the company information and news)
     """
 
-    positions_summary = []
+    positions = profile['positions']
 
     # Get and summarize the company information and news by the position of the talent
-    for pos in profile['positions']:
-        try:
-            summary_text = summarize_position(conn, pos)
+    if max_workers > 1 and len(positions) > 1:
+        positions_summary = summarize_positions_parallel(conn, positions, max_workers, task_timeout, lookup, on_position, cancel)
+    else:
+        positions_summary = []
+
+        for idx, pos in enumerate(positions):
+            raise_if_cancelled(cancel, "position summary")
+
+            try:
+                summary_text = summarize_position(conn, pos, lookup)
+            except Exception as e:
+                logger.warning(f"[ERROR] Failed to summarize position '{pos}': {e}")
+                summary_text = position_error_summary(pos)
+
             positions_summary.append(summary_text)
-        except Exception as e:
-            logger.warning(f"[ERROR] Failed to summarize position '{pos}': {e}")
-            continue
+
+            if on_position is not None:
+                on_position(idx, pos, summary_text)
 
     try:
         filtered_profile = [line for line in profile_summary.splitlines() if '이름' not in line.strip()]
@@ -388,12 +700,90 @@ def summary(conn, profile: dict, profile_summary: str) -> str:
 
     return full_summary
 
-def summarize_position(conn, position: dict) -> str:
+def position_error_summary(position: dict, reason: str = "정보를 처리하는 중 오류 발생") -> str:
+    """The placeholder of a position that could not be summarized, so the career keeps every position"""
+
+    return f"회사명: {position.get('company')} - {reason}"
+
+def _wait_result(future, timeout: float, cancel: CancelToken | None = None):
+    """Wait for the future in short slices, so a cancellation is noticed while waiting"""
+
+    if cancel is None:
+        return future.result(timeout=timeout)
+
+    deadline = time.monotonic() + timeout
+
+    while True:
+        cancel.raise_if_cancelled("position summary")
+        remaining = deadline - time.monotonic()
+
+        try:
+            return future.result(timeout=max(0, min(CANCEL_POLL_INTERVAL, remaining)))
+        except FutureTimeoutError:
+            if remaining <= CANCEL_POLL_INTERVAL:
+                raise
+
+def summarize_positions_parallel(conn, positions: list[dict], max_workers: int = SUMMARY_WORKERS,
+                                 task_timeout: float = SUMMARY_TASK_TIMEOUT, lookup=None,
+                                 on_position=None, cancel: CancelToken | None = None) -> list[str]:
+    """
+    Summarize the positions concurrently with a bounded worker pool
+
+    The workers share the connection of the request (a psycopg2 connection is thread-safe, and after
+    the prefetch of the lookup they barely query), so a talent never holds more than one pooled connection.
+
+    Parameters
+        - positions (list[dict]): The positions of the talent
+        - max_workers (int): The maximum number of worker threads (default = SUMMARY_WORKERS)
+        - task_timeout (float): Seconds to wait for each position summary (default = SUMMARY_TASK_TIMEOUT)
+        - lookup (CompanyLookup | None): Shares company data and news between the talents of a batch (default = None)
+        - on_position (callable | None): Called with (index, position, summary_text) for each position, in order (default = None)
+        - cancel (CancelToken | None): Drops the pending positions when cancelled (default = None)
+
+    Return
+        - positions_summary (list[str]): The position summaries in their original order.
+                                         A failed or timed out position is replaced by an error placeholder
+    """
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(positions)), thread_name_prefix="summary")
+    positions_summary = []
+
+    try:
+        futures = [executor.submit(summarize_position, conn, pos, lookup) for pos in positions]
+
+        # Collect in submission order so the summary keeps the career order
+        for idx, (pos, future) in enumerate(zip(positions, futures)):
+            try:
+                summary_text = _wait_result(future, task_timeout, cancel)
+            except PipelineCancelled:
+                raise
+            except FutureTimeoutError:
+                future.cancel()
+                logger.warning(f"[WARNING] Timed out ({task_timeout}s) summarizing position '{pos.get('company')}'")
+                summary_text = position_error_summary(pos, "정보 조회 시간 초과")
+            except Exception as e:
+                logger.warning(f"[ERROR] Failed to summarize position '{pos}': {e}")
+                summary_text = position_error_summary(pos)
+
+            positions_summary.append(summary_text)
+
+            if on_position is not None:
+                on_position(idx, pos, summary_text)
+    finally:
+        # Do not block the request on a hung worker (or a cancelled request)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    logger.info(f"[INFO] Summarized {len(positions_summary)} positions with {max_workers} workers")
+
+    return positions_summary
+
+def summarize_position(conn, position: dict, lookup=None) -> str:
     """
     Summarize the company information and news of each position
 
     Parameter
         - position (dict): The position information 
+        - lookup (CompanyLookup | None): Shares company data and news between the talents of a batch (default = None, query directly)
     
     Return
         - position_summary (str): The summary of each position
@@ -412,16 +802,24 @@ def summarize_position(conn, position: dict) -> str:
             today = date.today()
             end_str = f"{today.year}.{today.month:02d}"
         
-        company_data = parsing.get_company_data(conn, company_name)
+        # The batch lookup has the same interface as parsing (company documents go through the process-wide cache)
+        source = lookup if lookup is not None else parsing
+        company_source = lookup if lookup is not None else company_cache
+
+        # The window aggregates of an ingested company are computed by the database, without reading its document
+        series = source.get_company_series(conn, company_name, start_date, end_date)
+        company_data = company_source.get_company_data(conn, company_name) if series is None else None
         info_summary = ""
         company_news_summary = ""
 
-        if company_data:
-            company_info = parsing.get_company_info(company_data, start_date, end_date)
-
-            if company_info:
-                company_info_summary = company_summary.company_info_summary(company_info)
+        # The document holds only the summary sections, so a known company may have an empty one
+        if series is not None or company_data is not None:
+            if series is not None:
+                company_info_summary = company_summary.company_info_summary_series(series)
+            else:
+                company_info_summary = company_summary.company_info_summary_document(company_data, start_date, end_date)
 
+            if company_info_summary:
                 filtered_summary = [line for line in company_info_summary.splitlines() if '정보 없음' not in line.strip()]
 
                 if filtered_summary:
@@ -431,10 +829,17 @@ def summarize_position(conn, position: dict) -> str:
                     logger.info(f"[INFO] No useful company info found for {company_name}")
                     info_summary = ""
             
-            news_data = parsing.get_company_news(conn, company_name, start_date, end_date)
+            # The monthly rollups hold the only news of a month that can rank in a window, so they are merged
+            # instead of fetching every news of the window (until the rollups of the company are built)
+            stats = news_stats.get(conn, company_name)
+
+            if stats is not None and stats.rolled_up:
+                news_data = source.get_news_rollup(conn, company_name, start_date, end_date)
+            else:
+                news_data = source.get_company_news(conn, company_name, start_date, end_date)
 
             if news_data:
-                company_news_summary = f"\n\n[재직 중 주요 뉴스 요약]\n{news_summary.summarize_news(news_data)}"
+                company_news_summary = f"\n\n[재직 중 주요 뉴스 요약]\n{news_summary.summarize_news(news_data, stats)}"
                 logger.info(f"[INFO] News summary added for {company_name}")
             else:
                 logger.warning(f"[WARNING] No news data found for {company_name}")
@@ -455,8 +860,8 @@ def summarize_position(conn, position: dict) -> str:
         return summarize_info_news
     
     except Exception as e:
-        logger.error(f"[ERROR] Failed to summarize position info for {company_name}: {e}", exc_info=True)
-        return f"회사명: {company_name} - 정보를 처리하는 중 오류 발생"
+        logger.error(f"[ERROR] Failed to summarize position info for {position.get('company')}: {e}", exc_info=True)
+        return position_error_summary(position)
 
 
 def summary_short(conn, profile: dict, profile_summary: str, max_positions: int = 3) -> str:
@@ -0,0 +1,104 @@
+import os
+from logger_utils import logger
+
+
+TAG_VOTE_MODE = os.getenv("TAG_VOTE_MODE", "weighted").lower()              # top1 | majority | weighted
+TAG_VOTE_K = int(os.getenv("TAG_VOTE_K", 5))                                # Neighbours fetched by the similarity search
+TAG_VOTE_MIN_SIMILARITY = float(os.getenv("TAG_VOTE_MIN_SIMILARITY", 0.75)) # Neighbours below this similarity do not vote
+TAG_VOTE_MIN_NEIGHBOURS = int(os.getenv("TAG_VOTE_MIN_NEIGHBOURS", 3))      # Voting neighbours needed to decide locally
+TAG_VOTE_AGREEMENT = float(os.getenv("TAG_VOTE_AGREEMENT", 0.6))            # Share of the votes a tag needs to be kept
+
+VOTE_MODES = ("top1", "majority", "weighted")
+
+
+def tag_names(tags: list) -> list[str]:
+    """
+    Get the tag names from the stored tags
+
+    Parameter
+        - tags (list): The tags of a talent, either GPT tags (list[dict] with 'tag' and 'reason') or tag names (list[str])
+
+    Return
+        - (list[str]): The tag names
+    """
+
+    names = []
+
+    for tag in tags or []:
+        name = tag.get('tag') if isinstance(tag, dict) else tag
+        if name:
+            names.append(name)
+
+    return names
+
+def vote_tags(neighbours: list[tuple], threshold: float = 0.85, mode: str = TAG_VOTE_MODE,
+              min_similarity: float = TAG_VOTE_MIN_SIMILARITY, min_neighbours: int = TAG_VOTE_MIN_NEIGHBOURS,
+              agreement: float = TAG_VOTE_AGREEMENT) -> list[str] | None:
+    """
+    Decide the tags from the nearest talents, without calling the GPT model
+
+    If the nearest talent reaches the threshold, its tags are used (every mode).
+    Otherwise, in the 'majority' and 'weighted' modes, the neighbours above `min_similarity` vote:
+    a tag is kept when its share of the votes reaches `agreement` (one vote per neighbour in 'majority',
+    the neighbour's similarity as the vote in 'weighted').
+
+    Parameters
+        - neighbours (list[tuple]): (talent_id, similarity, tags) of the nearest talents, the most similar first
+                                    (neighbours whose similarity is None are skipped)
+        - threshold (float): The similarity threshold to reuse the nearest talent's tags (default = 0.85)
+        - mode (str): The aggregation mode, 'top1', 'majority' or 'weighted' (default = TAG_VOTE_MODE)
+        - min_similarity (float): The minimum similarity of a voting neighbour (default = TAG_VOTE_MIN_SIMILARITY)
+        - min_neighbours (int): The minimum number of voting neighbours (default = TAG_VOTE_MIN_NEIGHBOURS)
+        - agreement (float): The share of the votes a tag needs (default = TAG_VOTE_AGREEMENT)
+
+    Return
+        - (list[str] | None): The tags, most agreed first, or None if the GPT model should decide
+    """
+
+    if mode not in VOTE_MODES:
+        raise ValueError(f"Unknown tag vote mode: {mode} (expected one of {VOTE_MODES})")
+
+    # A neighbour without a similarity (no embedding) cannot be compared
+    neighbours = [neighbour for neighbour in neighbours if neighbour[1] is not None]
+
+    if not neighbours:
+        return None
+
+    top_id, top_similarity, top_tags = neighbours[0]
+
+    if top_similarity >= threshold:
+        logger.info(f"[INFO] [Tag Vote] Nearest talent {top_id} reaches the threshold ({top_similarity:.3f} >= {threshold})")
+        return tag_names(top_tags)
+
+    if mode == "top1":
+        return None
+
+    voters = [(similarity, tag_names(tags)) for _, similarity, tags in neighbours if similarity >= min_similarity]
+
+    if len(voters) < min_neighbours:
+        logger.info(f"[INFO] [Tag Vote] Not enough close neighbours to vote ({len(voters)} < {min_neighbours})")
+        return None
+
+    scores = {}
+    total = 0.0
+
+    for similarity, names in voters:
+        weight = similarity if mode == "weighted" else 1.0
+        total += weight
+
+        for name in dict.fromkeys(names):       # One vote per tag and neighbour
+            scores[name] = scores.get(name, 0.0) + weight
+
+    if total <= 0:
+        return None
+
+    # Stable sort keeps the order of first appearance (the most similar neighbour first) for ties
+    agreed = [name for name, score in sorted(scores.items(), key=lambda x: x[1], reverse=True) if score / total >= agreement]
+
+    if not agreed:
+        logger.info(f"[INFO] [Tag Vote] {len(voters)} neighbours do not agree on any tag")
+        return None
+
+    logger.info(f"[INFO] [Tag Vote] {len(voters)} neighbours agree on {len(agreed)} tags ({mode})")
+
+    return agreed
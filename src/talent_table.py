@@ -1,37 +1,28 @@
 import os
 import json
+import threading
+from contextlib import contextmanager
 import psycopg2
-from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 from psycopg2.extras import Json
 import hashlib
 import numpy as np
+from .db import get_connection
 from logger_utils import logger
 
-DB_CONFIG = {
-    "host": "localhost",
-    "port": 5432,
-    "user": os.getenv("POSTGRES_USER", "searchright"),
-    "password": os.getenv("POSTGRES_PASSWORD", "searchright"),
-    "database": os.getenv("POSTGRES_DB", "searchright"),
-}
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", 1536))                  # text-embedding-3-small
+VECTOR_INDEX_TYPE = os.getenv("VECTOR_INDEX_TYPE", "hnsw").lower()      # hnsw | ivfflat
 
-def connect_to_db():
-    """데이터베이스에 연결"""
-    try:
-        conn = psycopg2.connect(
-            host=DB_CONFIG["host"],
-            port=DB_CONFIG["port"],
-            user=DB_CONFIG["user"],
-            password=DB_CONFIG["password"],
-            database=DB_CONFIG["database"],
-        )
-        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
-        logger.info(f"[INFO] 성공적으로 {DB_CONFIG['database']} 데이터베이스에 연결했습니다.")
-        return conn
-    except psycopg2.Error as e:
-        print(f'ERROR: {e}')
-        logger.error(f"[ERROR] 데이터베이스 연결 오류: {e}")
-        raise
+# Index build parameters
+HNSW_M = int(os.getenv("HNSW_M", 16))
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", 64))
+IVFFLAT_LISTS = int(os.getenv("IVFFLAT_LISTS", 100))
+
+# Default search parameters (can be overridden per call)
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", 40))
+IVFFLAT_PROBES = int(os.getenv("IVFFLAT_PROBES", 10))
+
+_schema_ready = False
+_schema_lock = threading.Lock()
 
 def create_talent_table(conn):
     """Talent 테이블 생성 (존재하지 않을 경우)"""
@@ -50,29 +41,111 @@ def create_talent_table(conn):
 
             if not table_exists:
                 logger.info(
-                    "[INFO] company 테이블이 존재하지 않습니다. 새로운 테이블을 생성합니다."
+                    "[INFO] talent 테이블이 존재하지 않습니다. 새로운 테이블을 생성합니다."
                 )
                 cursor.execute(
-                    """
+                    f"""
                     CREATE TABLE talent (
                         id SERIAL PRIMARY KEY,
                         name VARCHAR(255) NOT NULL,
                         profile TEXT,
                         tags JSONB NOT NULL,
+                        embedding vector({EMBEDDING_DIM}),
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                     );
                 """
                 )
-                logger.info("[INFO] company 테이블이 성공적으로 생성되었습니다.")
+                logger.info("[INFO] talent 테이블이 성공적으로 생성되었습니다.")
             else:
                 logger.info(
-                    "[INFO] company 테이블이 이미 존재합니다. 테이블 생성을 건너뜁니다."
+                    "[INFO] talent 테이블이 이미 존재합니다. 테이블 생성을 건너뜁니다."
                 )
     except psycopg2.Error as e:
         logger.error(f"[ERROR] 테이블 생성 오류: {e}")
         raise
 
 
+def migrate_talent_table(conn):
+    """
+    Bring the talent table to the current schema
+
+    - Enable the pgvector extension
+    - Add the typed `embedding vector(EMBEDDING_DIM)` column (or convert an untyped one)
+    - Build the cosine ANN index (HNSW by default, IVFFlat with VECTOR_INDEX_TYPE=ivfflat)
+    """
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS vector;")
+
+        create_talent_table(conn)
+
+        with conn.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE talent ADD COLUMN IF NOT EXISTS embedding vector({EMBEDDING_DIM});")
+
+            # An embedding column created by hand (e.g., float8[] or vector without dimension) is converted
+            cursor.execute(
+                """
+                SELECT format_type(a.atttypid, a.atttypmod)
+                FROM pg_attribute a
+                WHERE a.attrelid = 'talent'::regclass AND a.attname = 'embedding' AND NOT a.attisdropped;
+                """
+            )
+            column_type = cursor.fetchone()[0]
+
+            if column_type != f"vector({EMBEDDING_DIM})":
+                logger.info(f"[INFO] Converting talent.embedding from {column_type} to vector({EMBEDDING_DIM})")
+                cursor.execute(
+                    f"ALTER TABLE talent ALTER COLUMN embedding TYPE vector({EMBEDDING_DIM}) "
+                    f"USING embedding::vector({EMBEDDING_DIM});"
+                )
+
+            if VECTOR_INDEX_TYPE == "ivfflat":
+                # IVFFlat clusters the existing rows, so it should be (re)built once the table has data
+                cursor.execute(
+                    f"""
+                    CREATE INDEX IF NOT EXISTS talent_embedding_ivfflat_idx
+                    ON talent USING ivfflat (embedding vector_cosine_ops) WITH (lists = {IVFFLAT_LISTS});
+                    """
+                )
+            else:
+                cursor.execute(
+                    f"""
+                    CREATE INDEX IF NOT EXISTS talent_embedding_hnsw_idx
+                    ON talent USING hnsw (embedding vector_cosine_ops)
+                    WITH (m = {HNSW_M}, ef_construction = {HNSW_EF_CONSTRUCTION});
+                    """
+                )
+
+        logger.info(f"[INFO] talent 테이블 스키마 확인 완료 (embedding vector({EMBEDDING_DIM}), {VECTOR_INDEX_TYPE} cosine index)")
+
+    except psycopg2.Error as e:
+        logger.error(f"[ERROR] talent 테이블 마이그레이션 오류: {e}")
+        raise
+
+def ensure_talent_schema(conn):
+    """Run the talent table migration once per process"""
+
+    global _schema_ready
+
+    if _schema_ready:
+        return
+
+    with _schema_lock:
+        if not _schema_ready:
+            migrate_talent_table(conn)
+            _schema_ready = True
+
+def init_talent_table():
+    """Migrate the talent table and build its vector index at startup"""
+
+    with get_connection() as conn:
+        ensure_talent_schema(conn)
+
+def to_vector(embedding) -> str:
+    """Format an embedding as a pgvector literal ('[x1,x2,...]')"""
+    return "[" + ",".join(str(float(x)) for x in embedding) + "]"
+
+
 def insert_talent_data(conn, name: str, summary: str, tags: list[dict], embeddings: list[float]):
     """Insert the talent data to the talent table"""
     try:
@@ -89,8 +162,8 @@ def insert_talent_data(conn, name: str, summary: str, tags: list[dict], embeddin
 
             # Insert data
             cursor.execute(
-                "INSERT INTO talent (name, profile, tags, embedding) VALUES (%s, %s, %s, %s)",
-                (name, summary, tags, embeddings),
+                "INSERT INTO talent (name, profile, tags, embedding) VALUES (%s, %s, %s, %s::vector)",
+                (name, summary, Json(tags), to_vector(embeddings)),
             )
             conn.commit()
             logger.info(f"[INFO] 회사 '{name}'의 데이터가 성공적으로 삽입되었습니다.")
@@ -105,46 +178,95 @@ def generate_anon_name(real_name: str) -> str:
     hashed = hashlib.sha256(real_name.encode()).hexdigest()
     return f"talent-{hashed[:10]}"
 
-def table_main(name: str, profile: str, tags: list[dict], embeddings: list[float]):
-    conn = connect_to_db()
-    create_talent_table(conn)
+def table_main(conn, name: str, profile: str, tags: list[dict], embeddings: list[float]):
+    """Store the talent on the request's pooled connection"""
+    ensure_talent_schema(conn)
 
     hashed_name = generate_anon_name(name)
-    inserted = insert_talent_data(conn, hashed_name, profile, embeddings)
+    inserted = insert_talent_data(conn, hashed_name, profile, tags, embeddings)
 
     if inserted:
         print(f"{name} save completed")
     else:
         print(f"{name} already exists")
 
-def find_similar_talent(conn, new_embedding: np.ndarray, threshold: float = 0.85):
+@contextmanager
+def _search_transaction(conn):
+    """Open a transaction so the search parameters set with SET LOCAL only apply to this query"""
+
+    if not conn.autocommit:
+        yield
+        return
+
+    with conn.cursor() as cursor:
+        cursor.execute("BEGIN")
+    try:
+        yield
+    finally:
+        with conn.cursor() as cursor:
+            cursor.execute("COMMIT")     # Ends (and rolls back) an aborted transaction as well
+
+def find_similar_talents(conn, new_embedding: np.ndarray, k: int = 5,
+                         ef_search: int | None = None, probes: int | None = None) -> list[tuple]:
+    """
+    Find the k most similar talents with a new talent, together with their tags, based on pgvector
+
+    Parameters
+        - new_embedding (numpy ndarray): The embedding vector of the new talent
+        - k (int): The number of neighbours (default = 5)
+        - ef_search (int | None): HNSW candidate list size, higher is more accurate but slower (default = HNSW_EF_SEARCH)
+        - probes (int | None): IVFFlat lists to scan, higher is more accurate but slower (default = IVFFLAT_PROBES)
+
+    Return
+        - neighbours (list[tuple]): (talent_id, similarity, tags) of the neighbours, the most similar first
+    """
+
+    vector = to_vector(new_embedding)
+
+    with _search_transaction(conn), conn.cursor() as cursor:
+        if VECTOR_INDEX_TYPE == "ivfflat":
+            cursor.execute("SELECT set_config('ivfflat.probes', %s, true);", (str(probes or IVFFLAT_PROBES),))
+        else:
+            cursor.execute("SELECT set_config('hnsw.ef_search', %s, true);", (str(max(ef_search or HNSW_EF_SEARCH, k)),))
+
+        # Use cosine distance (<=>) so the ANN index is used and 1 - distance is the cosine similarity
+        # (a talent without an embedding has no similarity)
+        cursor.execute("""
+        SELECT id, 1 - (embedding <=> %s::vector) AS similarity, tags
+        FROM talent
+        WHERE embedding IS NOT NULL
+        ORDER BY embedding <=> %s::vector ASC
+        LIMIT %s;
+        """, (vector, vector, k))
+
+        neighbours = cursor.fetchall()
+
+    logger.info(f"[INFO] Found {len(neighbours)} similar talents (k={k})")
+
+    return neighbours
+
+def find_similar_talent(conn, new_embedding: np.ndarray, threshold: float = 0.85,
+                        ef_search: int | None = None, probes: int | None = None):
     """
     Find the most similar talent with a new talent based on pgvector
 
     Parameters
         - new_embedding (numpy ndarray): The embedding vector of the new talent
         - threshold (float): The similarity threshold (default = 0.85) (If it is lower than this, return None)
+        - ef_search (int | None): HNSW candidate list size, higher is more accurate but slower (default = HNSW_EF_SEARCH)
+        - probes (int | None): IVFFlat lists to scan, higher is more accurate but slower (default = IVFFLAT_PROBES)
 
     Return
         - similarity_result ((talent_id, similarity)): The most similarity id and its score, or None
     """
 
-    with conn.cursor() as cursor:
-        # Use cosine distance to get similarity
-        cursor.execute("""
-        SELECT id, 1 - (embedding <-> %s::vector) AS similarity
-        FROM talent
-        ORDER BY embedding <-> %s::vector ASC
-        LIMIT 1;
-        """, (new_embedding, new_embedding))
-
-        result = cursor.fetchone()
-
-        if result:
-            talent_id, similarity = result
-            if similarity >= threshold:
-                similarity_result = (talent_id, similarity)
-                
-                return similarity_result
-        
-        return None
\ No newline at end of file
+    neighbours = find_similar_talents(conn, new_embedding, 1, ef_search, probes)
+
+    if neighbours:
+        talent_id, similarity, _ = neighbours[0]
+        if similarity >= threshold:
+            similarity_result = (talent_id, similarity)
+            
+            return similarity_result
+    
+    return None
@@ -0,0 +1,113 @@
+import time
+import threading
+import pytest
+from cache import LRUCache, SingleFlight
+
+def test_lru_eviction():
+    """
+    Test if the least recently used entry is evicted first
+    """
+
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    assert cache.get("a") == 1      # "b" becomes the least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+def test_ttl_expiration():
+    """
+    Test if an entry expires after its time-to-live
+    """
+
+    cache = LRUCache(max_entries=10, ttl=0.05)
+    cache.set("key", "value")
+
+    assert cache.get("key") == "value"
+    time.sleep(0.1)
+    assert cache.get("key") is None
+    assert cache.stats()["expirations"] == 1
+
+def test_hit_miss_stats():
+    """
+    Test if hits and misses are counted well
+    """
+
+    cache = LRUCache(max_entries=10)
+    cache.set("key", "value")
+
+    cache.get("key")
+    cache.get("other")
+    stats = cache.stats()
+
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+def test_invalid_size():
+    """
+    Test if a non-positive size is rejected
+    """
+
+    with pytest.raises(ValueError):
+        LRUCache(max_entries=0)
+
+def test_singleflight_coalesces_concurrent_calls():
+    """
+    Test if concurrent calls with the same key share a single execution
+    """
+
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    executions = []
+    results = []
+
+    def slow_call():
+        executions.append(1)
+        started.set()
+        release.wait(timeout=5)
+        return "tags"
+
+    def caller():
+        results.append(flight.do("key", slow_call))
+
+    leader = threading.Thread(target=caller)
+    leader.start()
+    started.wait(timeout=5)
+
+    followers = [threading.Thread(target=caller) for _ in range(4)]
+    for t in followers:
+        t.start()
+
+    # Let the followers reach the in-flight call before it finishes
+    while flight.stats()["coalesced"] < 4:
+        time.sleep(0.01)
+    release.set()
+
+    for t in [leader] + followers:
+        t.join(timeout=5)
+
+    assert len(executions) == 1
+    assert results == ["tags"] * 5
+    assert flight.stats()["in_flight"] == 0
+
+def test_singleflight_shares_errors():
+    """
+    Test if the error of the call is raised and the key can be retried afterwards
+    """
+
+    flight = SingleFlight()
+
+    def failing_call():
+        raise RuntimeError("upstream error")
+
+    with pytest.raises(RuntimeError):
+        flight.do("key", failing_call)
+
+    assert flight.do("key", lambda: "retried") == "retried"
@@ -0,0 +1,88 @@
+import pytest
+from types import SimpleNamespace
+import gpt
+from gpt import embed_texts, average_embeddings, profile_embedding
+
+
+class StubEmbeddings:
+    """
+    Stub of client.embeddings: the vector of a text is [len(text), 1.0]
+
+    A request containing a text of `fail` raises, and the texts of `drop` get no embedding in the response
+    """
+
+    def __init__(self, fail: set[str] = frozenset(), drop: set[str] = frozenset()):
+        self.fail = fail
+        self.drop = drop
+        self.requests = []
+
+    def create(self, model, input):
+        self.requests.append(list(input))
+
+        if self.fail & set(input):
+            raise RuntimeError("embedding request failed")
+
+        return SimpleNamespace(data=[SimpleNamespace(index=idx, embedding=[float(len(text)), 1.0])
+                                     for idx, text in enumerate(input) if text not in self.drop])
+
+@pytest.fixture
+def stub_client(monkeypatch):
+    def install(fail: set[str] = frozenset(), drop: set[str] = frozenset()) -> StubEmbeddings:
+        embeddings = StubEmbeddings(fail, drop)
+        monkeypatch.setattr(gpt, "client", SimpleNamespace(embeddings=embeddings))
+        monkeypatch.setattr(gpt.embedding_cache, "enabled", False)
+        return embeddings
+
+    return install
+
+def test_embed_texts_batches(stub_client):
+    """
+    Test if the texts are sent once (duplicates included) in batches and returned in their order
+    """
+
+    embeddings = stub_client()
+    texts = ["a", "bb", "a", "ccc", "dddd"]
+
+    vectors = embed_texts(texts, batch_size=2, max_concurrency=2)
+
+    assert vectors == [[1.0, 1.0], [2.0, 1.0], [1.0, 1.0], [3.0, 1.0], [4.0, 1.0]]
+    assert sorted(len(request) for request in embeddings.requests) == [2, 2]
+
+def test_embed_texts_partial_failure(stub_client):
+    """
+    Test if only the texts of a failed batch are None
+    """
+
+    stub_client(fail={"ccc"})
+
+    vectors = embed_texts(["a", "bb", "ccc", "dddd"], batch_size=2, max_concurrency=2)
+
+    assert vectors == [[1.0, 1.0], [2.0, 1.0], None, None]
+
+def test_average_embeddings():
+    """
+    Test if the average is weighted and skips the failed chunks
+    """
+
+    assert average_embeddings([[1.0, 0.0], None, [4.0, 3.0]], [1, 5, 2]) == pytest.approx([3.0, 2.0])
+    assert average_embeddings([None, None], [1, 1]) is None
+
+def test_profile_embedding_coverage(stub_client, monkeypatch):
+    """
+    Test if a profile is embedded from the chunks that succeeded, unless too little of the text was embedded
+    """
+
+    monkeypatch.setattr(gpt, "TEXT_TOKEN_LIMIT", 4)
+    monkeypatch.setattr(gpt, "EMBEDDING_MIN_COVERAGE", 0.5)
+
+    # Chunks "aaaa", "bbbb", "cc": the missing chunk (2 of 10 characters) is left out of the average
+    stub_client(drop={"cc"})
+    assert profile_embedding("aaaabbbbcc") == pytest.approx([4.0, 1.0])
+
+    # "bbbb" and "cc" are missing: 4 of 10 characters is below the coverage threshold
+    stub_client(drop={"bbbb", "cc"})
+    assert profile_embedding("aaaabbbbcc") is None
+
+    # The request failed: nothing was embedded
+    stub_client(fail={"aaaa"})
+    assert profile_embedding("aaaabbbbcc") is None
@@ -0,0 +1,204 @@
+import threading
+import uuid
+from contextlib import contextmanager
+import pytest
+import jobs
+from jobs import JobQueue
+
+
+class FakeJobTable:
+    """In-memory talent_job table answering the statements of JobQueue, with a clock moved by the test"""
+
+    def __init__(self):
+        self.rows = {}
+        self.now = 0.0
+        self.lock = threading.Lock()
+
+    def insert_running(self, attempts: int = 1) -> str:
+        """A job claimed by a worker that crashed"""
+
+        job_id = str(uuid.uuid4())
+        self.rows[job_id] = {"status": "running", "threshold": 0.85, "talent": {"name": job_id}, "tags": None,
+                             "error": None, "attempts": attempts, "created_at": self.now, "updated_at": self.now}
+        return job_id
+
+    def execute(self, query: str, params) -> tuple[list, int]:
+        query = " ".join(query.split())
+
+        with self.lock:
+            if query.startswith("CREATE TABLE"):
+                return [], 0
+
+            if query.startswith("INSERT INTO talent_job"):
+                job_id, threshold, talent = params
+                self.rows[job_id] = {"status": "queued", "threshold": threshold, "talent": talent.adapted,
+                                     "tags": None, "error": None, "attempts": 0,
+                                     "created_at": self.now, "updated_at": self.now}
+                return [], 1
+
+            if "SET status = 'running'" in query:
+                row = self.rows.get(params[0])
+                if row is None or row["status"] != "queued":
+                    return [], 0
+                row.update(status="running", attempts=row["attempts"] + 1, updated_at=self.now)
+                return [(row["talent"], row["threshold"])], 1
+
+            if "SET status = %s, tags = %s" in query:
+                status, tags, error, job_id = params
+                self.rows[job_id].update(status=status, tags=tags and tags.adapted, error=error, updated_at=self.now)
+                return [], 1
+
+            if "SET updated_at = CURRENT_TIMESTAMP" in query:
+                rows = [self.rows[job_id] for job_id in params[0] if self.rows[job_id]["status"] == "running"]
+                for row in rows:
+                    row["updated_at"] = self.now
+                return [], len(rows)
+
+            if "error = 'Interrupted too many times'" in query:
+                max_attempts, recover_after = params
+                rows = [row for row in self.rows.values() if row["status"] == "running"
+                        and row["attempts"] >= max_attempts and row["updated_at"] < self.now - recover_after]
+                for row in rows:
+                    row.update(status="failed", error="Interrupted too many times", updated_at=self.now)
+                return [], len(rows)
+
+            if "SET status = 'queued'" in query:
+                rows = [row for row in self.rows.values()
+                        if row["status"] == "running" and row["updated_at"] < self.now - params[0]]
+                for row in rows:
+                    row.update(status="queued", updated_at=self.now)
+                return [], len(rows)
+
+            if query.startswith("SELECT id FROM talent_job WHERE status = 'queued'"):
+                queued = sorted((row["created_at"], job_id) for job_id, row in self.rows.items() if row["status"] == "queued")
+                return [(job_id,) for _, job_id in queued], len(queued)
+
+        raise AssertionError(f"Unexpected query: {query}")
+
+
+class FakeCursor:
+    def __init__(self, table: FakeJobTable):
+        self.table = table
+        self.result = []
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        self.result, self.rowcount = self.table.execute(query, params)
+
+    def fetchone(self):
+        return self.result[0] if self.result else None
+
+    def fetchall(self):
+        return self.result
+
+
+class FakeConnection:
+    def __init__(self, table: FakeJobTable):
+        self.table = table
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def cursor(self):
+        return FakeCursor(self.table)
+
+
+@pytest.fixture
+def table(monkeypatch):
+    table = FakeJobTable()
+
+    @contextmanager
+    def get_connection():
+        yield FakeConnection(table)
+
+    monkeypatch.setattr(jobs, "get_connection", get_connection)
+    monkeypatch.setattr(jobs, "create_job_table", lambda conn: None)
+    return table
+
+@pytest.fixture
+def release(monkeypatch):
+    """process_talent waits for the event, so the test sees the jobs while they run"""
+
+    release = threading.Event()
+
+    def process_talent(talent, threshold):
+        assert release.wait(5)
+        return ["tag"]
+
+    monkeypatch.setattr(jobs, "process_talent", process_talent)
+    return release
+
+def wait_status(table: FakeJobTable, job_id: str, status: str):
+    for _ in range(500):
+        if table.rows[job_id]["status"] == status:
+            return
+        threading.Event().wait(0.01)
+
+    raise AssertionError(f"Job {job_id} is {table.rows[job_id]['status']}, expected {status}")
+
+def test_job_queued_running_done(table, release):
+    """
+    Test if a submitted job goes queued -> running -> done
+    """
+
+    queue = JobQueue(max_workers=1)
+    job_id = queue.submit({"name": "talent"})
+
+    wait_status(table, job_id, "running")
+    assert table.rows[job_id]["attempts"] == 1
+
+    release.set()
+    wait_status(table, job_id, "done")
+    assert table.rows[job_id]["tags"] == ["tag"]
+
+    queue.shutdown()
+
+def test_abandoned_job_recovered(table, release):
+    """
+    Test if a job left running by a crashed worker is recovered once its heartbeat is stale,
+    while the job running in this process is kept alive by its heartbeat
+    """
+
+    queue = JobQueue(max_workers=2)
+    local_id = queue.submit({"name": "local"})
+    wait_status(table, local_id, "running")
+
+    abandoned_id = table.insert_running()
+    table.now += jobs.JOB_RECOVER_AFTER / 2
+    assert queue.recover() == 0                 # Not stale yet
+    assert table.rows[abandoned_id]["status"] == "running"
+
+    table.now += jobs.JOB_RECOVER_AFTER
+    assert queue.heartbeat() == 1
+    assert queue.recover() == 1
+
+    release.set()
+    wait_status(table, abandoned_id, "done")
+    wait_status(table, local_id, "done")
+    assert table.rows[abandoned_id]["attempts"] == 2
+    assert table.rows[local_id]["attempts"] == 1
+
+    queue.shutdown()
+
+def test_job_interrupted_too_many_times(table, release):
+    """
+    Test if a job abandoned JOB_MAX_ATTEMPTS times is marked failed instead of being recovered
+    """
+
+    queue = JobQueue(max_workers=1)
+    job_id = table.insert_running(attempts=jobs.JOB_MAX_ATTEMPTS)
+
+    table.now += jobs.JOB_RECOVER_AFTER + 1
+    assert queue.recover() == 0
+    assert table.rows[job_id]["status"] == "failed"
+
+    queue.shutdown()
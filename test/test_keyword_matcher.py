@@ -0,0 +1,40 @@
+from keyword_matcher import KeywordMatcher, get_matcher, load_keywords
+
+KEYWORDS = ['매출', '영업이익', '이익', 'AI', 'API', 'M&A', '인수', '투자']
+
+def test_matches_like_substring():
+    """
+    Test if the matcher finds the same keywords as a substring check, including overlapping ones
+    """
+
+    matcher = KeywordMatcher(KEYWORDS)
+    titles = ["영업이익 흑자 전환, 매출 2배", "AI API 출시", "M&A로 인수 완료", "관련 없는 뉴스", "", "APAI"]
+
+    for title in titles:
+        assert matcher.matches(title) == {key for key in KEYWORDS if key in title}
+
+def test_duplicate_keywords():
+    """
+    Test if duplicated and empty keywords are ignored and a keyword is counted once per title
+    """
+
+    matcher = KeywordMatcher(['투자', '투자', ''])
+    assert matcher.keywords == ('투자',)
+    assert matcher.matches("투자 유치 후 추가 투자") == {'투자'}
+
+def test_matcher_built_once():
+    """
+    Test if the matcher of a keyword set is built once and reused
+    """
+
+    assert get_matcher(tuple(KEYWORDS)) is get_matcher(tuple(KEYWORDS))
+
+def test_load_keywords(tmp_path):
+    """
+    Test if the keyword file is read line by line and comma by comma, without comments
+    """
+
+    path = tmp_path / "keywords.txt"
+    path.write_text("# 재무\n매출, 흑자\n\nAI  # 기술\n", encoding="utf-8")
+
+    assert load_keywords(str(path)) == ['매출', '흑자', 'AI']
@@ -0,0 +1,84 @@
+import random
+import pytest
+from collections import Counter
+from datetime import date
+from itertools import groupby
+from sklearn.feature_extraction.text import TfidfVectorizer
+from news_index import NewsStats, month_candidates
+from summarize import news_summary
+
+CORPUS = [["카카오", "투자", "유치"],
+          ["카카오", "매출", "증가", "매출"],
+          ["신규", "서비스", "출시"],
+          ["투자", "유치", "완료", "투자"],
+          ["카카오", "서비스", "종료"]]
+
+def corpus_stats(corpus: list[list[str]]) -> NewsStats:
+    """The statistics stored at ingest: the number of documents and the document frequency of each token"""
+
+    df = Counter(token for tokens in corpus for token in set(tokens))
+    return NewsStats(len(corpus), dict(df))
+
+def test_precomputed_idf_matches_vectorizer():
+    """
+    Test if the scores from the stored document frequencies match a TF-IDF vectorizer fitted per request
+    """
+
+    stats = corpus_stats(CORPUS)
+
+    vectorizer = TfidfVectorizer(analyzer=lambda tokens: tokens)
+    matrix = vectorizer.fit_transform(CORPUS)
+
+    for token, column in vectorizer.vocabulary_.items():
+        assert stats.idf(token) == pytest.approx(vectorizer.idf_[column])
+
+    # The score is the row sum of the l2-normalized TF-IDF matrix (the mean times the vocabulary size)
+    expected = matrix.sum(axis=1).A1
+
+    assert [stats.score(tokens) for tokens in CORPUS] == pytest.approx(expected.tolist())
+
+    # So the titles are ranked like the mean TF-IDF of the fitted vectorizer
+    scores = [stats.score(tokens) for tokens in CORPUS]
+    assert sorted(range(len(CORPUS)), key=lambda i: -scores[i]) == sorted(range(len(CORPUS)), key=lambda i: -matrix.mean(axis=1).A1[i])
+
+def test_score_empty_title():
+    """
+    Test if a title without tokens scores 0
+    """
+
+    assert corpus_stats(CORPUS).score([]) == 0.0
+
+def company_news(n_months: int = 4, per_month: int = 15) -> list[dict]:
+    """News of one company in (date, id) order, with the tokens stored at ingest (some titles with news keywords)"""
+
+    rng = random.Random(7)
+    vocabulary = ["카카오", "투자", "유치", "매출", "서비스", "출시", "신규", "완료", "종료", "증가", "인수", "채용"]
+    news = []
+
+    for month in range(1, n_months + 1):
+        for day in sorted(rng.randint(1, 28) for _ in range(per_month)):
+            tokens = rng.choices(vocabulary, k=rng.randint(1, 5))
+            news.append({'title': f"{' '.join(tokens)} {len(news)}", 'date': date(2024, month, day), 'tokens': tokens})
+
+    return news
+
+def test_rollup_ranking_matches_full_news():
+    """
+    Test if ranking the merged monthly rollup candidates picks the same top news as ranking every news of the window
+    """
+
+    news = company_news()
+    stats = corpus_stats([item['tokens'] for item in news])
+
+    # What get_news_rollup returns: the candidates of each month, with the date read back from the JSONB
+    rollup = [{**candidate, 'date': date.fromisoformat(candidate['date'])}
+              for _, month in groupby(news, key=lambda item: (item['date'].year, item['date'].month))
+              for candidate in month_candidates(list(month), stats)]
+
+    assert len(rollup) < len(news)
+    assert news_summary.rank_news_titles(rollup, stats) == news_summary.rank_news_titles(news, stats)
+
+    full_top = news_summary.get_3_news([item for item in news if item['title'] in news_summary.rank_news_titles(news, stats)])
+    rollup_top = news_summary.get_3_news([item for item in rollup if item['title'] in news_summary.rank_news_titles(rollup, stats)])
+
+    assert rollup_top == full_top
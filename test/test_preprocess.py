@@ -1,6 +1,7 @@
 import os
 import pytest
-from preprocess import parsing
+from preprocess import parsing, TimeSeries, GrowthPrefix, month_key, COMPANY_SUMMARY_SECTIONS, TalentTooLarge
+import io
 import json
 
 EXAMPLE_PATH = "./example_datas/talent_ex3.json"
@@ -40,6 +41,38 @@ def test_position_structure():
         else:
             assert pos["description"] == ""
 
+def test_preprocessing_in_memory():
+    """
+    Test if the talent is preprocessed the same from its path, bytes, a stream and its decoded content
+    """
+
+    with open(EXAMPLE_PATH, "rb") as f:
+        raw = f.read()
+
+    expected = parsing.preprocessing_personal_info(EXAMPLE_PATH)
+
+    for talent in [raw, io.BytesIO(raw), io.StringIO(raw.decode("utf-8")), json.loads(raw)]:
+        assert parsing.preprocessing_personal_info(talent) == expected
+
+def test_load_talent_size_limit():
+    """
+    Test if a talent JSON larger than the limit is refused, and an invalid one raises ValueError
+    """
+
+    with open(EXAMPLE_PATH, "rb") as f:
+        raw = f.read()
+
+    with pytest.raises(TalentTooLarge):
+        parsing.load_talent(io.BytesIO(raw), max_bytes=len(raw) - 1)
+
+    with pytest.raises(TalentTooLarge):
+        parsing.load_talent(raw, max_bytes=100)
+
+    assert parsing.load_talent(io.BytesIO(raw), max_bytes=len(raw))['lastName']
+
+    with pytest.raises(ValueError):
+        parsing.load_talent(b"[1, 2]")
+
 def test_education_parsing():
     """
     Test if parsing the education well
@@ -80,6 +113,19 @@ def test_get_company_info():
     assert all("2024-01" <= d["referenceMonth"] <= "2025-08" for d in data["mau"])
     assert isinstance(data["finance"], list)
 
+def test_company_info_summary_sections():
+    """
+    Test if the company information only needs the sections fetched for the summaries
+    """
+
+    with open(COMPANY_EXAMPLE_PATH, "r") as f:
+        company_data = json.load(f)
+
+    projected = {key: value for key, value in company_data.items() if key in COMPANY_SUMMARY_SECTIONS}
+
+    for start_date, end_date in [((2024, 1), (2025, 8)), ((2018, 3), 'Present')]:
+        assert parsing.get_company_info(projected, start_date, end_date) == parsing.get_company_info(company_data, start_date, end_date)
+
 def test_extract_company():
     """
     Test if extracting multiple company's name and working period well
@@ -90,3 +136,57 @@ def test_extract_company():
     companies = parsing.extract_company_period(positions)
 
     assert len(companies) == 9
+
+def test_time_series_window_keeps_source_order():
+    """
+    Test if the window of an ascending, descending or unordered series keeps the source order
+    """
+
+    months = ["2024-01", "2024-02", "2024-03", "2024-04"]
+
+    for order in (months, months[::-1], ["2024-03", "2024-01", "2024-04", "2024-02"]):
+        records = [{"referenceMonth": month} for month in order]
+        series = TimeSeries(records, [month_key(month) for month in order])
+
+        window = series.window(month_key("2024-02"), month_key("2024-03"))
+
+        assert window == [record for record in records if "2024-02" <= record["referenceMonth"] <= "2024-03"]
+        assert series.window(month_key("2025-01"), month_key("2025-12")) == []
+        assert series.window(month_key("2024-03"), month_key("2024-02")) == []
+
+def test_company_index_built_once():
+    """
+    Test if the time-series index of a company document is reused
+    """
+
+    with open(COMPANY_EXAMPLE_PATH, "r") as f:
+        company_data = json.load(f)
+
+    index = parsing.company_index(company_data)
+
+    assert parsing.company_index(company_data) is index
+    assert index.organization is index.organization
+    assert parsing.get_org(company_data, "2024-01", "2024-12") == [d for d in company_data["organization"]["data"]
+                                                                   if "2024-01" <= d["referenceMonth"] <= "2024-12"]
+
+def test_growth_prefix_window():
+    """
+    Test if the growth statistics from the prefix sums match a direct computation on the window
+    """
+
+    months = [f"2024-{month:02d}" for month in range(1, 9)]
+    values = [100, None, 0, 50, 80, 60, None, 90]
+    records = [{"referenceMonth": month, "value": value} for month, value in zip(months, values)]
+    prefix = GrowthPrefix(records, TimeSeries(records, [month_key(month) for month in months]))
+
+    # 2024-03 ~ 2024-08: values 0, 50, 80, 60, 90 -> growth 60%, -25%, 50% (none after 0)
+    stats = prefix.window(month_key("2024-03"), month_key("2024-08"))
+
+    assert stats.records == 6
+    assert (stats.first, stats.last) == (0, 90)
+    assert stats.growth_count == 3
+    assert abs(stats.growth_sum - 85.0) < 1e-9
+    assert stats.drops == 1
+
+    assert prefix.window(month_key("2024-02"), month_key("2024-02")) == (1, None, None, 0.0, 0, 0)
+    assert prefix.window(month_key("2025-01"), month_key("2025-12")).records == 0
@@ -1,7 +1,9 @@
 import pytest
-from preprocess import parsing
+from preprocess import parsing, CompanySeries
 from summarize import talent_summary, company_summary
+import summarize
 import json
+import numpy as np
 
 EXAMPLE_PATH = "./example_datas/talent_ex3.json"
 COMPANY_EXAMPLE_PATH = "./example_datas/company_ex1_비바리퍼블리카.json"
@@ -112,4 +114,133 @@ def test_profile_summary():
 
     assert "이름: " in profile
     assert "최종 학력: " in profile
-    assert "산업 분야: " in profile
\ No newline at end of file
+    assert "산업 분야: " in profile
+
+def test_growth_summary_array_input():
+    """
+    Test if the growth summary is the same for the records and their values
+    """
+
+    datas = [{"value": 100}, {"value": None}, {"value": 0}, {"value": 50}, {"value": 80}]
+    values = np.array([100, np.nan, 0, 50, 80], dtype=float)
+
+    statement = company_summary.growth_summary(datas, 'mau')
+
+    assert statement == company_summary.growth_summary(values, 'mau')
+    assert statement.startswith("재직 기간 중 mau 약 20.00% 감소")
+    assert "일시적 하락" in statement
+    assert company_summary.growth_summary([], 'mau') == "mau 정보 없음."
+
+def test_growth_summary_batch():
+    """
+    Test if the batch growth summary matches the growth summary of each window
+    """
+
+    with open(COMPANY_EXAMPLE_PATH, "r") as f:
+        company_data = json.load(f)
+
+    windows = []
+
+    for start_date, end_date in [((2022, 1), (2023, 8)), ((2024, 1), (2025, 8)), ((2021, 1), "Present"), ((2010, 1), (2011, 1))]:
+        data = parsing.get_company_info(company_data, start_date, end_date)
+        windows += [data['mau'], data['organization']]
+
+    windows.append([{"value": None}])
+    windows.append([{"value": value} for value in [1, 10000000, 160, 111]])
+
+    statements = company_summary.growth_summary_batch(windows, 'mau')
+
+    assert statements == [company_summary.growth_summary(datas, 'mau') for datas in windows]
+
+def test_company_info_summary_window():
+    """
+    Test if the company information summary from the prefix sums is the same as from the window records
+    """
+
+    with open(COMPANY_EXAMPLE_PATH, "r") as f:
+        company_data = json.load(f)
+
+    for start_date, end_date in [((2021, 1), (2023, 8)), ((2024, 1), (2025, 8)), ((2019, 5), "Present"), ((2010, 1), (2011, 1))]:
+        data = parsing.get_company_info(company_data, start_date, end_date)
+
+        assert company_summary.company_info_summary_window(company_data, start_date, end_date) == company_summary.company_info_summary(data)
+
+def growth_document(mau: list, organization: list, first_year: int = 2020) -> dict:
+    """A company document with only the mau and organization series, one value per month from January of first_year"""
+
+    def records(values: list) -> list[dict]:
+        return [{"value": value, "referenceMonth": f"{first_year + idx // 12}-{idx % 12 + 1:02d}"} for idx, value in enumerate(values)]
+
+    return {"mau": {"list": [{"data": records(mau)}]},
+            "organization": {"data": records(organization)},
+            "investment": {"data": []},
+            "finance": {"data": []}}
+
+def test_company_info_summary_window_huge_growth():
+    """
+    Test if a huge growth before the window does not change the average of the window (no cumulative sum cancellation)
+    """
+
+    company_data = growth_document([1, 10000000, 160, 111], [1, 10000000, 160, 111])
+    expected = company_summary.company_info_summary(parsing.get_company_info(company_data, (2020, 3), (2020, 4)))
+
+    assert "평균 월간 -30.63% 감소" in expected
+    assert company_summary.company_info_summary_window(company_data, (2020, 3), (2020, 4)) == expected
+
+    # Random series with spikes, and random windows
+    rng = np.random.default_rng(14)
+
+    for _ in range(20):
+        values = [int(value) for value in rng.integers(1, 1000, size=48) * rng.choice([1, 1, 1, 10**6], size=48)]
+        company_data = growth_document(values, values[::-1])
+
+        for _ in range(50):
+            start, end = sorted(int(month) for month in rng.integers(0, 48, size=2))
+            start_date, end_date = (2020 + start // 12, start % 12 + 1), (2020 + end // 12, end % 12 + 1)
+            data = parsing.get_company_info(company_data, start_date, end_date)
+
+            assert company_summary.company_info_summary_window(company_data, start_date, end_date) == company_summary.company_info_summary(data)
+
+def test_company_info_summary_series():
+    """
+    Test if the company information summary from the database aggregates is the same as from the window records
+    """
+
+    with open(COMPANY_EXAMPLE_PATH, "r") as f:
+        company_data = json.load(f)
+
+    index = parsing.company_index(company_data)
+
+    for start_date, end_date in [((2021, 1), (2023, 8)), ((2024, 1), (2025, 8)), ((2010, 1), (2011, 1))]:
+        data = parsing.get_company_info(company_data, start_date, end_date)
+        start, end = parsing.tenure_months(start_date, end_date)
+
+        # The aggregates get_company_series reads from the series tables
+        series = CompanySeries(mau=index.mau_growth.window(start, end),
+                               organization=index.organization_growth.window(start, end),
+                               investment=index.investment_totals.window(start, end),
+                               finance=data['finance'])
+
+        assert company_summary.company_info_summary_series(series) == company_summary.company_info_summary(data)
+
+def test_parallel_positions_keep_career(monkeypatch):
+    """
+    Test if the parallel summaries share the request connection and keep a placeholder for a failed position
+    """
+
+    connections = []
+
+    def summarize_position(conn, position, lookup=None):
+        connections.append(conn)
+        if position['company'] == 'fail':
+            raise RuntimeError("failed")
+        return position['company']
+
+    monkeypatch.setattr(summarize, "summarize_position", summarize_position)
+
+    conn = object()
+    positions = [{'company': 'a'}, {'company': 'fail'}, {'company': 'b'}]
+    summaries = summarize.summarize_positions_parallel(conn, positions, max_workers=3, task_timeout=5)
+
+    assert summaries == ['a', summarize.position_error_summary({'company': 'fail'}), 'b']
+    assert all(c is conn for c in connections)
@@ -0,0 +1,86 @@
+import pytest
+from tag_vote import tag_names, vote_tags
+
+GPT_TAGS = [{"tag": "상위권대학교", "reason": "서울대학교 출신"},
+            {"tag": "리더십", "reason": "CTO 경험"}]
+
+def test_tag_names():
+    """
+    Test if both GPT tags and tag names are converted to tag names
+    """
+
+    assert tag_names(GPT_TAGS) == ["상위권대학교", "리더십"]
+    assert tag_names(["리더십", "IPO"]) == ["리더십", "IPO"]
+    assert tag_names(None) == []
+
+def test_nearest_talent_over_threshold():
+    """
+    Test if the nearest talent's tags are used when it reaches the threshold
+    """
+
+    neighbours = [(1, 0.9, GPT_TAGS), (2, 0.8, ["IPO"])]
+
+    for mode in ("top1", "majority", "weighted"):
+        assert vote_tags(neighbours, 0.85, mode=mode) == ["상위권대학교", "리더십"]
+
+def test_top1_mode_below_threshold():
+    """
+    Test if the top1 mode leaves the decision to the GPT model below the threshold
+    """
+
+    neighbours = [(1, 0.84, GPT_TAGS), (2, 0.83, GPT_TAGS), (3, 0.82, GPT_TAGS)]
+
+    assert vote_tags(neighbours, 0.85, mode="top1") is None
+
+def test_majority_vote():
+    """
+    Test if only the tags that enough neighbours agree on are kept
+    """
+
+    neighbours = [(1, 0.84, ["리더십", "IPO"]),
+                  (2, 0.83, [{"tag": "리더십", "reason": ""}, {"tag": "IPO", "reason": ""}]),
+                  (3, 0.82, ["리더십", "M&A 경험"]),
+                  (4, 0.5, ["M&A 경험"])]      # Too far to vote
+
+    tags = vote_tags(neighbours, 0.85, mode="majority", min_similarity=0.75, min_neighbours=3, agreement=0.6)
+
+    assert tags == ["리더십", "IPO"]
+
+def test_not_enough_neighbours():
+    """
+    Test if the GPT model decides when too few neighbours are close enough
+    """
+
+    neighbours = [(1, 0.84, ["리더십"]), (2, 0.7, ["리더십"]), (3, 0.6, ["리더십"])]
+
+    assert vote_tags(neighbours, 0.85, mode="weighted", min_similarity=0.75, min_neighbours=3) is None
+
+def test_no_agreement():
+    """
+    Test if the GPT model decides when the neighbours do not agree
+    """
+
+    neighbours = [(1, 0.84, ["리더십"]), (2, 0.83, ["IPO"]), (3, 0.82, ["M&A 경험"])]
+
+    assert vote_tags(neighbours, 0.85, mode="weighted", min_similarity=0.75, min_neighbours=3, agreement=0.6) is None
+
+def test_neighbours_without_similarity():
+    """
+    Test if the neighbours without a similarity (no embedding) are skipped
+    """
+
+    assert vote_tags([(1, None, ["IPO"]), (2, 0.9, GPT_TAGS)], 0.85) == ["상위권대학교", "리더십"]
+    assert vote_tags([(1, None, ["IPO"])], 0.85) is None
+
+    neighbours = [(1, None, ["IPO"]), (2, 0.84, ["리더십"]), (3, 0.83, ["리더십"]), (4, 0.82, ["리더십"])]
+    assert vote_tags(neighbours, 0.85, mode="majority", min_similarity=0.75, min_neighbours=3, agreement=0.6) == ["리더십"]
+
+def test_empty_neighbours_and_unknown_mode():
+    """
+    Test the edge cases: no neighbours and an unknown mode
+    """
+
+    assert vote_tags([], 0.85) is None
+
+    with pytest.raises(ValueError):
+        vote_tags([(1, 0.9, ["리더십"])], 0.85, mode="unknown")